@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+🗜️ Opus Encoder Pool Benchmark
+Simulates N concurrent streams and measures encoding throughput per core
+
+Usage:
+    python benchmarks/encoder_pool.py --streams 64 --processes 0 1 2 4
+    (0 processes = encode in this process, like discord.py does)
+"""
+
+import argparse
+import math
+import os
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord
+from discord import opus
+
+from core.encoder import EncoderPool, PCM_FRAME_SIZE
+
+FRAMES_PER_SECOND = 50  # 20 ms frames
+
+
+class SinePCM(discord.AudioSource):
+    """Endless 48 kHz stereo sine wave, one 20 ms frame per read"""
+    
+    def __init__(self, frequency: float = 440.0):
+        samples = PCM_FRAME_SIZE // 4
+        frame = bytearray()
+        for i in range(samples):
+            value = int(12000 * math.sin(2 * math.pi * frequency * i / 48000))
+            frame += struct.pack('<hh', value, value)
+        self.frame = bytes(frame)
+    
+    def read(self) -> bytes:
+        return self.frame
+
+
+def run_in_process(streams: int, seconds: float) -> int:
+    """Encode all streams round-robin in this process"""
+    sources = [SinePCM(220 + i) for i in range(streams)]
+    encoders = [opus.Encoder() for _ in range(streams)]
+    
+    frames = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for source, encoder in zip(sources, encoders):
+            encoder.encode(source.read(), encoder.SAMPLES_PER_FRAME)
+            frames += 1
+    return frames
+
+
+def run_pool(streams: int, processes: int, seconds: float) -> int:
+    """Encode all streams round-robin through the encoder pool"""
+    per_process = math.ceil(streams / processes)
+    pool = EncoderPool(workers=processes, slots_per_worker=per_process, timeout=5.0)
+    pool.start()
+    
+    try:
+        sources = [pool.wrap(SinePCM(220 + i)) for i in range(streams)]
+        
+        frames = 0
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            for source in sources:
+                if source.read():
+                    frames += 1
+        
+        for source in sources:
+            source.cleanup()
+        return frames
+    finally:
+        pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--streams', type=int, default=64)
+    parser.add_argument('--processes', type=int, nargs='+', default=[0, 1, 2, 4])
+    parser.add_argument('--seconds', type=float, default=5.0)
+    args = parser.parse_args()
+    
+    if not opus.is_loaded() and not opus._load_default():
+        sys.exit("❌ libopus not found, cannot benchmark encoding")
+    
+    print(f"🖥️ {os.cpu_count()} CPUs • {args.streams} streams • {args.seconds:.0f}s per run\n")
+    print(f"{'processes':>10} {'frames/s':>12} {'realtime streams':>18} {'speedup':>9}")
+    
+    baseline = None
+    for processes in args.processes:
+        if processes == 0:
+            frames = run_in_process(args.streams, args.seconds)
+        else:
+            frames = run_pool(args.streams, processes, args.seconds)
+        
+        rate = frames / args.seconds
+        baseline = baseline or rate
+        print(f"{processes or 'inline':>10} {rate:>12,.0f} {rate / FRAMES_PER_SECOND:>18,.0f} {rate / baseline:>8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+🌐 Gateway Memory Benchmark
+Feeds synthetic guilds (and message traffic) into discord.py's cache in
+full and slim gateway mode and compares the memory the cache holds
+
+Usage:
+    python benchmarks/gateway_memory.py --guilds 100 1000 --members 250
+    (full mode sees every member, as after chunking, and every message;
+     slim mode only the members in voice and no messages)
+"""
+
+import argparse
+import datetime
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord
+
+import config
+from bot import ShlokMusicBot
+
+_ids = iter(range(10 ** 17, 10 ** 18))
+
+
+def user_payload(user_id: int) -> dict:
+    return {"id": str(user_id), "username": f"user{user_id % 100000}", "discriminator": "0", "avatar": None, "global_name": None}
+
+
+def guild_payload(members: int, in_voice: int, full: bool) -> dict:
+    guild_id, text_id, voice_id = next(_ids), next(_ids), next(_ids)
+    member_ids = [next(_ids) for _ in range(members)]
+    voice_ids = member_ids[:in_voice]
+    
+    # Without the members intent, GUILD_CREATE only carries members who are in voice
+    sent = member_ids if full else voice_ids
+    return {
+        "id": str(guild_id),
+        "name": f"guild {guild_id % 100000}",
+        "member_count": members,
+        "roles": [{
+            "id": str(guild_id), "name": "@everyone", "permissions": "0", "position": 0,
+            "color": 0, "hoist": False, "managed": False, "mentionable": False,
+        }],
+        "channels": [
+            {"id": str(text_id), "type": 0, "name": "general", "position": 0, "permission_overwrites": []},
+            {"id": str(voice_id), "type": 2, "name": "music", "position": 1, "permission_overwrites": [], "bitrate": 96000, "user_limit": 0},
+        ],
+        "members": [
+            {"user": user_payload(member_id), "roles": [], "joined_at": None, "deaf": False, "mute": False, "flags": 0}
+            for member_id in sent
+        ],
+        "voice_states": [
+            {
+                "user_id": str(member_id), "channel_id": str(voice_id), "session_id": "s",
+                "deaf": False, "mute": False, "self_deaf": False, "self_mute": False,
+                "self_video": False, "suppress": False,
+            }
+            for member_id in voice_ids
+        ],
+    }
+
+
+def message_payload(guild: discord.Guild, author_id: int) -> dict:
+    return {
+        "id": str(next(_ids)),
+        "channel_id": str(guild.text_channels[0].id),
+        "guild_id": str(guild.id),
+        "author": user_payload(author_id),
+        "member": {"roles": [], "joined_at": None, "deaf": False, "mute": False, "flags": 0},
+        "content": "some message that is not for the bot",
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0,
+    }
+
+
+def measure(mode: str, guilds: int, members: int, in_voice: int, messages: int) -> int:
+    """Bytes held by the client's cache after the guilds and messages arrived"""
+    config.GATEWAY.mode = mode
+    options = ShlokMusicBot.gateway_options()
+    full = options["intents"].members
+    
+    gc.collect()
+    tracemalloc.start()
+    client = discord.Client(**options)
+    state = client._connection
+    
+    for _ in range(guilds):
+        state._add_guild_from_data(guild_payload(members, in_voice, full))
+    
+    if options["intents"].guild_messages:
+        cached = list(state._guilds.values())
+        for index in range(messages):
+            guild = cached[index % len(cached)]
+            state.parse_message_create(message_payload(guild, next(_ids)))
+    
+    gc.collect()
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    cached_members = sum(len(guild._members) for guild in state._guilds.values())
+    cached_messages = len(state._messages or ())
+    print(f"{mode:>6} {guilds:>8,} {cached_members:>16,} {cached_messages:>16,} {used / 1024 / 1024:>12.1f}")
+    
+    del client, state
+    return used
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--guilds', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--members', type=int, default=250, help="members per guild")
+    parser.add_argument('--voice', type=int, default=3, help="members in voice per guild")
+    parser.add_argument('--messages', type=int, default=5000, help="messages received (full mode)")
+    args = parser.parse_args()
+    
+    print(f"👥 {args.members} members per guild • {args.voice} in voice • {args.messages:,} messages\n")
+    print(f"{'mode':>6} {'guilds':>8} {'cached members':>16} {'cached messages':>16} {'memory MB':>12}")
+    
+    for guilds in args.guilds:
+        full = measure("full", guilds, args.members, args.voice, args.messages)
+        slim = measure("slim", guilds, args.members, args.voice, args.messages)
+        print(f"{'':>6} {'':>8} slim uses {slim / full:.0%} of full\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+🚀 Range Fetch Proxy Benchmark
+Reads a file from a throttling stand-in media host, directly and through the proxy
+
+Usage:
+    python benchmarks/range_proxy.py --size 8 --rate 256 --concurrency 1 2 4 8
+    (--rate is the per-connection limit in KiB/s, like a throttled media host)
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiohttp
+from aiohttp import web
+
+import config
+from core.proxy import RangeFetchProxy, _parse_range
+
+BLOCK_SIZE = 16 * 1024
+STARTUP_BYTES = 256 * 1024  # enough for FFmpeg to probe the input and start decoding
+
+
+def throttled_host(payload: bytes, rate: int) -> web.Application:
+    """Serves ``payload`` with Range support, each connection limited to ``rate`` bytes/s"""
+    
+    async def media(request: web.Request) -> web.StreamResponse:
+        start, end = _parse_range(request.headers.get('Range'))
+        end = len(payload) - 1 if end is None else min(end, len(payload) - 1)
+        
+        response = web.StreamResponse(status=206 if 'Range' in request.headers else 200)
+        response.content_type = 'audio/webm'
+        response.content_length = end - start + 1
+        response.headers['Accept-Ranges'] = 'bytes'
+        if 'Range' in request.headers:
+            response.headers['Content-Range'] = f'bytes {start}-{end}/{len(payload)}'
+        await response.prepare(request)
+        
+        began = time.perf_counter()
+        sent = 0
+        try:
+            for offset in range(start, end + 1, BLOCK_SIZE):
+                block = payload[offset:min(offset + BLOCK_SIZE, end + 1)]
+                await response.write(block)
+                sent += len(block)
+                delay = began + sent / rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await response.write_eof()
+        except ConnectionResetError:
+            # Reader went away (the proxy cancels chunks it no longer needs)
+            pass
+        return response
+    
+    app = web.Application()
+    app.router.add_get('/media', media)
+    return app
+
+
+async def read_all(session: aiohttp.ClientSession, url: str, start: int = 0):
+    """Time to the first STARTUP_BYTES and to the end of the body"""
+    began = time.perf_counter()
+    first = None
+    received = 0
+    headers = {'Range': f'bytes={start}-'} if start else {}
+    async with session.get(url, headers=headers) as response:
+        async for data in response.content.iter_chunked(BLOCK_SIZE):
+            received += len(data)
+            if first is None and received >= STARTUP_BYTES:
+                first = time.perf_counter() - began
+    return first or 0.0, time.perf_counter() - began, received
+
+
+async def run(args):
+    payload = os.urandom(args.size * 1024 * 1024)
+    rate = args.rate * 1024
+    
+    runner = web.AppRunner(throttled_host(payload, rate), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    upstream = f'http://127.0.0.1:{runner.addresses[0][1]}/media'
+    
+    print(f"📦 {args.size} MiB file • {args.rate} KiB/s per connection • {args.chunk} KiB chunks\n")
+    print(f"{'reader':>14} {'startup':>9} {'seek':>9} {'total':>9} {'MiB/s':>8} {'speedup':>9}")
+    
+    async with aiohttp.ClientSession() as session:
+        baseline = None
+        for concurrency in [0] + args.concurrency:
+            proxy = None
+            url = upstream
+            if concurrency:
+                proxy = RangeFetchProxy(chunk_size=args.chunk * 1024, concurrency=concurrency)
+                url = await proxy.open(upstream)
+            
+            startup, total, received = await read_all(session, url)
+            assert received == len(payload), f"read {received} of {len(payload)} bytes"
+            seek, _, _ = await read_all(session, url, start=len(payload) // 2)
+            
+            if proxy:
+                await proxy.close()
+            
+            baseline = baseline or total
+            label = f"proxy x{concurrency}" if concurrency else "direct"
+            print(f"{label:>14} {startup:>8.2f}s {seek:>8.2f}s {total:>8.2f}s {received / total / 1024 / 1024:>8.2f} {baseline / total:>8.2f}x")
+    
+    await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=8, help='file size in MiB')
+    parser.add_argument('--rate', type=int, default=256, help='per-connection limit in KiB/s')
+    parser.add_argument('--chunk', type=int, default=config.MUSIC.range_chunk_size // 1024, help='proxy chunk size in KiB')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -4,11 +4,19 @@ Simple & Reliable Discord Music Bot with Web Server for Monitoring
 """
 
 import asyncio
+import hashlib
+import importlib
+import json
 import logging
 import sys
 import os
+import time
 from datetime import datetime
-from aiohttp import web
+from typing import Dict, Optional
+
+# First, so the startup timeline covers the imports below too
+from utils.startup import get_startup_timeline
+get_startup_timeline().begin("imports")
 
 import discord
 from discord.ext import commands, tasks
@@ -16,6 +24,8 @@ from discord import opus
 
 import config
 
+get_startup_timeline().end("imports")
+
 # ═══════════════════════════════════════════════════════════════
 # 🌐 WEB SERVER FOR UPTIME MONITORING
 # ═══════════════════════════════════════════════════════════════
@@ -24,6 +34,7 @@ WEB_PORT = int(os.environ.get('PORT', 3000))
 
 async def handle_health(request):
     """Health check endpoint for UptimeRobot"""
+    from aiohttp import web
     return web.json_response({
         'status': 'online',
         'bot': 'Shlok Music',
@@ -55,10 +66,12 @@ async def handle_home(request):
     </body>
     </html>
     """
+    from aiohttp import web
     return web.Response(text=html, content_type='text/html')
 
 async def start_web_server():
     """Start the web server for monitoring"""
+    from aiohttp import web
     app = web.Application()
     app.router.add_get('/', handle_home)
     app.router.add_get('/health', handle_health)
@@ -102,28 +115,24 @@ def load_opus():
     
     return False
 
-# Load opus at module level
-if not load_opus():
-    print("⚠️ Warning: Could not load opus library. Voice may not work.")
-else:
-    print("✅ Opus library loaded successfully")
-
 # ═══════════════════════════════════════════════════════════════
 # 📝 LOGGING SETUP
 # ═══════════════════════════════════════════════════════════════
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s | %(levelname)-8s | %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler(
-            os.path.join(config.LOGS_DIR, f'bot_{datetime.now().strftime("%Y%m%d")}.log'),
-            encoding='utf-8'
-        )
-    ]
-)
+def setup_logging():
+    """Log to stdout and to a daily file in LOGS_DIR (no-op if the launcher configured logging)"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s | %(levelname)-8s | %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S',
+        handlers=[
+            logging.StreamHandler(sys.stdout),
+            logging.FileHandler(
+                os.path.join(config.LOGS_DIR, f'bot_{datetime.now().strftime("%Y%m%d")}.log'),
+                encoding='utf-8'
+            )
+        ]
+    )
 
 logger = logging.getLogger('ShlokMusic')
 
@@ -131,74 +140,301 @@ logger = logging.getLogger('ShlokMusic')
 # 🤖 BOT CLASS
 # ═══════════════════════════════════════════════════════════════
 
+DEFAULT_PREFIXES = ('s!', '$', '!')
+
+# Extensions loaded at startup
+COGS = [
+    'cogs.music_simple',
+    'cogs.utility_new',
+]
+
+def import_cogs():
+    """Import the cogs and everything they use, ahead of load_extension (runs in a thread during login)"""
+    for name in COGS:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            pass  # load_extension reports it
+
+def get_prefix(bot, message):
+    """The guild's own prefixes (see !settings prefix), or the defaults"""
+    if config.GATEWAY.slim:
+        # No message content without the privileged intent, except when the bot is mentioned
+        return commands.when_mentioned(bot, message)
+    
+    prefixes = DEFAULT_PREFIXES
+    if message.guild:
+        from core.settings import get_guild_settings
+        prefixes = get_guild_settings().get(message.guild.id).prefixes or DEFAULT_PREFIXES
+    return commands.when_mentioned_or(*prefixes)(bot, message)
+
 class ShlokMusicBot(commands.Bot):
     """Simple & Reliable Discord Music Bot"""
     
     def __init__(self):
-        intents = discord.Intents.default()
-        intents.message_content = True
-        intents.voice_states = True
-        intents.guilds = True
-        intents.members = True
-        intents.reactions = True
-        
         super().__init__(
-            command_prefix=commands.when_mentioned_or('s!', '$', '!'),
-            intents=intents,
+            command_prefix=get_prefix,
             application_id=config.APPLICATION_ID,
             case_insensitive=True,
             strip_after_prefix=True,
             help_command=None,
+            **self.gateway_options(),
         )
         
         self.start_time = None
         self.activity_index = 0
         
+        # Counters since this process started (lifetime numbers are in core.analytics)
+        self.songs_played = 0
+        self.commands_used = 0
+        
+        # Music players by guild ID
+        self.music_players = {}
+        # Class get_player creates, a music cog may set its own (None: core.player.MusicPlayer)
+        self.player_class = None
+        self._sessions_restored = False
+        
+        # Set by main(): cog modules importing in a thread while we log in
+        self.cog_imports: Optional[asyncio.Task] = None
+        
+        # Cog name -> state its old instance handed over, during reload_cog
+        self.cog_handoff: Dict[str, dict] = {}
+        
+        for command in OWNER_COMMANDS:
+            self.add_command(command)
+    
+    @staticmethod
+    def gateway_options() -> dict:
+        """Intents and cache policy for config.GATEWAY.mode"""
+        if not config.GATEWAY.slim:
+            intents = discord.Intents.default()
+            intents.message_content = True
+            intents.voice_states = True
+            intents.guilds = True
+            intents.members = True
+            intents.reactions = True
+            return {"intents": intents}
+        
+        # Slash commands and voice only: no member, presence, message or reaction
+        # events, members cached only while they are in a voice channel
+        intents = discord.Intents.none()
+        intents.guilds = True
+        intents.voice_states = True
+        intents.guild_messages = config.GATEWAY.mentions
+        
+        member_cache_flags = discord.MemberCacheFlags.none()
+        member_cache_flags.voice = True
+        
+        return {
+            "intents": intents,
+            "member_cache_flags": member_cache_flags,
+            "chunk_guilds_at_startup": False,
+            "max_messages": config.GATEWAY.message_cache,
+        }
+    
+    def get_player(self, guild_id: int):
+        """Get or create the music player for a guild"""
+        player = self.music_players.get(guild_id)
+        if player is None:
+            player_class = self.player_class
+            if player_class is None:
+                from core.player import MusicPlayer as player_class
+            player = self.music_players[guild_id] = player_class(self, guild_id)
+        return player
+    
     async def setup_hook(self):
         """Initialize the bot"""
         logger.info("🔧 Setting up Shlok Music Bot...")
+        timeline = get_startup_timeline()
         
-        # Load cogs
-        cogs = [
-            'cogs.music_simple',
-            'cogs.utility_new',
-        ]
+        # Load cogs (their modules are mostly imported by now)
+        if self.cog_imports:
+            await self.cog_imports
+        with timeline.phase("cogs"):
+            for cog in COGS:
+                try:
+                    await self.load_extension(cog)
+                    logger.info(f"✅ Loaded: {cog}")
+                except Exception as e:
+                    logger.error(f"❌ Failed to load {cog}: {e}")
+                    import traceback
+                    traceback.print_exc()
         
-        for cog in cogs:
-            try:
-                await self.load_extension(cog)
-                logger.info(f"✅ Loaded: {cog}")
-            except Exception as e:
-                logger.error(f"❌ Failed to load {cog}: {e}")
-                import traceback
-                traceback.print_exc()
+        with timeline.phase("services"):
+            # Resume journaled cache warming jobs and measure unmeasured tracks
+            from core.warmer import get_cache_warmer
+            warmer = get_cache_warmer()
+            if warmer:
+                warmer.start()
+            
+            # Clear out FFmpeg processes a crashed run left behind, then watch new ones
+            from core.supervisor import get_ffmpeg_supervisor
+            get_ffmpeg_supervisor().start()
+        
+        # Sync slash commands only if they changed since the last sync
+        await timeline.track("command sync", self.sync_commands())
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🌳 COMMAND TREE SYNC
+    # ═══════════════════════════════════════════════════════════
+    
+    COMMAND_TREE_FILE = os.path.join(config.DATA_DIR, "command_tree.json")
+    
+    def command_tree_hash(self) -> str:
+        """Hash of the slash commands as they would be sent to Discord"""
+        payload = [command.to_dict(self.tree) for command in self.tree.get_commands()]
+        data = json.dumps([config.APPLICATION_ID, payload], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(data.encode()).hexdigest()
+    
+    async def sync_commands(self, force: bool = False) -> Optional[int]:
+        """Sync the command tree globally, unless Discord already has this exact tree
+        
+        Returns the number of synced commands, or None when nothing was sent.
+        """
+        tree_hash = self.command_tree_hash()
         
-        # Wait before syncing to avoid rate limits (Discord needs time after connection)
-        await asyncio.sleep(2)
+        if not force:
+            try:
+                with open(self.COMMAND_TREE_FILE, "r", encoding="utf-8") as f:
+                    if json.load(f).get("hash") == tree_hash:
+                        logger.info("✅ Slash commands unchanged, skipping sync")
+                        return None
+            except (OSError, ValueError):
+                pass
         
-        # Force sync slash commands globally
         try:
             synced = await self.tree.sync()
-            logger.info(f"✅ Synced {len(synced)} slash commands globally")
-        except asyncio.TimeoutError:
-            logger.warning("⚠️ Sync timed out, will retry on next ready")
         except Exception as e:
             logger.error(f"❌ Failed to sync: {e}")
+            return None
+        logger.info(f"✅ Synced {len(synced)} slash commands globally")
+        
+        try:
+            with open(self.COMMAND_TREE_FILE, "w", encoding="utf-8") as f:
+                json.dump({"hash": tree_hash, "commands": len(synced), "synced_at": datetime.now().isoformat()}, f)
+        except OSError as e:
+            logger.warning(f"⚠️ Couldn't remember the synced command tree: {e}")
+        return len(synced)
+    
+    # ═══════════════════════════════════════════════════════════
+    # ♻️ COG RELOAD
+    # ═══════════════════════════════════════════════════════════
+    
+    async def reload_cog(self, extension: str) -> int:
+        """Reload an extension's code without dropping what its cogs hold
+        
+        Cogs with an ``export_state()`` leave its result in ``cog_handoff``
+        under their name, and the new instances take it in ``cog_load``.
+        Voice clients and their audio are never touched. If the new code
+        fails, discord.py sets the old module up again and that instance
+        takes the state back instead. Returns how many cogs handed over.
+        """
+        if extension not in self.extensions:
+            raise commands.ExtensionNotLoaded(extension)
+        
+        handed = []
+        for cog in list(self.cogs.values()):
+            module = type(cog).__module__
+            export = getattr(cog, "export_state", None)
+            if export and (module == extension or module.startswith(f"{extension}.")):
+                self.cog_handoff[cog.qualified_name] = export()
+                handed.append(cog.qualified_name)
+        
+        try:
+            await self.reload_extension(extension)
+        finally:
+            for name in handed:
+                self.cog_handoff.pop(name, None)
+        
+        # Only reaches Discord if the reload changed a slash command
+        await self.sync_commands()
+        return len(handed)
     
     async def on_ready(self):
         """Bot is ready"""
         self.start_time = datetime.now()
+        timeline = get_startup_timeline()
+        timeline.end("gateway")
+        
+        # The guild cache was just (re)built: count it once, events keep it current
+        from core.counters import get_guild_counters
+        counters = get_guild_counters()
+        await counters.reconcile(self.guilds)
+        counters.start(self)
         
         logger.info("━" * 50)
         logger.info(f"🎵 {config.BOT_NAME} is online!")
-        logger.info(f"📊 Servers: {len(self.guilds)}")
-        logger.info(f"👥 Users: {sum(g.member_count for g in self.guilds):,}")
+        logger.info(f"🌐 Gateway: {config.GATEWAY.mode}")
+        logger.info(f"📊 Servers: {counters.guilds:,}")
+        logger.info(f"👥 Users: {counters.users:,}")
         logger.info(f"🤖 {self.user} (ID: {self.user.id})")
         logger.info(f"📡 Latency: {round(self.latency * 1000)}ms")
         logger.info("━" * 50)
         
         if not self.rotate_activity.is_running():
             self.rotate_activity.start()
+        
+        if not self._sessions_restored:
+            self._sessions_restored = True
+            
+            # Settings of the guilds this process serves, before any player is created
+            from core.settings import get_guild_settings
+            await timeline.track("guild settings", get_guild_settings().load(guild.id for guild in self.guilds))
+            
+            # Resume the sessions a crash or restart interrupted, then keep checkpointing
+            from core.session import get_session_store
+            store = get_session_store()
+            if store:
+                asyncio.create_task(self._restore_sessions(store))
+            
+            from core.analytics import get_analytics
+            analytics = get_analytics()
+            if analytics:
+                analytics.start()
+            
+            # yt-dlp is our slowest import: load it now instead of on the first search
+            from core.track import load_yt_dlp
+            asyncio.create_task(load_yt_dlp())
+            
+            timeline.finish()
+    
+    async def on_guild_join(self, guild: discord.Guild):
+        """Count the guild and load settings stored from an earlier stay in it"""
+        from core.counters import get_guild_counters
+        get_guild_counters().guild_joined(guild)
+        
+        from core.settings import get_guild_settings
+        await get_guild_settings().load([guild.id])
+    
+    async def on_guild_remove(self, guild: discord.Guild):
+        from core.counters import get_guild_counters
+        get_guild_counters().guild_removed(guild)
+    
+    async def on_member_join(self, member: discord.Member):
+        from core.counters import get_guild_counters
+        get_guild_counters().member_joined(member.guild)
+    
+    async def on_member_remove(self, member: discord.Member):
+        from core.counters import get_guild_counters
+        get_guild_counters().member_left(member.guild)
+    
+    async def on_command_completion(self, ctx: commands.Context):
+        """Count every command that ran (prefix or slash)"""
+        self.commands_used += 1
+        from core.analytics import get_analytics
+        analytics = get_analytics()
+        if analytics:
+            analytics.record_command(ctx.guild.id if ctx.guild else None, ctx.command.qualified_name)
+    
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        """Slash-only commands (hybrid ones are counted by on_command_completion)"""
+        if isinstance(command, commands.hybrid.HybridAppCommand):
+            return
+        self.commands_used += 1
+        from core.analytics import get_analytics
+        analytics = get_analytics()
+        if analytics:
+            analytics.record_command(interaction.guild_id, command.qualified_name)
     
     @tasks.loop(seconds=30)
     async def rotate_activity(self):
@@ -206,9 +442,11 @@ class ShlokMusicBot(commands.Bot):
         activities = config.BOT_ACTIVITIES
         data = activities[self.activity_index % len(activities)]
         
+        from core.counters import get_guild_counters
+        counters = get_guild_counters()
         name = data["name"].format(
-            guilds=len(self.guilds),
-            users=sum(g.member_count for g in self.guilds)
+            guilds=f"{counters.guilds:,}",
+            users=f"{counters.users:,}"
         )
         
         activity_type = {
@@ -229,37 +467,149 @@ class ShlokMusicBot(commands.Bot):
     async def before_rotate(self):
         await self.wait_until_ready()
     
+    async def _restore_sessions(self, store):
+        try:
+            await store.restore(self)
+        except Exception as e:
+            logger.error(f"❌ Failed to resume sessions: {e}")
+        store.start(self)
+    
     async def close(self):
         """Cleanup"""
+        if self.is_closed():
+            return
         logger.info("🛑 Shutting down...")
         
+        # Checkpoint every guild before leaving voice, so the next start resumes them
+        from core.session import get_session_store
+        store = get_session_store()
+        if store:
+            store.stop()
+            store.checkpoint_all(self)
+        
         for vc in self.voice_clients:
             try:
                 await vc.disconnect()
             except:
                 pass
         
+        # Stop encoder worker processes and free their shared memory
+        from core.encoder import get_encoder_pool
+        pool = get_encoder_pool()
+        if pool:
+            pool.shutdown()
+        
+        # Unfinished cache warming jobs stay in the journal for next start
+        from core.warmer import get_cache_warmer
+        warmer = get_cache_warmer()
+        if warmer:
+            warmer.shutdown()
+        
+        # Play counts and hits still waiting for the index's batched write
+        from core.cache import get_audio_cache
+        cache = get_audio_cache()
+        if cache:
+            cache.flush()
+        
+        from core.proxy import get_range_proxy
+        proxy = get_range_proxy()
+        if proxy:
+            await proxy.close()
+        
+        from core.supervisor import get_ffmpeg_supervisor
+        get_ffmpeg_supervisor().shutdown()
+        
+        from core.counters import get_guild_counters
+        get_guild_counters().stop()
+        
+        # Counted analytics go out with the database's last batch
+        from core.analytics import get_analytics
+        analytics = get_analytics()
+        if analytics:
+            analytics.stop()
+        
+        from core.database import close_database
+        await asyncio.to_thread(close_database)
+        
         await super().close()
 
+# ═══════════════════════════════════════════════════════════════
+# 🔑 OWNER COMMANDS
+# ═══════════════════════════════════════════════════════════════
+
+# Registered on the bot itself, so they work whichever cogs are loaded
+
+@commands.hybrid_command(name="sync", description="Force a slash command sync (bot owner)")
+@commands.is_owner()
+async def sync_command(ctx: commands.Context):
+    """Sync slash commands with Discord even if they look unchanged"""
+    count = await ctx.bot.sync_commands(force=True)
+    
+    if count is None:
+        embed = discord.Embed(title="❌ Sync Failed", description="Discord rejected the sync, check the logs.", color=config.BOT_COLOR_ERROR)
+    else:
+        embed = discord.Embed(title="🌳 Commands Synced", description=f"Synced **{count}** slash commands globally", color=config.BOT_COLOR_SUCCESS)
+    await ctx.send(embed=embed)
+
+@commands.hybrid_command(name="reload", description="Reload a cog's code without stopping playback (bot owner)")
+@commands.is_owner()
+async def reload_command(ctx: commands.Context, cog: str = "music_simple"):
+    """Reload a cog, handing its players to the new code"""
+    extension = cog if cog.startswith("cogs.") else f"cogs.{cog}"
+    started = time.perf_counter()
+    try:
+        await ctx.bot.reload_cog(extension)
+    except commands.ExtensionError as e:
+        embed = discord.Embed(title="❌ Reload Failed", description=f"```{e}```", color=config.BOT_COLOR_ERROR)
+        return await ctx.send(embed=embed)
+    
+    elapsed = (time.perf_counter() - started) * 1000
+    embed = discord.Embed(
+        title="♻️ Cog Reloaded",
+        description=f"`{extension}` in {elapsed:.0f}ms • {len(ctx.bot.voice_clients)} voice connections kept",
+        color=config.BOT_COLOR_SUCCESS
+    )
+    await ctx.send(embed=embed)
+
+OWNER_COMMANDS = [sync_command, reload_command]
+
 # ═══════════════════════════════════════════════════════════════
 # 🚀 MAIN
 # ═══════════════════════════════════════════════════════════════
 
 async def main():
+    setup_logging()
+    timeline = get_startup_timeline()
     bot = ShlokMusicBot()
     web_runner = None
     
+    # These don't depend on each other: run them while the bot logs in
+    web_task = asyncio.create_task(timeline.track("web server", start_web_server()))
+    opus_task = asyncio.create_task(timeline.track("opus", asyncio.to_thread(load_opus)))
+    bot.cog_imports = asyncio.create_task(timeline.track("cog imports", asyncio.to_thread(import_cogs)))
+    
     try:
+        # Login runs setup_hook (cogs, services, command sync)
+        await timeline.track("login", bot.login(config.BOT_TOKEN))
+        
         # Start web server for UptimeRobot monitoring
-        web_runner = await start_web_server()
+        web_runner = await web_task
+        
+        if await opus_task:
+            logger.info("✅ Opus library loaded successfully")
+        else:
+            logger.warning("⚠️ Could not load opus library. Voice may not work.")
         
         # Start the bot
-        await bot.start(config.BOT_TOKEN)
+        timeline.begin("gateway")
+        await bot.connect()
     except discord.LoginFailure:
         logger.critical("❌ Invalid token!")
     except Exception as e:
         logger.critical(f"❌ Error: {e}")
     finally:
+        for task in (web_task, opus_task, bot.cog_imports):
+            task.cancel()
         if web_runner:
             await web_runner.cleanup()
         await bot.close()
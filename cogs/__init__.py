@@ -2,16 +2,25 @@
 Cogs module initialization
 """
 
-from cogs.music import Music
-from cogs.queue import Queue
-from cogs.effects import Effects
-from cogs.utility import Utility
-from cogs.events import Events
+import importlib
 
-__all__ = [
-    'Music',
-    'Queue',
-    'Effects',
-    'Utility',
-    'Events',
-]
+# Public name -> module defining it. Imported on first use, so importing one
+# module of the package doesn't import all the others with it
+_EXPORTS = {
+    'Music':   'cogs.music',
+    'Queue':   'cogs.queue',
+    'Effects': 'cogs.effects',
+    'Utility': 'cogs.utility',
+    'Events':  'cogs.events',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
@@ -5,6 +5,7 @@ Audio effects, filters, and advanced playback features
 
 import asyncio
 import logging
+import random
 import aiohttp
 from typing import Optional
 
@@ -13,6 +14,7 @@ from discord import app_commands
 from discord.ext import commands
 
 import config
+from core import get_favorites_store
 
 logger = logging.getLogger('ShlokMusic.Effects')
 
@@ -95,6 +97,15 @@ class Effects(commands.Cog, name="Effects"):
             await ctx.send(embed=embed, delete_after=10)
             return
         
+        if name != "none" and not player.effects_enabled:
+            embed = discord.Embed(
+                title="⏳ Effects Paused",
+                description="The bot is under heavy load, effects are off until it recovers.",
+                color=config.BOT_COLOR_WARNING
+            )
+            await ctx.send(embed=embed, delete_after=10)
+            return
+        
         player.current_effect = name
         
         if name == "none":
@@ -442,7 +453,8 @@ class Effects(commands.Cog, name="Effects"):
             await ctx.send(embed=embed, delete_after=5)
             return
         
-        added = player.add_favorite(ctx.author.id, player.current_track)
+        store = get_favorites_store()
+        added = await store.add(ctx.author.id, player.current_track)
         
         if added:
             embed = discord.Embed(
@@ -450,22 +462,57 @@ class Effects(commands.Cog, name="Effects"):
                 description=f"Added **{player.current_track.title}** to your favorites!",
                 color=config.BOT_COLOR_SUCCESS
             )
-        else:
+        elif await store.contains(ctx.author.id, player.current_track):
             embed = discord.Embed(
                 title="⚠️ Already in Favorites",
                 description="This song is already in your favorites!",
                 color=config.BOT_COLOR_WARNING
             )
+        else:
+            embed = discord.Embed(
+                title="⚠️ Favorites Full",
+                description=f"You can keep up to **{store.max_favorites}** favorites. Remove some first!",
+                color=config.BOT_COLOR_WARNING
+            )
         
         await ctx.send(embed=embed, delete_after=10)
     
+    @favorite.command(name="remove", aliases=["unlike"], description="Remove a song from your favorites")
+    @app_commands.describe(position="Position in your favorites list (default: the current song)")
+    async def favorite_remove(self, ctx: commands.Context, position: int = None):
+        """Remove the current song, or the one at a position of your list"""
+        store = get_favorites_store()
+        
+        if position is not None:
+            tracks = await store.page(ctx.author.id, position, per_page=1) if position > 0 else []
+            track = tracks[0] if tracks else None
+        else:
+            track = self.get_player(ctx).current_track
+        
+        if not track or not await store.remove(ctx.author.id, track):
+            embed = discord.Embed(
+                title="❌ Not in Favorites",
+                description="That song isn't in your favorites!",
+                color=config.BOT_COLOR_ERROR
+            )
+            await ctx.send(embed=embed, delete_after=5)
+            return
+        
+        embed = discord.Embed(
+            title="💔 Removed from Favorites",
+            description=f"Removed **{track.title}** from your favorites",
+            color=config.BOT_COLOR_SUCCESS
+        )
+        await ctx.send(embed=embed, delete_after=10)
+    
     @favorite.command(name="list", description="View your favorites")
-    async def favorite_list(self, ctx: commands.Context):
+    @app_commands.describe(page="Page number to display")
+    async def favorite_list(self, ctx: commands.Context, page: int = 1):
         """View your favorite songs"""
-        player = self.get_player(ctx)
-        favorites = player.get_favorites(ctx.author.id)
+        store = get_favorites_store()
+        total = await store.count(ctx.author.id)
         
-        if not favorites:
+        if not total:
             embed = discord.Embed(
                 title="❤️ Your Favorites",
                 description="You haven't added any favorites yet!\n"
@@ -475,19 +522,76 @@ class Effects(commands.Cog, name="Effects"):
             await ctx.send(embed=embed, delete_after=15)
             return
         
+        per_page = 10
+        total_pages = (total + per_page - 1) // per_page
+        page = max(1, min(page, total_pages))
+        favorites = await store.page(ctx.author.id, page, per_page)
+        
         embed = discord.Embed(
             title=f"❤️ {ctx.author.display_name}'s Favorites",
             color=config.BOT_COLOR
         )
         
         fav_list = ""
-        for i, track in enumerate(favorites[:10], 1):
+        for i, track in enumerate(favorites, (page - 1) * per_page + 1):
             fav_list += f"**{i}.** [{track.title}]({track.url})\n"
         
         embed.description = fav_list
-        embed.set_footer(text=f"Total: {len(favorites)} favorites")
+        embed.set_footer(text=f"Page {page}/{total_pages} • Total: {total} favorites")
         
         await ctx.send(embed=embed)
+    
+    @favorite.command(name="play", description="Add all your favorites to the queue")
+    @app_commands.describe(shuffle="Shuffle them first")
+    async def favorite_play(self, ctx: commands.Context, shuffle: bool = False):
+        """Queue all of your favorites"""
+        if not ctx.author.voice:
+            embed = discord.Embed(
+                title="❌ Not Connected",
+                description="You need to be in a voice channel!",
+                color=config.BOT_COLOR_ERROR
+            )
+            await ctx.send(embed=embed, delete_after=5)
+            return
+        
+        tracks = await get_favorites_store().tracks(ctx.author.id, requester=ctx.author)
+        if not tracks:
+            embed = discord.Embed(
+                title="❤️ Your Favorites",
+                description="You haven't added any favorites yet!",
+                color=config.BOT_COLOR_INFO
+            )
+            await ctx.send(embed=embed, delete_after=10)
+            return
+        
+        player = self.get_player(ctx)
+        if not player.is_connected and not await player.connect(ctx.author.voice.channel):
+            embed = discord.Embed(
+                title="❌ Connection Failed",
+                description="Failed to connect to the voice channel. Please try again.",
+                color=config.BOT_COLOR_ERROR
+            )
+            await ctx.send(embed=embed, delete_after=10)
+            return
+        player.text_channel = ctx.channel
+        
+        if shuffle:
+            random.shuffle(tracks)
+        skipped = max(0, len(tracks) - player.queue_space)
+        if skipped:
+            tracks = tracks[:player.queue_space]
+        player.queue.add_multiple(tracks)
+        
+        embed = discord.Embed(
+            title="❤️ Favorites Queued",
+            description=f"Added **{len(tracks)}** favorites to the queue" + (" (shuffled)" if shuffle else "")
+            + (f" ({skipped} left out, the queue is full)" if skipped else ""),
+            color=config.BOT_COLOR_SUCCESS
+        )
+        await ctx.send(embed=embed, delete_after=10)
+        
+        if not player.is_playing and not player.current_track:
+            await player.play_next()
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -11,7 +11,8 @@ import discord
 from discord.ext import commands
 
 import config
-from core import LoopMode
+from core import LoopMode, get_favorites_store
+from utils.controls import ControlButtons
 
 logger = logging.getLogger('ShlokMusic.Events')
 
@@ -25,6 +26,16 @@ class Events(commands.Cog, name="Events"):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.cooldowns = {}  # User cooldowns for reactions
+        
+        # Slim gateway mode gets no reaction events: now playing messages carry these buttons
+        self.controls = ControlButtons("shlok:np", config.CONTROL_EMOJIS, self._on_control_button)
+    
+    async def cog_load(self):
+        if config.GATEWAY.slim:
+            self.bot.add_view(self.controls)
+    
+    async def cog_unload(self):
+        self.controls.stop()
     
     def get_player(self, guild_id: int):
         """Get or create music player for the guild"""
@@ -100,6 +111,21 @@ class Events(commands.Cog, name="Events"):
         # Execute the action
         await self._handle_reaction_action(action, player, member, channel)
     
+    async def _on_control_button(self, interaction: discord.Interaction, emoji: str):
+        """Same controls as the reactions, pressed as buttons"""
+        player = self.bot.music_players.get(interaction.guild_id)
+        if not player or not player.now_playing_message or player.now_playing_message.id != interaction.message.id:
+            await interaction.response.send_message("❌ This player has ended.", ephemeral=True)
+            return
+        
+        member = interaction.user
+        if not member.voice or (player.voice_client and member.voice.channel != player.voice_client.channel):
+            await interaction.response.send_message("❌ You need to be in the same voice channel!", ephemeral=True)
+            return
+        
+        await interaction.response.defer()
+        await self._handle_reaction_action(config.REACTION_CONTROLS[emoji], player, member, interaction.channel)
+    
     async def _handle_reaction_action(self, action: str, player, member: discord.Member, channel: discord.TextChannel):
         """Handle a reaction control action"""
         try:
@@ -107,7 +133,7 @@ class Events(commands.Cog, name="Events"):
             
             if action == "pause_resume":
                 if player.is_paused:
-                    player.resume()
+                    await player.resume()
                     response = ("▶️ Resumed", f"Resumed by {member.display_name}")
                 else:
                     player.pause()
@@ -158,7 +184,7 @@ class Events(commands.Cog, name="Events"):
             
             elif action == "favorite":
                 if player.current_track:
-                    added = player.add_favorite(member.id, player.current_track)
+                    added = await get_favorites_store().add(member.id, player.current_track)
                     if added:
                         response = ("❤️ Favorited", f"Added to {member.display_name}'s favorites")
                     else:
@@ -357,6 +383,21 @@ class Events(commands.Cog, name="Events"):
                 pass
             del self.bot.music_players[guild.id]
     
+    # ═══════════════════════════════════════════════════════════
+    # 🔊 VOICE EVENTS
+    # ═══════════════════════════════════════════════════════════
+    
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
+        """Suspend players nobody is listening to and wake them when someone returns"""
+        player = self.bot.music_players.get(member.guild.id)
+        if not player or not player.voice_client:
+            return
+        
+        channel = player.voice_client.channel
+        if member.id == self.bot.user.id or channel in (before.channel, after.channel):
+            player.listeners_changed()
+    
     # ═══════════════════════════════════════════════════════════
     # 🎤 MESSAGE EVENTS
     # ═══════════════════════════════════════════════════════════
@@ -370,10 +411,11 @@ class Events(commands.Cog, name="Events"):
         
         # Respond to mentions
         if self.bot.user in message.mentions and len(message.content.split()) == 1:
+            prefix = "/" if config.GATEWAY.slim else config.BOT_PREFIX
             embed = discord.Embed(
                 title="🎵 Shlok Music",
-                description=f"Hey {message.author.mention}! My prefix is `{config.BOT_PREFIX}`\n"
-                           f"Use `{config.BOT_PREFIX}help` to see all commands!",
+                description=f"Hey {message.author.mention}! My prefix is `{prefix}`\n"
+                           f"Use `{prefix}help` to see all commands!",
                 color=config.BOT_COLOR
             )
             await message.channel.send(embed=embed, delete_after=15)
@@ -12,7 +12,8 @@ from discord import app_commands
 from discord.ext import commands
 
 import config
-from core import Track, TrackExtractor, LoopMode
+from core import Track, TrackExtractor, LoopMode, get_station_manager
+from utils.controls import ChoicePrompt
 
 logger = logging.getLogger('ShlokMusic.Music')
 
@@ -179,8 +180,20 @@ class Music(commands.Cog, name="Music"):
             
             # Add to queue or play immediately
             if player.is_playing or player.is_paused:
+                if player.queue_space == 0:
+                    embed = discord.Embed(
+                        title="❌ Queue Full",
+                        description=f"The queue is limited to **{player.queue_limit}** tracks on this server",
+                        color=config.BOT_COLOR_ERROR
+                    )
+                    try:
+                        await loading_msg.edit(embed=embed)
+                    except:
+                        await ctx.interaction.followup.send(embed=embed)
+                    return
+                
                 position = len(player.queue) + 1
-                player.queue.append(track)
+                player.queue.add(track)
                 
                 embed = discord.Embed(
                     title="✅ Added to Queue",
@@ -209,8 +222,6 @@ class Music(commands.Cog, name="Music"):
                 except:
                     await ctx.send(embed=embed)
             
-            self.bot.commands_used += 1
-            
         except Exception as e:
             logger.error(f"Error in play command: {e}", exc_info=True)
             embed = discord.Embed(
@@ -262,33 +273,34 @@ class Music(commands.Cog, name="Music"):
         embed = await self.create_search_embed(tracks, query)
         search_msg = await ctx.send(embed=embed)
         
-        # Add number reactions
-        reactions = ["1️⃣", "2️⃣", "3️⃣", "4️⃣", "5️⃣", "❌"]
-        for emoji in reactions[:len(tracks) + 1]:
-            await search_msg.add_reaction(emoji)
-        
-        def check(reaction, user):
-            return (
-                user == ctx.author and 
-                reaction.message.id == search_msg.id and 
-                str(reaction.emoji) in reactions
-            )
+        # Add number reactions (buttons in slim gateway mode)
+        reactions = ["1️⃣", "2️⃣", "3️⃣", "4️⃣", "5️⃣"][:len(tracks)] + ["❌"]
+        prompt = ChoicePrompt(self.bot, search_msg, ctx.author, reactions)
+        await prompt.start()
         
         try:
-            reaction, user = await self.bot.wait_for('reaction_add', timeout=30.0, check=check)
+            emoji = await prompt.wait(timeout=30.0)
             
             await search_msg.delete()
             
-            if str(reaction.emoji) == "❌":
+            if emoji == "❌":
                 return
             
             # Get selected track
-            index = reactions.index(str(reaction.emoji))
+            index = reactions.index(emoji)
             if index < len(tracks):
                 track = tracks[index]
                 player = self.get_player(ctx)
                 
                 if player.is_playing or player.is_paused:
+                    if player.queue_space == 0:
+                        embed = discord.Embed(
+                            title="❌ Queue Full",
+                            description=f"The queue is limited to **{player.queue_limit}** tracks on this server",
+                            color=config.BOT_COLOR_ERROR
+                        )
+                        await ctx.send(embed=embed, delete_after=10)
+                        return
                     player.queue.add(track)
                     
                     embed = discord.Embed(
@@ -371,7 +383,7 @@ class Music(commands.Cog, name="Music"):
             await ctx.send(embed=embed, delete_after=5)
             return
         
-        player.resume()
+        await player.resume()
         
         embed = discord.Embed(
             title="▶️ Resumed",
@@ -788,6 +800,149 @@ class Music(commands.Cog, name="Music"):
             color=config.BOT_COLOR_WARNING
         )
         await ctx.send(embed=embed, delete_after=5)
+    
+    
+    # ═══════════════════════════════════════════════════════════
+    # 📻 STATION COMMANDS
+    # ═══════════════════════════════════════════════════════════
+    
+    @commands.hybrid_group(
+        name="station",
+        description="Shared 24/7 broadcast stations"
+    )
+    async def station(self, ctx: commands.Context):
+        """Broadcast stations: one stream shared by many servers"""
+        if ctx.invoked_subcommand is None:
+            embed = discord.Embed(
+                title="📻 Station Commands",
+                description=(
+                    "`!station start <name> <song or playlist>` - Start a station\n"
+                    "`!station join <name>` - Tune in to a station\n"
+                    "`!station leave` - Go back to your own queue\n"
+                    "`!station list` - Show live stations"
+                ),
+                color=config.BOT_COLOR
+            )
+            await ctx.send(embed=embed, delete_after=15)
+    
+    @station.command(name="start", description="Start a broadcast station")
+    @app_commands.describe(name="Station name", query="Song name, URL or playlist URL")
+    async def station_start(self, ctx: commands.Context, name: str, *, query: str):
+        """Start a station and tune this server in"""
+        manager = get_station_manager()
+        
+        if manager.get(name):
+            embed = discord.Embed(
+                title="❌ Station Exists",
+                description=f"Station **{name}** is already on air. Use `!station join {name}`",
+                color=config.BOT_COLOR_ERROR
+            )
+            await ctx.send(embed=embed, delete_after=10)
+            return
+        
+        if not await self.ensure_voice(ctx):
+            return
+        
+        if "list=" in query:
+            tracks = await TrackExtractor.extract_playlist(query, requester=ctx.author, limit=config.MUSIC.max_playlist_size)
+        else:
+            tracks = await TrackExtractor.search(query, requester=ctx.author, limit=1)
+        
+        if not tracks:
+            embed = discord.Embed(
+                title="❌ No Results",
+                description=f"No results found for: **{query}**",
+                color=config.BOT_COLOR_ERROR
+            )
+            await ctx.send(embed=embed, delete_after=10)
+            return
+        
+        station = manager.create(name, tracks, loop=self.bot.loop)
+        
+        # Give the producer a moment to buffer the first packets
+        await asyncio.sleep(1)
+        await self.get_player(ctx).tune_in(station)
+        
+        embed = discord.Embed(
+            title="📻 Station On Air",
+            description=f"**{station.name}** is broadcasting **{len(tracks)}** tracks on rotation\n"
+                        f"Other servers can tune in with `!station join {station.name}`",
+            color=config.BOT_COLOR_SUCCESS
+        )
+        await ctx.send(embed=embed)
+    
+    @station.command(name="join", description="Tune in to a broadcast station")
+    @app_commands.describe(name="Station name")
+    async def station_join(self, ctx: commands.Context, *, name: str):
+        """Tune this server in to a live station"""
+        station = get_station_manager().get(name)
+        
+        if not station or not station.is_live:
+            embed = discord.Embed(
+                title="❌ Station Not Found",
+                description=f"No live station named **{name}**. See `!station list`",
+                color=config.BOT_COLOR_ERROR
+            )
+            await ctx.send(embed=embed, delete_after=10)
+            return
+        
+        if not await self.ensure_voice(ctx):
+            return
+        
+        await self.get_player(ctx).tune_in(station)
+        
+        now_playing = station.current_track.title if station.current_track else "Starting up..."
+        embed = discord.Embed(
+            title=f"📻 Tuned In: {station.name}",
+            description=f"Now playing: **{now_playing}**\n👥 {len(station.subscribers)} servers listening",
+            color=config.BOT_COLOR_SUCCESS
+        )
+        await ctx.send(embed=embed)
+    
+    @station.command(name="leave", description="Leave the station")
+    async def station_leave(self, ctx: commands.Context):
+        """Stop following the station"""
+        player = self.get_player(ctx)
+        
+        if not await player.leave_station():
+            embed = discord.Embed(
+                title="❌ Not Tuned In",
+                description="This server is not listening to a station.",
+                color=config.BOT_COLOR_ERROR
+            )
+            await ctx.send(embed=embed, delete_after=5)
+            return
+        
+        embed = discord.Embed(
+            title="📴 Left Station",
+            description="Back to this server's own queue.",
+            color=config.BOT_COLOR
+        )
+        await ctx.send(embed=embed, delete_after=10)
+    
+    @station.command(name="list", description="Show live stations")
+    async def station_list(self, ctx: commands.Context):
+        """List live stations"""
+        stations = get_station_manager().live()
+        
+        if not stations:
+            embed = discord.Embed(
+                title="📻 No Stations",
+                description="No stations are on air. Start one with `!station start <name> <song>`",
+                color=config.BOT_COLOR_INFO
+            )
+            await ctx.send(embed=embed, delete_after=15)
+            return
+        
+        embed = discord.Embed(title="📻 Live Stations", color=config.BOT_COLOR)
+        for station in stations[:25]:
+            now_playing = station.current_track.title if station.current_track else "Starting up..."
+            embed.add_field(
+                name=station.name,
+                value=f"🎵 {now_playing}\n👥 {len(station.subscribers)} listening • 📋 {len(station.queue)} tracks",
+                inline=False
+            )
+        await ctx.send(embed=embed)
 
 
 # ═══════════════════════════════════════════════════════════════
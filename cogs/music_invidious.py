@@ -14,6 +14,7 @@ from discord.ext import commands, tasks
 import yt_dlp
 
 import config
+from core.supervisor import get_ffmpeg_supervisor
 
 logger = logging.getLogger('ShlokMusic')
 
@@ -102,11 +103,11 @@ class Song:
         
         return None
     
-    def create_source(self) -> Optional[discord.FFmpegPCMAudio]:
+    async def create_source(self, guild_id: int = None) -> Optional[discord.FFmpegPCMAudio]:
         if not self.stream_url:
             return None
         try:
-            return discord.FFmpegPCMAudio(self.stream_url, **FFMPEG_OPTIONS)
+            return await get_ffmpeg_supervisor().spawn(guild_id, self.stream_url, **FFMPEG_OPTIONS)
         except Exception as e:
             logger.error(f"FFmpeg error: {e}")
             return None
@@ -291,7 +292,7 @@ class MusicInvidious(commands.Cog):
                 embed.add_field(name="Duration", value=song.duration_str, inline=False)
                 await interaction.followup.send(embed=embed)
             else:
-                source = song.create_source()
+                source = await song.create_source(interaction.guild.id)
                 if not source:
                     return await interaction.followup.send("❌ **FFmpeg error!**", ephemeral=True)
                 
@@ -5,6 +5,7 @@ High-quality audio streaming with Lavalink backend
 
 import asyncio
 import logging
+from collections import deque
 from typing import Optional, cast
 from datetime import timedelta
 
@@ -32,7 +33,7 @@ class ShlokPlayer(wavelink.Player):
         self.text_channel: Optional[discord.TextChannel] = None
         self.now_playing_message: Optional[discord.Message] = None
         self.dj: Optional[discord.Member] = None
-        self.history: list = []
+        self.history: deque = deque(maxlen=50)
         self.effect: str = "none"
 
 # ═══════════════════════════════════════════════════════════════
@@ -188,8 +189,6 @@ class MusicNew(commands.Cog, name="Music"):
         # Add to history
         if payload.track:
             player.history.append(payload.track)
-            if len(player.history) > 50:
-                player.history.pop(0)
         
         # Play next track
         if not player.queue.is_empty:
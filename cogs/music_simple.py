@@ -5,149 +5,43 @@ Advanced Discord Music Bot with Beautiful UI
 
 import asyncio
 import logging
-from typing import Optional
-import random
-from datetime import datetime
 
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
-import yt_dlp
 
 import config
+from core.player import LoopMode, MusicPlayer
+from core.track import TrackExtractor
+from utils.controls import ControlButtons
 
 logger = logging.getLogger('ShlokMusic')
 
-# ═══════════════════════════════════════════════════════════════
-# 🎵 AUDIO SETTINGS - HIGH QUALITY
-# ═══════════════════════════════════════════════════════════════
-
-YTDL_OPTIONS = {
-    'format': 'bestaudio[acodec=opus]/bestaudio[acodec=aac]/bestaudio/best',
-    'noplaylist': True,
-    'nocheckcertificate': True,
-    'ignoreerrors': False,
-    'logtostderr': False,
-    'quiet': True,
-    'no_warnings': True,
-    'default_search': 'ytsearch',
-    'source_address': '0.0.0.0',
-    'extract_flat': False,
-    'cachedir': False,
-    'geo_bypass': True,
-    'socket_timeout': 15,
-    'retries': 3,
-}
-
-FFMPEG_OPTIONS = {
-    'before_options': '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 10 -nostdin',
-    'options': '-vn'
-}
-
-ytdl = yt_dlp.YoutubeDL(YTDL_OPTIONS)
+# Now playing controls, in the order they are shown
+CONTROL_EMOJIS = ['⏯️', '⏭️', '⏹️', '🔀', '🔁', '🔉', '🔊']
 
 
 # ═══════════════════════════════════════════════════════════════
-# 🎵 SONG CLASS
+# 🎵 MUSIC PLAYER CLASS
 # ═══════════════════════════════════════════════════════════════
 
-class Song:
-    def __init__(self, data: dict, requester: discord.Member):
-        self.data = data
-        self.requester = requester
-        self.title = data.get('title', 'Unknown')
-        self.url = data.get('webpage_url', data.get('url', ''))
-        self.duration = data.get('duration', 0)
-        self.thumbnail = data.get('thumbnail', '')
-        self.artist = data.get('uploader', data.get('artist', 'Unknown'))
-        self.stream_url = self._get_stream_url(data)
-    
-    def _get_stream_url(self, data: dict) -> str:
-        if data.get('url') and 'manifest' not in data.get('url', ''):
-            return data['url']
-        
-        formats = data.get('formats', [])
-        if not formats:
-            return data.get('url', '')
-        
-        audio_formats = [f for f in formats if f.get('acodec') != 'none']
-        
-        if not audio_formats:
-            return formats[-1].get('url', '') if formats else ''
-        
-        def score_format(f):
-            codec = f.get('acodec', '')
-            abr = f.get('abr', 0) or f.get('tbr', 0) or 0
-            codec_score = 100 if 'opus' in codec else (80 if 'aac' in codec else 50)
-            vcodec = f.get('vcodec', 'none')
-            video_penalty = 0 if vcodec in ('none', None) else -20
-            return codec_score + abr + video_penalty
-        
-        audio_formats.sort(key=score_format, reverse=True)
-        return audio_formats[0].get('url', '')
+class SimplePlayer(MusicPlayer):
+    """
+    Core music player with this cog's now playing message and controls
+    
+    Created through ``bot.get_player``, so playback, sessions, idle mode
+    and voice reconnects are the core player's; only what the guild sees
+    in chat differs.
+    """
     
     @property
-    def duration_str(self) -> str:
-        if not self.duration:
-            return "🔴 LIVE"
-        m, s = divmod(int(self.duration), 60)
-        h, m = divmod(m, 60)
-        return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
-    
-    def create_source(self) -> Optional[discord.FFmpegPCMAudio]:
-        if not self.stream_url:
-            return None
-        try:
-            return discord.FFmpegPCMAudio(
-                self.stream_url,
-                **FFMPEG_OPTIONS
-            )
-        except Exception as e:
-            logger.error(f"Source creation error: {e}")
-            return None
+    def loop(self) -> bool:
+        """Repeat the current song"""
+        return self.loop_mode == LoopMode.TRACK
     
-    @classmethod
-    async def from_query(cls, query: str, requester: discord.Member, loop=None) -> Optional['Song']:
-        try:
-            def ytdl_extract():
-                with yt_dlp.YoutubeDL(YTDL_OPTIONS) as ydl:
-                    return ydl.extract_info(query, download=False)
-            
-            loop = loop or asyncio.get_event_loop()
-            data = await loop.run_in_executor(None, ytdl_extract)
-            
-            if not data:
-                return None
-            
-            return cls(data, requester)
-        except Exception as e:
-            logger.error(f"Extract error: {e}")
-            return None
-
-
-# ═══════════════════════════════════════════════════════════════
-# 🎵 MUSIC PLAYER CLASS
-# ═══════════════════════════════════════════════════════════════
-
-class MusicPlayer:
-    def __init__(self, ctx: commands.Context):
-        self.bot = ctx.bot
-        self.guild = ctx.guild
-        self.channel = ctx.channel
-        self.voice: Optional[discord.VoiceClient] = ctx.voice_client
-        self.queue: list[Song] = []
-        self.current: Optional[Song] = None
-        self.volume = 0.5
-        self.loop = False
-        self.now_playing_msg: Optional[discord.Message] = None
-    
-    def _create_progress_bar(self, current: int, total: int, length: int = 12) -> str:
-        """Create a visual progress bar"""
-        if total == 0:
-            return "🔴 LIVE"
-        filled = int(length * current / total)
-        bar = "▰" * filled + "▱" * (length - filled)
-        return f"`{bar}`"
+    @loop.setter
+    def loop(self, value: bool):
+        self.loop_mode = LoopMode.TRACK if value else LoopMode.OFF
     
     def _get_volume_emoji(self) -> str:
         """Get volume emoji based on level"""
@@ -160,130 +54,61 @@ class MusicPlayer:
         else:
             return "🔊"
     
-    async def send_action_message(self, action: str, emoji: str = "✅"):
-        """Send a temporary action feedback message"""
+    def _create_now_playing_embed(self) -> discord.Embed:
+        """Create now playing embed"""
+        track = self.current_track
+        
         embed = discord.Embed(
-            description=f"{emoji} **{action}**",
-            color=0x2ECC71
+            title="🎵 Now Playing",
+            description=f"[{track.title}]({track.url})",
+            color=0x3498DB
         )
-        msg = await self.channel.send(embed=embed)
-        await asyncio.sleep(5)
-        try:
-            await msg.delete()
-        except:
-            pass
-    
-    async def play_song(self, song: Song):
-        """Play a specific song"""
-        self.voice = self.guild.voice_client
-        
-        if not self.voice or not self.voice.is_connected():
-            logger.error("Not connected to voice")
-            return
+        embed.add_field(name="⏱️ Duration", value=track.duration_formatted, inline=True)
+        embed.add_field(name="👤 Requested by", value=track.requester.mention if track.requester else "Unknown", inline=True)
+        embed.add_field(name="📊 Queue", value=f"{len(self.queue)} songs", inline=True)
         
-        if self.voice.is_playing():
-            self.voice.stop()
-            await asyncio.sleep(0.5)
+        filled = min(10, int(self.volume * 10))
+        vol_bar = "█" * filled + "░" * (10 - filled)
+        embed.add_field(name=f"{self._get_volume_emoji()} Volume", value=f"`[{vol_bar}] {int(self.volume*100)}%`", inline=False)
         
-        self.current = song
-        
-        try:
-            source = song.create_source()
-            if not source:
-                logger.error(f"No source for: {song.title}")
-                await self.play_next()
-                return
-            
-            source = discord.PCMVolumeTransformer(source, volume=self.volume)
-            
-            def after(error):
-                if error:
-                    logger.error(f"Playback error: {error}")
-                asyncio.run_coroutine_threadsafe(self.play_next(), self.bot.loop)
-            
-            self.voice.play(source, after=after)
-            await self.send_now_playing()
-            
-        except Exception as e:
-            logger.error(f"Play error: {e}")
-            await self.play_next()
-    
-    async def play_next(self):
-        """Play next song in queue"""
-        if not self.queue:
-            self.current = None
-            if self.voice and self.voice.is_playing():
-                self.voice.stop()
-            return
+        if self.loop:
+            embed.add_field(name="🔁 Loop", value="✅ Enabled", inline=True)
         
-        if self.loop and self.current:
-            song = self.current
-        else:
-            song = self.queue.pop(0)
+        if track.thumbnail:
+            embed.set_thumbnail(url=track.thumbnail)
         
-        await self.play_song(song)
+        return embed
     
-    def stop(self):
-        """Stop playback and clear queue"""
-        if self.voice and self.voice.is_playing():
-            self.voice.stop()
-        self.queue.clear()
-        self.current = None
-    
-    async def send_now_playing(self):
+    async def _send_now_playing(self):
         """Send now playing embed"""
-        if not self.current:
+        if not self.text_channel or not self.current_track:
             return
         
         try:
-            embed = discord.Embed(
-                title="🎵 Now Playing",
-                description=f"[{self.current.title}]({self.current.url})",
-                color=0x3498DB
-            )
-            embed.add_field(name="⏱️ Duration", value=self.current.duration_str, inline=True)
-            embed.add_field(name="👤 Requested by", value=self.current.requester.mention, inline=True)
-            embed.add_field(name="📊 Queue", value=f"{len(self.queue)} songs", inline=True)
-            
-            vol_bar = "█" * int(self.volume * 10) + "░" * (10 - int(self.volume * 10))
-            embed.add_field(name=f"{self._get_volume_emoji()} Volume", value=f"`[{vol_bar}] {int(self.volume*100)}%`", inline=False)
-            
-            if self.loop:
-                embed.add_field(name="🔁 Loop", value="✅ Enabled", inline=True)
+            embed = self._create_now_playing_embed()
             
-            if self.current.thumbnail:
-                embed.set_thumbnail(url=self.current.thumbnail)
-            
-            if self.now_playing_msg:
+            if self.now_playing_message:
                 try:
-                    await self.now_playing_msg.delete()
+                    await self.now_playing_message.delete()
                 except:
                     pass
             
-            self.now_playing_msg = await self.channel.send(embed=embed)
+            # Slim gateway mode gets no reaction events, the controls are buttons there
+            if config.GATEWAY.slim:
+                cog = self.bot.get_cog("MusicSimple")
+                self.now_playing_message = await self.text_channel.send(embed=embed, view=cog.controls if cog else None)
+                return
+            
+            self.now_playing_message = await self.text_channel.send(embed=embed)
             
             # Add control reactions
             try:
-                await self.now_playing_msg.add_reaction('⏯️')
-                await self.now_playing_msg.add_reaction('⏭️')
-                await self.now_playing_msg.add_reaction('⏹️')
-                await self.now_playing_msg.add_reaction('🔀')
-                await self.now_playing_msg.add_reaction('🔁')
-                await self.now_playing_msg.add_reaction('🔉')
-                await self.now_playing_msg.add_reaction('🔊')
+                for emoji in CONTROL_EMOJIS:
+                    await self.now_playing_message.add_reaction(emoji)
             except:
                 pass
         except Exception as e:
             logger.error(f"Now playing error: {e}")
-    
-    async def update_now_playing(self):
-        """Update now playing embed"""
-        if self.now_playing_msg:
-            try:
-                await self.now_playing_msg.delete()
-            except:
-                pass
-        await self.send_now_playing()
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -293,30 +118,55 @@ class MusicPlayer:
 class MusicSimple(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.players: dict = {}
+        self.controls = ControlButtons("shlok:simple", CONTROL_EMOJIS, self._on_control_button)
         self.voice_check.start()
     
+    async def cog_load(self):
+        # Players, and the sessions restored after a restart, are ours
+        self.bot.player_class = SimplePlayer
+        
+        if config.GATEWAY.slim:
+            self.bot.add_view(self.controls)
+        
+        state = self.bot.cog_handoff.get(self.qualified_name)
+        if state:
+            self.import_state(state)
+    
     def cog_unload(self):
         self.voice_check.cancel()
+        self.controls.stop()
+        if self.bot.player_class is SimplePlayer:
+            self.bot.player_class = None
+    
+    @property
+    def players(self) -> dict:
+        """This cog's players in ``bot.music_players``"""
+        return {guild_id: player for guild_id, player in self.bot.music_players.items() if isinstance(player, SimplePlayer)}
+    
+    def export_state(self) -> dict:
+        """Live players for the instance that replaces this one (see bot.reload_cog)"""
+        return {"players": self.players}
+    
+    def import_state(self, state: dict):
+        """Take over the players of a reloaded instance as they are"""
+        for player in state["players"].values():
+            # Same objects, moved onto this module's class
+            player.__class__ = SimplePlayer
+        logger.info(f"♻️ Took over {len(state['players'])} players")
     
     @tasks.loop(seconds=60)
     async def voice_check(self):
         """Check if bot should stay in voice"""
         try:
-            for guild_id, player in list(self.players.items()):
-                if not player.voice or not player.voice.is_connected():
-                    if guild_id in self.players:
-                        del self.players[guild_id]
+            for guild_id, player in self.players.items():
+                # Anything left to play stays, a dropped connection is reconnected by the heartbeat
+                if player.current_track or player.station or player.queue:
                     continue
                 
-                if not player.voice.is_playing() and not player.voice.is_paused():
-                    if not player.queue:
-                        try:
-                            await player.voice.disconnect()
-                        except:
-                            pass
-                        if guild_id in self.players:
-                            del self.players[guild_id]
+                if player.is_connected:
+                    await player.disconnect()
+                if player.voice_client is None:
+                    self.bot.music_players.pop(guild_id, None)
         except Exception as e:
             logger.error(f"Voice check error: {e}")
     
@@ -324,13 +174,10 @@ class MusicSimple(commands.Cog):
     async def before_voice_check(self):
         await self.bot.wait_until_ready()
     
-    def get_player(self, ctx: commands.Context) -> MusicPlayer:
-        if ctx.guild.id not in self.players:
-            self.players[ctx.guild.id] = MusicPlayer(ctx)
-        else:
-            self.players[ctx.guild.id].voice = ctx.voice_client
-            self.players[ctx.guild.id].channel = ctx.channel
-        return self.players[ctx.guild.id]
+    def get_player(self, ctx: commands.Context) -> SimplePlayer:
+        player = self.bot.get_player(ctx.guild.id)
+        player.text_channel = ctx.channel
+        return player
     
     async def delete_after(self, message, delay: int = 5):
         """Delete message after delay"""
@@ -354,19 +201,12 @@ class MusicSimple(commands.Cog):
             await ctx.send(embed=embed, delete_after=5)
             return False
         
-        if not ctx.voice_client:
-            try:
-                await channel.connect(timeout=30.0, reconnect=True, self_deaf=True)
-            except Exception as e:
-                logger.error(f"Connect error: {e}")
+        player = self.get_player(ctx)
+        if not player.is_connected or player.voice_client.channel != channel:
+            if not await player.connect(channel):
                 embed = discord.Embed(description="❌ **Could not connect to voice!**", color=0xE74C3C)
                 await ctx.send(embed=embed, delete_after=5)
                 return False
-        elif ctx.voice_client.channel != channel:
-            try:
-                await ctx.voice_client.move_to(channel)
-            except:
-                pass
         
         return True
     
@@ -395,31 +235,25 @@ class MusicSimple(commands.Cog):
             loading = await ctx.send(embed=embed)
         
         try:
-            song = await Song.from_query(query, ctx.author, self.bot.loop)
+            tracks = await TrackExtractor.search(query, requester=ctx.author, limit=1)
             
-            if not song:
+            if not tracks:
                 embed = discord.Embed(description="❌ **No results found!**", color=0xE74C3C)
                 await loading.edit(embed=embed)
                 asyncio.create_task(self.delete_after(loading, 5))
                 return
             
-            if not song.stream_url:
-                embed = discord.Embed(description="❌ **Could not get audio stream!**", color=0xE74C3C)
-                await loading.edit(embed=embed)
-                asyncio.create_task(self.delete_after(loading, 5))
-                return
+            track = tracks[0]
             
-            vc = ctx.voice_client
-            
-            if vc and (vc.is_playing() or vc.is_paused()):
+            if player.is_playing or player.is_paused:
                 # Add to queue
-                player.queue.append(song)
+                player.queue.add(track)
                 embed = discord.Embed(color=0x2ECC71)
                 embed.description = f"✅ **Added to Queue** • Position #{len(player.queue)}\n\n"
-                embed.description += f"🎵 **[{song.title}]({song.url})**\n"
-                embed.description += f"```yaml\nDuration: {song.duration_str}\n```"
-                if song.thumbnail:
-                    embed.set_thumbnail(url=song.thumbnail)
+                embed.description += f"🎵 **[{track.title}]({track.url})**\n"
+                embed.description += f"```yaml\nDuration: {track.duration_formatted}\n```"
+                if track.thumbnail:
+                    embed.set_thumbnail(url=track.thumbnail)
                 await loading.edit(embed=embed)
                 asyncio.create_task(self.delete_after(loading, 10))
             else:
@@ -428,7 +262,7 @@ class MusicSimple(commands.Cog):
                     await loading.delete()
                 except:
                     pass
-                await player.play_song(song)
+                await player.play(track)
         
         except Exception as e:
             logger.error(f"Play error: {e}")
@@ -444,43 +278,40 @@ class MusicSimple(commands.Cog):
     
     @commands.hybrid_command(name="pause", description="⏸️ Pause playback")
     async def pause(self, ctx: commands.Context):
-        vc = ctx.voice_client
-        if not vc or not vc.is_playing():
+        player = self.get_player(ctx)
+        if player.is_paused or not player.pause():
             embed = discord.Embed(description="❌ **Nothing is playing!**", color=0xE74C3C)
             return await ctx.send(embed=embed, delete_after=5)
-        vc.pause()
         embed = discord.Embed(description="⏸️ **Paused playback**", color=0xF39C12)
         await ctx.send(embed=embed, delete_after=5)
     
     @commands.hybrid_command(name="resume", description="▶️ Resume playback")
     async def resume(self, ctx: commands.Context):
-        vc = ctx.voice_client
-        if not vc or not vc.is_paused():
+        player = self.get_player(ctx)
+        if not player.is_paused or not await player.resume():
             embed = discord.Embed(description="❌ **Not paused!**", color=0xE74C3C)
             return await ctx.send(embed=embed, delete_after=5)
-        vc.resume()
         embed = discord.Embed(description="▶️ **Resumed playback**", color=0x2ECC71)
         await ctx.send(embed=embed, delete_after=5)
     
     @commands.hybrid_command(name="skip", aliases=["s", "next"], description="⏭️ Skip song")
     async def skip(self, ctx: commands.Context):
-        vc = ctx.voice_client
-        if not vc or not (vc.is_playing() or vc.is_paused()):
+        player = self.get_player(ctx)
+        if not player.current_track:
             embed = discord.Embed(description="❌ **Nothing to skip!**", color=0xE74C3C)
             return await ctx.send(embed=embed, delete_after=5)
-        player = self.get_player(ctx)
         player.loop = False
-        vc.stop()
+        await player.skip()
         embed = discord.Embed(description="⏭️ **Skipped to next song**", color=0x3498DB)
         await ctx.send(embed=embed, delete_after=5)
     
     @commands.hybrid_command(name="stop", description="⏹️ Stop and clear queue")
     async def stop(self, ctx: commands.Context):
-        vc = ctx.voice_client
-        if not vc:
+        player = self.get_player(ctx)
+        if not player.is_connected:
             embed = discord.Embed(description="❌ **Not connected!**", color=0xE74C3C)
             return await ctx.send(embed=embed, delete_after=5)
-        self.get_player(ctx).stop()
+        player.stop()
         embed = discord.Embed(description="⏹️ **Stopped playback and cleared queue**", color=0xE74C3C)
         await ctx.send(embed=embed, delete_after=5)
     
@@ -490,27 +321,25 @@ class MusicSimple(commands.Cog):
         
         embed = discord.Embed(title="📋 Music Queue", color=0x9B59B6)
         
-        if player.current:
+        if player.current_track:
             status = "🔁 " if player.loop else "▶️ "
             embed.add_field(
                 name=f"{status} Now Playing",
-                value=f"**{player.current.title}**\n`{player.current.duration_str}`",
+                value=f"**{player.current_track.title}**\n`{player.current_track.duration_formatted}`",
                 inline=False
             )
         
         if player.queue:
             queue_list = []
-            total_duration = 0
-            for i, song in enumerate(player.queue[:10], 1):
-                queue_list.append(f"` {i} ` **{song.title[:40]}** `{song.duration_str}`")
-                if song.duration:
-                    total_duration += song.duration
+            for i, track in enumerate(player.queue.get_list(0, 10), 1):
+                queue_list.append(f"` {i} ` **{track.title[:40]}** `{track.duration_formatted}`")
             
             if len(player.queue) > 10:
                 queue_list.append(f"\n*... and {len(player.queue) - 10} more songs*")
             
             embed.add_field(name="📋 Up Next", value="\n".join(queue_list), inline=False)
             
+            total_duration = player.queue.get_total_duration()
             if total_duration:
                 m, s = divmod(total_duration, 60)
                 h, m = divmod(m, 60)
@@ -527,7 +356,8 @@ class MusicSimple(commands.Cog):
         player = self.get_player(ctx)
         
         if level is None:
-            vol_bar = "█" * int(player.volume * 10) + "░" * (10 - int(player.volume * 10))
+            filled = min(10, int(player.volume * 10))
+            vol_bar = "█" * filled + "░" * (10 - filled)
             embed = discord.Embed(
                 description=f"🔊 **Volume:** `{int(player.volume*100)}%`\n`[{vol_bar}]`",
                 color=0x9B59B6
@@ -535,12 +365,9 @@ class MusicSimple(commands.Cog):
             return await ctx.send(embed=embed, delete_after=10)
         
         level = max(0, min(100, level))
-        player.volume = level / 100
+        player.set_volume(level)
         
-        if ctx.voice_client and ctx.voice_client.source:
-            ctx.voice_client.source.volume = player.volume
-        
-        vol_bar = "█" * int(player.volume * 10) + "░" * (10 - int(player.volume * 10))
+        vol_bar = "█" * (level // 10) + "░" * (10 - level // 10)
         embed = discord.Embed(
             description=f"🔊 **Volume set to** `{level}%`\n`[{vol_bar}]`",
             color=0x2ECC71
@@ -552,13 +379,10 @@ class MusicSimple(commands.Cog):
     async def volumeup(self, ctx: commands.Context):
         player = self.get_player(ctx)
         old_vol = int(player.volume * 100)
-        player.volume = min(1.0, player.volume + 0.1)
-        new_vol = int(player.volume * 100)
-        
-        if ctx.voice_client and ctx.voice_client.source:
-            ctx.voice_client.source.volume = player.volume
+        new_vol = min(100, old_vol + 10)
+        player.set_volume(new_vol)
         
-        vol_bar = "█" * int(player.volume * 10) + "░" * (10 - int(player.volume * 10))
+        vol_bar = "█" * (new_vol // 10) + "░" * (10 - new_vol // 10)
         embed = discord.Embed(
             description=f"🔊 **Volume:** `{old_vol}%` → `{new_vol}%`\n`[{vol_bar}]`",
             color=0x2ECC71
@@ -570,13 +394,10 @@ class MusicSimple(commands.Cog):
     async def volumedown(self, ctx: commands.Context):
         player = self.get_player(ctx)
         old_vol = int(player.volume * 100)
-        player.volume = max(0.0, player.volume - 0.1)
-        new_vol = int(player.volume * 100)
-        
-        if ctx.voice_client and ctx.voice_client.source:
-            ctx.voice_client.source.volume = player.volume
+        new_vol = max(0, old_vol - 10)
+        player.set_volume(new_vol)
         
-        vol_bar = "█" * int(player.volume * 10) + "░" * (10 - int(player.volume * 10))
+        vol_bar = "█" * (new_vol // 10) + "░" * (10 - new_vol // 10)
         embed = discord.Embed(
             description=f"🔉 **Volume:** `{old_vol}%` → `{new_vol}%`\n`[{vol_bar}]`",
             color=0xF39C12
@@ -601,17 +422,17 @@ class MusicSimple(commands.Cog):
         if len(player.queue) < 2:
             embed = discord.Embed(description="❌ **Need 2+ songs to shuffle!**", color=0xE74C3C)
             return await ctx.send(embed=embed, delete_after=5)
-        random.shuffle(player.queue)
+        player.queue.shuffle()
         embed = discord.Embed(description=f"🔀 **Shuffled {len(player.queue)} songs!**", color=0x2ECC71)
         await ctx.send(embed=embed, delete_after=5)
     
     @commands.hybrid_command(name="np", aliases=["nowplaying", "current"], description="🎵 Now playing")
     async def np(self, ctx: commands.Context):
         player = self.get_player(ctx)
-        if not player.current:
+        if not player.current_track:
             embed = discord.Embed(description="❌ **Nothing playing!**", color=0xE74C3C)
             return await ctx.send(embed=embed, delete_after=5)
-        await player.send_now_playing()
+        await player._send_now_playing()
     
     @commands.hybrid_command(name="clear", description="🗑️ Clear queue")
     async def clear(self, ctx: commands.Context):
@@ -629,21 +450,21 @@ class MusicSimple(commands.Cog):
             embed = discord.Embed(description=f"❌ **Invalid position!** Queue has {len(player.queue)} songs.", color=0xE74C3C)
             return await ctx.send(embed=embed, delete_after=5)
         
-        removed = player.queue.pop(position - 1)
+        removed = player.queue.remove(position - 1)
         embed = discord.Embed(description=f"🗑️ **Removed:** {removed.title}", color=0xF39C12)
         await ctx.send(embed=embed, delete_after=5)
     
     @commands.hybrid_command(name="leave", aliases=["dc", "disconnect"], description="👋 Leave voice")
     async def leave(self, ctx: commands.Context):
-        if not ctx.voice_client:
+        player = self.bot.music_players.get(ctx.guild.id)
+        if not player or not player.is_connected:
             embed = discord.Embed(description="❌ **Not connected!**", color=0xE74C3C)
             return await ctx.send(embed=embed, delete_after=5)
         
-        if ctx.guild.id in self.players:
-            self.players[ctx.guild.id].stop()
-            del self.players[ctx.guild.id]
+        # Leaving on purpose also drops the saved session
+        await player.disconnect()
+        self.bot.music_players.pop(ctx.guild.id, None)
         
-        await ctx.voice_client.disconnect()
         embed = discord.Embed(description="👋 **Disconnected from voice!**", color=0x3498DB)
         await ctx.send(embed=embed, delete_after=5)
     
@@ -655,14 +476,28 @@ class MusicSimple(commands.Cog):
         
         channel = ctx.author.voice.channel
         
-        if ctx.voice_client:
-            await ctx.voice_client.move_to(channel)
-        else:
-            await channel.connect(timeout=30.0, reconnect=True, self_deaf=True)
+        if not await self.get_player(ctx).connect(channel):
+            embed = discord.Embed(description="❌ **Could not connect to voice!**", color=0xE74C3C)
+            return await ctx.send(embed=embed, delete_after=5)
         
         embed = discord.Embed(description=f"🔗 **Connected to** `{channel.name}`", color=0x2ECC71)
         await ctx.send(embed=embed, delete_after=5)
     
+    # ═══════════════════════════════════════════════════════════════
+    # 🔊 VOICE EVENTS
+    # ═══════════════════════════════════════════════════════════════
+    
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
+        """Suspend players nobody is listening to and wake them when someone returns"""
+        player = self.players.get(member.guild.id)
+        if not player or not player.voice_client:
+            return
+        
+        channel = player.voice_client.channel
+        if member.id == self.bot.user.id or channel in (before.channel, after.channel):
+            player.listeners_changed()
+    
     # ═══════════════════════════════════════════════════════════════
     # 🎮 REACTION CONTROLS
     # ═══════════════════════════════════════════════════════════════
@@ -673,14 +508,13 @@ class MusicSimple(commands.Cog):
             return
         
         player = self.players.get(reaction.message.guild.id)
-        if not player or not player.now_playing_msg:
+        if not player or not player.now_playing_message:
             return
         
-        if reaction.message.id != player.now_playing_msg.id:
+        if reaction.message.id != player.now_playing_message.id:
             return
         
-        vc = reaction.message.guild.voice_client
-        if not vc:
+        if not player.is_connected:
             return
         
         # Remove user's reaction
@@ -689,21 +523,32 @@ class MusicSimple(commands.Cog):
         except:
             pass
         
-        emoji = str(reaction.emoji)
+        await self._control(player, str(reaction.emoji))
+    
+    async def _on_control_button(self, interaction: discord.Interaction, emoji: str):
+        """Same controls as the reactions, pressed as buttons"""
+        player = self.players.get(interaction.guild_id)
+        if not player or not player.is_connected or not player.now_playing_message or player.now_playing_message.id != interaction.message.id:
+            await interaction.response.send_message("❌ This player has ended.", ephemeral=True)
+            return
+        
+        await interaction.response.defer()
+        await self._control(player, emoji)
+    
+    async def _control(self, player: SimplePlayer, emoji: str):
         action_msg = None
         
         # Handle controls with feedback messages
         if emoji == '⏯️':
-            if vc.is_paused():
-                vc.resume()
-                action_msg = "▶️ **Resumed playback**"
-            elif vc.is_playing():
-                vc.pause()
+            if player.is_paused:
+                if await player.resume():
+                    action_msg = "▶️ **Resumed playback**"
+            elif player.pause():
                 action_msg = "⏸️ **Paused playback**"
         
         elif emoji == '⏭️':
             player.loop = False
-            vc.stop()
+            await player.skip()
             action_msg = "⏭️ **Skipped to next song**"
         
         elif emoji == '⏹️':
@@ -712,7 +557,7 @@ class MusicSimple(commands.Cog):
         
         elif emoji == '🔀':
             if len(player.queue) >= 2:
-                random.shuffle(player.queue)
+                player.queue.shuffle()
                 action_msg = f"🔀 **Shuffled {len(player.queue)} songs**"
                 await player.update_now_playing()
         
@@ -726,26 +571,22 @@ class MusicSimple(commands.Cog):
         
         elif emoji == '🔉':
             old_vol = int(player.volume * 100)
-            player.volume = max(0.0, player.volume - 0.1)
-            new_vol = int(player.volume * 100)
-            if vc.source:
-                vc.source.volume = player.volume
+            new_vol = max(0, old_vol - 10)
+            player.set_volume(new_vol)
             action_msg = f"🔉 **Volume:** `{old_vol}%` → `{new_vol}%`"
             await player.update_now_playing()
         
         elif emoji == '🔊':
             old_vol = int(player.volume * 100)
-            player.volume = min(1.0, player.volume + 0.1)
-            new_vol = int(player.volume * 100)
-            if vc.source:
-                vc.source.volume = player.volume
+            new_vol = min(100, old_vol + 10)
+            player.set_volume(new_vol)
             action_msg = f"🔊 **Volume:** `{old_vol}%` → `{new_vol}%`"
             await player.update_now_playing()
         
         # Send feedback message
-        if action_msg:
+        if action_msg and player.text_channel:
             embed = discord.Embed(description=action_msg, color=0x2ECC71)
-            msg = await player.channel.send(embed=embed)
+            msg = await player.text_channel.send(embed=embed)
             await asyncio.sleep(5)
             try:
                 await msg.delete()
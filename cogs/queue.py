@@ -12,7 +12,10 @@ from discord import app_commands
 from discord.ext import commands
 
 import config
-from core import TrackExtractor
+from core import TrackExtractor, get_cache_warmer
+from core.history import get_play_log
+from core.playlists import PlaylistError, get_playlist_store
+from utils.controls import ChoicePrompt
 
 logger = logging.getLogger('ShlokMusic.Queue')
 
@@ -121,24 +124,19 @@ class Queue(commands.Cog, name="Queue"):
         embed.add_field(name="⏱️ Duration", value=duration_str, inline=True)
         embed.add_field(name="🔄 Loop", value=loop_str, inline=True)
         
-        embed.set_footer(text=f"Use the reactions to navigate • Volume: {int(player.volume * 100)}%")
+        embed.set_footer(text=f"Use the {'buttons' if config.GATEWAY.slim else 'reactions'} to navigate • Volume: {int(player.volume * 100)}%")
         
         # Send and add pagination reactions
         message = await ctx.send(embed=embed)
         
         if total_pages > 1:
             reactions = ["⏮️", "◀️", "▶️", "⏭️", "🗑️"]
-            for emoji in reactions:
-                await message.add_reaction(emoji)
-            
-            def check(reaction, user):
-                return user == ctx.author and reaction.message.id == message.id and str(reaction.emoji) in reactions
+            prompt = ChoicePrompt(self.bot, message, ctx.author, reactions)
+            await prompt.start()
             
             while True:
                 try:
-                    reaction, user = await self.bot.wait_for('reaction_add', timeout=60.0, check=check)
-                    
-                    emoji = str(reaction.emoji)
+                    emoji = await prompt.wait(timeout=60.0)
                     
                     if emoji == "⏮️":
                         page = 1
@@ -174,13 +172,10 @@ class Queue(commands.Cog, name="Queue"):
                         )
                     
                     await message.edit(embed=embed)
-                    await message.remove_reaction(reaction, user)
+                    await prompt.rearm(emoji)
                     
                 except asyncio.TimeoutError:
-                    try:
-                        await message.clear_reactions()
-                    except:
-                        pass
+                    await prompt.clear()
                     break
     
     # ═══════════════════════════════════════════════════════════
@@ -627,14 +622,343 @@ class Queue(commands.Cog, name="Queue"):
             await ctx.send(embed=embed, delete_after=5)
             return
         
-        # Save queue (would normally save to database/file)
-        # For now, just acknowledge
+        tracks = ([player.current_track] if player.current_track else []) + player.queue.get_all()
+        try:
+            info = await asyncio.to_thread(get_playlist_store().save, ctx.author.id, name, tracks)
+        except PlaylistError as e:
+            embed = discord.Embed(title="❌ Can't Save", description=str(e), color=config.BOT_COLOR_ERROR)
+            await ctx.send(embed=embed, delete_after=10)
+            return
+        
+        # Saved playlists get replayed, cache their tracks in the background
+        warmer = get_cache_warmer()
+        if warmer:
+            warmer.submit_playlist(tracks)
+        
         embed = discord.Embed(
             title="💾 Queue Saved",
-            description=f"Saved **{len(player.queue)}** tracks as **{name}**",
+            description=f"Saved **{info.tracks}** tracks as **{info.name}**\n"
+                        f"Load it any time with `!playlist load {info.name}`",
             color=config.BOT_COLOR_SUCCESS
         )
         await ctx.send(embed=embed, delete_after=10)
+    
+    # ═══════════════════════════════════════════════════════════
+    # 📁 SAVED PLAYLISTS
+    # ═══════════════════════════════════════════════════════════
+    
+    @commands.hybrid_group(
+        name="playlist",
+        aliases=["pl", "playlists"],
+        description="Manage your saved playlists"
+    )
+    async def playlist(self, ctx: commands.Context):
+        """Manage your saved playlists"""
+        if ctx.invoked_subcommand is None:
+            await self.playlist_list(ctx)
+    
+    @playlist.command(name="list", description="Show your saved playlists")
+    async def playlist_list(self, ctx: commands.Context):
+        """Show your saved playlists"""
+        playlists = await asyncio.to_thread(get_playlist_store().list, ctx.author.id)
+        
+        if not playlists:
+            embed = discord.Embed(
+                title="📁 No Playlists",
+                description="Save the current queue with `!savequeue <name>`",
+                color=config.BOT_COLOR_INFO
+            )
+            await ctx.send(embed=embed, delete_after=15)
+            return
+        
+        description = ""
+        for info in playlists[:25]:
+            hours, remainder = divmod(info.duration, 3600)
+            duration = f"{hours}h {remainder // 60}m" if hours else f"{remainder // 60}m {remainder % 60}s"
+            description += f"**{info.name}** • {info.tracks} tracks • ⏱️ {duration}\n"
+        
+        embed = discord.Embed(
+            title=f"📁 {ctx.author.display_name}'s Playlists",
+            description=description,
+            color=config.BOT_COLOR
+        )
+        embed.set_footer(text="!playlist load <name> • !playlist show <name> • !playlist delete <name>")
+        await ctx.send(embed=embed, delete_after=60)
+    
+    @playlist.command(name="load", aliases=["play"], description="Add a saved playlist to the queue")
+    @app_commands.describe(name="Playlist name")
+    async def playlist_load(self, ctx: commands.Context, *, name: str):
+        """Add one of your saved playlists to the queue"""
+        if not ctx.author.voice:
+            embed = discord.Embed(
+                title="❌ Not Connected",
+                description="You need to be in a voice channel!",
+                color=config.BOT_COLOR_ERROR
+            )
+            await ctx.send(embed=embed, delete_after=5)
+            return
+        
+        try:
+            tracks = await asyncio.to_thread(get_playlist_store().load, ctx.author.id, name, ctx.author)
+        except PlaylistError as e:
+            embed = discord.Embed(title="❌ Playlist Not Found", description=str(e), color=config.BOT_COLOR_ERROR)
+            await ctx.send(embed=embed, delete_after=10)
+            return
+        
+        player = self.get_player(ctx)
+        if not player.is_connected and not await player.connect(ctx.author.voice.channel):
+            embed = discord.Embed(
+                title="❌ Connection Failed",
+                description="Failed to connect to the voice channel. Please try again.",
+                color=config.BOT_COLOR_ERROR
+            )
+            await ctx.send(embed=embed, delete_after=10)
+            return
+        player.text_channel = ctx.channel
+        
+        skipped = max(0, len(tracks) - player.queue_space)
+        if skipped:
+            tracks = tracks[:player.queue_space]
+        player.queue.add_multiple(tracks)
+        
+        embed = discord.Embed(
+            title="📁 Playlist Loaded",
+            description=f"Added **{len(tracks)}** tracks from **{name}** to the queue"
+            + (f" ({skipped} left out, the queue is full)" if skipped else ""),
+            color=config.BOT_COLOR_SUCCESS
+        )
+        await ctx.send(embed=embed, delete_after=10)
+        
+        if not player.is_playing and not player.current_track:
+            await player.play_next()
+    
+    @playlist.command(name="show", description="Show the tracks of a saved playlist")
+    @app_commands.describe(name="Playlist name", page="Page number to display")
+    async def playlist_show(self, ctx: commands.Context, name: str, page: int = 1):
+        """Show one page of a saved playlist"""
+        store = get_playlist_store()
+        info = await asyncio.to_thread(store.get, ctx.author.id, name)
+        if not info:
+            embed = discord.Embed(
+                title="❌ Playlist Not Found",
+                description=f"You have no playlist named **{name}**",
+                color=config.BOT_COLOR_ERROR
+            )
+            await ctx.send(embed=embed, delete_after=10)
+            return
+        
+        per_page = 10
+        total_pages = max(1, (info.tracks + per_page - 1) // per_page)
+        page = max(1, min(page, total_pages))
+        start = (page - 1) * per_page
+        
+        # Only this page is read from disk
+        tracks = await asyncio.to_thread(lambda: list(store.iter_tracks(ctx.author.id, name, offset=start, limit=per_page)))
+        
+        description = ""
+        for i, track in enumerate(tracks, start=start + 1):
+            duration = track.duration_formatted if track.duration else "Live"
+            description += f"`{i}.` [{track.title}]({track.url}) • {duration}\n"
+        
+        embed = discord.Embed(
+            title=f"📁 {info.name}",
+            description=description or "This playlist is empty",
+            color=config.BOT_COLOR
+        )
+        embed.set_footer(text=f"Page {page}/{total_pages} • {info.tracks} tracks")
+        await ctx.send(embed=embed, delete_after=60)
+    
+    @playlist.command(name="add", description="Add the current track to a saved playlist")
+    @app_commands.describe(name="Playlist name")
+    async def playlist_add(self, ctx: commands.Context, *, name: str):
+        """Add the current track to a playlist (created if it doesn't exist)"""
+        player = self.get_player(ctx)
+        
+        if not player.current_track:
+            embed = discord.Embed(
+                title="❌ Nothing Playing",
+                description="Play something first, then add it to a playlist!",
+                color=config.BOT_COLOR_ERROR
+            )
+            await ctx.send(embed=embed, delete_after=5)
+            return
+        
+        track = player.current_track
+        try:
+            info = await asyncio.to_thread(get_playlist_store().append, ctx.author.id, name, [track])
+        except PlaylistError as e:
+            embed = discord.Embed(title="❌ Can't Add", description=str(e), color=config.BOT_COLOR_ERROR)
+            await ctx.send(embed=embed, delete_after=10)
+            return
+        
+        embed = discord.Embed(
+            title="➕ Added to Playlist",
+            description=f"**[{track.title}]({track.url})** → **{info.name}** ({info.tracks} tracks)",
+            color=config.BOT_COLOR_SUCCESS
+        )
+        await ctx.send(embed=embed, delete_after=10)
+    
+    @playlist.command(name="delete", aliases=["remove"], description="Delete a saved playlist")
+    @app_commands.describe(name="Playlist name")
+    async def playlist_delete(self, ctx: commands.Context, *, name: str):
+        """Delete one of your saved playlists"""
+        if not await asyncio.to_thread(get_playlist_store().delete, ctx.author.id, name):
+            embed = discord.Embed(
+                title="❌ Playlist Not Found",
+                description=f"You have no playlist named **{name}**",
+                color=config.BOT_COLOR_ERROR
+            )
+            await ctx.send(embed=embed, delete_after=10)
+            return
+        
+        embed = discord.Embed(
+            title="🗑️ Playlist Deleted",
+            description=f"Deleted **{name}**",
+            color=config.BOT_COLOR_SUCCESS
+        )
+        await ctx.send(embed=embed, delete_after=10)
+    
+    
+    # ═══════════════════════════════════════════════════════════
+    # 📜 PLAY HISTORY
+    # ═══════════════════════════════════════════════════════════
+    
+    @commands.hybrid_command(
+        name="history",
+        aliases=["recent", "played"],
+        description="Show recently played tracks in this server"
+    )
+    @app_commands.describe(page="Page number to display")
+    async def history(self, ctx: commands.Context, page: int = 1):
+        """
+        Show recently played tracks in this server
+        
+        Usage:
+            !history
+            !history 2
+        """
+        play_log = get_play_log()
+        per_page = 10
+        page = max(1, page)
+        records = await play_log.recent(ctx.guild.id, limit=per_page, offset=(page - 1) * per_page) if play_log else []
+        
+        if not records:
+            embed = discord.Embed(
+                title="📜 No History",
+                description="Nothing has been played here yet!" if page == 1 else "No more history.",
+                color=config.BOT_COLOR_INFO
+            )
+            await ctx.send(embed=embed, delete_after=10)
+            return
+        
+        outcome_icons = {"complete": "✅", "skip": "⏭️", "stop": "⏹️", "error": "⚠️"}
+        description = ""
+        for i, record in enumerate(records, (page - 1) * per_page + 1):
+            icon = outcome_icons.get(record.outcome, "")
+            description += f"`{i}.` {icon} [{record.track.title}]({record.track.url}) • <t:{int(record.started_at)}:R>\n"
+        
+        embed = discord.Embed(
+            title="📜 Recently Played",
+            description=description,
+            color=config.BOT_COLOR
+        )
+        embed.set_footer(text=f"Page {page} • !playagain <number> to queue one again")
+        await ctx.send(embed=embed, delete_after=60)
+    
+    @commands.hybrid_command(
+        name="mostplayed",
+        aliases=["topplayed", "top"],
+        description="Show the most played tracks in this server"
+    )
+    async def mostplayed(self, ctx: commands.Context):
+        """Show the most played tracks in this server"""
+        play_log = get_play_log()
+        top = await play_log.most_played(ctx.guild.id, limit=10) if play_log else []
+        
+        if not top:
+            embed = discord.Embed(
+                title="📊 No Plays Yet",
+                description="Nothing has been played here yet!",
+                color=config.BOT_COLOR_INFO
+            )
+            await ctx.send(embed=embed, delete_after=10)
+            return
+        
+        description = ""
+        for i, (track, plays) in enumerate(top, 1):
+            description += f"`{i}.` [{track.title}]({track.url}) • **{plays}** plays\n"
+        
+        embed = discord.Embed(
+            title=f"📊 Most Played in {ctx.guild.name}",
+            description=description,
+            color=config.BOT_COLOR
+        )
+        await ctx.send(embed=embed, delete_after=60)
+    
+    @commands.hybrid_command(
+        name="playagain",
+        aliases=["replay", "again"],
+        description="Queue a track from the history again"
+    )
+    @app_commands.describe(position="Position in !history (default: the last track)")
+    async def playagain(self, ctx: commands.Context, position: int = 1):
+        """
+        Queue a recently played track again
+        
+        Usage:
+            !playagain - The last track
+            !playagain 3 - The third entry of !history
+        """
+        if not ctx.author.voice:
+            embed = discord.Embed(
+                title="❌ Not Connected",
+                description="You need to be in a voice channel!",
+                color=config.BOT_COLOR_ERROR
+            )
+            await ctx.send(embed=embed, delete_after=5)
+            return
+        
+        play_log = get_play_log()
+        track = await play_log.play_again(ctx.guild.id, position, requester=ctx.author) if play_log else None
+        if not track:
+            embed = discord.Embed(
+                title="❌ Not in History",
+                description=f"There's no entry **#{position}** in the history!",
+                color=config.BOT_COLOR_ERROR
+            )
+            await ctx.send(embed=embed, delete_after=5)
+            return
+        
+        player = self.get_player(ctx)
+        if not player.is_connected and not await player.connect(ctx.author.voice.channel):
+            embed = discord.Embed(
+                title="❌ Connection Failed",
+                description="Failed to connect to the voice channel. Please try again.",
+                color=config.BOT_COLOR_ERROR
+            )
+            await ctx.send(embed=embed, delete_after=10)
+            return
+        player.text_channel = ctx.channel
+        
+        if player.queue_space == 0:
+            embed = discord.Embed(
+                title="❌ Queue Full",
+                description=f"The queue is limited to **{player.queue_limit}** tracks on this server",
+                color=config.BOT_COLOR_ERROR
+            )
+            await ctx.send(embed=embed, delete_after=10)
+            return
+        player.queue.add(track)
+        
+        embed = discord.Embed(
+            title="🔁 Queued Again",
+            description=f"**[{track.title}]({track.url})**",
+            color=config.BOT_COLOR_SUCCESS
+        )
+        await ctx.send(embed=embed, delete_after=10)
+        
+        if not player.is_playing and not player.current_track:
+            await player.play_next()
 
 
 # ═══════════════════════════════════════════════════════════════
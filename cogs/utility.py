@@ -14,6 +14,9 @@ from discord import app_commands
 from discord.ext import commands
 
 import config
+from core.analytics import get_analytics
+from core.counters import get_guild_counters
+from core.settings import get_guild_settings
 
 logger = logging.getLogger('ShlokMusic.Utility')
 
@@ -194,6 +197,12 @@ class Utility(commands.Cog, name="Utility"):
         # Count total queue size
         total_queue = sum(len(p.queue) for p in self.bot.music_players.values())
         
+        counters = get_guild_counters()
+        
+        # Lifetime numbers come from the analytics rollups, not from counting
+        analytics = get_analytics()
+        summary = await analytics.summary() if analytics else None
+        
         embed = discord.Embed(
             title="📊 Shlok Music Statistics",
             color=config.BOT_COLOR
@@ -216,23 +225,36 @@ class Utility(commands.Cog, name="Utility"):
         embed.add_field(
             name="📈 Server Stats",
             value=(
-                f"**Servers:** {len(self.bot.guilds):,}\n"
-                f"**Users:** {sum(g.member_count for g in self.bot.guilds):,}\n"
+                f"**Servers:** {counters.guilds:,}\n"
+                f"**Users:** {counters.users:,}\n"
                 f"**Voice Connections:** {voice_connections}"
             ),
             inline=True
         )
         
         # Music stats
-        embed.add_field(
-            name="🎵 Music Stats",
-            value=(
-                f"**Songs Played:** {self.bot.songs_played:,}\n"
-                f"**Commands Used:** {self.bot.commands_used:,}\n"
-                f"**Queue Size:** {total_queue:,}"
-            ),
-            inline=True
-        )
+        if summary:
+            embed.add_field(
+                name="🎵 Music Stats",
+                value=(
+                    f"**Songs Played:** {summary.plays:,} ({summary.plays_24h:,} today)\n"
+                    f"**Listened:** {summary.listened / 3600:,.1f}h\n"
+                    f"**Skipped:** {summary.skips:,}\n"
+                    f"**Commands Used:** {summary.commands:,} ({summary.commands_24h:,} today)\n"
+                    f"**Queue Size:** {total_queue:,}"
+                ),
+                inline=True
+            )
+        else:
+            embed.add_field(
+                name="🎵 Music Stats",
+                value=(
+                    f"**Songs Played:** {self.bot.songs_played:,}\n"
+                    f"**Commands Used:** {self.bot.commands_used:,}\n"
+                    f"**Queue Size:** {total_queue:,}"
+                ),
+                inline=True
+            )
         
         # System info
         embed.add_field(
@@ -270,6 +292,13 @@ class Utility(commands.Cog, name="Utility"):
             inline=True
         )
         
+        if summary and summary.top_tracks:
+            embed.add_field(
+                name="🔥 Top Tracks (7 days)",
+                value="\n".join(f"`{plays}×` {title[:40]}" for title, plays in summary.top_tracks),
+                inline=False
+            )
+        
         embed.set_footer(text=f"Thanks for using {config.BOT_NAME}!")
         
         await ctx.send(embed=embed)
@@ -423,7 +452,8 @@ class Utility(commands.Cog, name="Utility"):
     async def settings(self, ctx: commands.Context):
         """View or modify bot settings"""
         if ctx.invoked_subcommand is None:
-            player = self.bot.get_player(ctx.guild.id)
+            settings = get_guild_settings().get(ctx.guild.id)
+            dj_role = ctx.guild.get_role(settings.dj_role_id) if settings.dj_role_id else None
             
             embed = discord.Embed(
                 title="⚙️ Server Settings",
@@ -432,18 +462,33 @@ class Utility(commands.Cog, name="Utility"):
             )
             
             embed.add_field(
-                name="🔊 Volume",
-                value=f"`{int(player.volume * 100)}%`",
+                name="🔊 Default Volume",
+                value=f"`{settings.default_volume}%`",
                 inline=True
             )
             embed.add_field(
                 name="🔄 24/7 Mode",
-                value=f"{'`On`' if player.stay_connected else '`Off`'}",
+                value=f"{'`On`' if settings.stay_connected else '`Off`'}",
+                inline=True
+            )
+            embed.add_field(
+                name="📋 Max Queue",
+                value=f"`{settings.max_queue_size}` tracks",
+                inline=True
+            )
+            embed.add_field(
+                name="🎧 DJ Role",
+                value=dj_role.mention if dj_role else f"`{config.DJ_ROLE_NAME}` (by name)",
                 inline=True
             )
             embed.add_field(
-                name="🔁 Loop Mode",
-                value=f"`{player.loop_mode.name.title()}`",
+                name="🎛️ Default Effect",
+                value=f"`{settings.default_effect}`",
+                inline=True
+            )
+            embed.add_field(
+                name="⌨️ Prefixes",
+                value=" ".join(f"`{p}`" for p in settings.prefixes) if settings.prefixes else "`s!` `$` `!` (default)",
                 inline=True
             )
             
@@ -452,7 +497,10 @@ class Utility(commands.Cog, name="Utility"):
                 value=(
                     "`!settings 247 on/off` - Toggle 24/7 mode\n"
                     "`!settings volume <0-150>` - Default volume\n"
-                    "`!settings dj <role>` - Set DJ role"
+                    "`!settings maxqueue <number>` - Max queue size\n"
+                    "`!settings dj <role>` - Set DJ role\n"
+                    "`!settings effect <name>` - Default effect\n"
+                    "`!settings prefix [prefixes...]` - Command prefixes (none to reset)"
                 ),
                 inline=False
             )
@@ -466,6 +514,7 @@ class Utility(commands.Cog, name="Utility"):
         player = self.bot.get_player(ctx.guild.id)
         
         if mode.lower() in ["on", "enable", "true", "yes"]:
+            get_guild_settings().update(ctx.guild.id, stay_connected=True)
             player.stay_connected = True
             embed = discord.Embed(
                 title="✅ 24/7 Mode Enabled",
@@ -473,6 +522,7 @@ class Utility(commands.Cog, name="Utility"):
                 color=config.BOT_COLOR_SUCCESS
             )
         elif mode.lower() in ["off", "disable", "false", "no"]:
+            get_guild_settings().update(ctx.guild.id, stay_connected=False)
             player.stay_connected = False
             embed = discord.Embed(
                 title="❌ 24/7 Mode Disabled",
@@ -501,6 +551,7 @@ class Utility(commands.Cog, name="Utility"):
             await ctx.send(embed=embed, delete_after=5)
             return
         
+        get_guild_settings().update(ctx.guild.id, default_volume=level)
         player = self.bot.get_player(ctx.guild.id)
         player.set_volume(level)
         
@@ -511,6 +562,82 @@ class Utility(commands.Cog, name="Utility"):
         )
         await ctx.send(embed=embed, delete_after=10)
     
+    @settings.command(name="maxqueue", description="Set the maximum queue size")
+    @commands.has_permissions(manage_guild=True)
+    async def settings_maxqueue(self, ctx: commands.Context, size: int):
+        """Set the maximum queue size"""
+        if size < 1 or size > config.MUSIC.max_saved_playlist_tracks:
+            embed = discord.Embed(
+                title="❌ Invalid Size",
+                description=f"Max queue size must be between 1 and {config.MUSIC.max_saved_playlist_tracks}!",
+                color=config.BOT_COLOR_ERROR
+            )
+            await ctx.send(embed=embed, delete_after=5)
+            return
+        
+        get_guild_settings().update(ctx.guild.id, max_queue_size=size)
+        
+        embed = discord.Embed(
+            title="📋 Max Queue Size Set",
+            description=f"The queue now holds up to **{size}** tracks",
+            color=config.BOT_COLOR_SUCCESS
+        )
+        await ctx.send(embed=embed, delete_after=10)
+    
+    @settings.command(name="dj", description="Set the DJ role")
+    @commands.has_permissions(manage_guild=True)
+    async def settings_dj(self, ctx: commands.Context, role: Optional[discord.Role] = None):
+        """Set the DJ role (no role: back to the role named DJ)"""
+        get_guild_settings().update(ctx.guild.id, dj_role_id=role.id if role else None)
+        
+        embed = discord.Embed(
+            title="🎧 DJ Role Set",
+            description=f"DJ role is now {role.mention}" if role else f"DJ role reset to any role named **{config.DJ_ROLE_NAME}**",
+            color=config.BOT_COLOR_SUCCESS
+        )
+        await ctx.send(embed=embed, delete_after=10)
+    
+    @settings.command(name="effect", description="Set the default audio effect")
+    @commands.has_permissions(manage_guild=True)
+    async def settings_effect(self, ctx: commands.Context, name: str):
+        """Set the effect new players start with"""
+        name = name.lower()
+        if name not in config.AUDIO_EFFECTS:
+            embed = discord.Embed(
+                title="❌ Unknown Effect",
+                description=f"Effect `{name}` not found. Use `!effect` to see available effects.",
+                color=config.BOT_COLOR_ERROR
+            )
+            await ctx.send(embed=embed, delete_after=10)
+            return
+        
+        get_guild_settings().update(ctx.guild.id, default_effect=name)
+        
+        embed = discord.Embed(
+            title="🎛️ Default Effect Set",
+            description=f"New sessions start with **{name}**",
+            color=config.BOT_COLOR_SUCCESS
+        )
+        await ctx.send(embed=embed, delete_after=10)
+    
+    @settings.command(name="prefix", description="Set the command prefixes")
+    @commands.has_permissions(manage_guild=True)
+    @app_commands.describe(prefixes="Prefixes separated by spaces (leave empty for the defaults)")
+    async def settings_prefix(self, ctx: commands.Context, *, prefixes: str = ""):
+        """Set this server's command prefixes (none: back to the defaults)"""
+        prefixes = [p for p in prefixes.split() if len(p) <= 5][:5]
+        get_guild_settings().update(ctx.guild.id, prefixes=prefixes)
+        
+        embed = discord.Embed(
+            title="⌨️ Prefixes Set",
+            description=(
+                "Prefixes are now " + " ".join(f"`{p}`" for p in prefixes)
+                if prefixes else "Prefixes reset to the defaults"
+            ) + " (mentioning me always works)",
+            color=config.BOT_COLOR_SUCCESS
+        )
+        await ctx.send(embed=embed, delete_after=10)
+    
     # ═══════════════════════════════════════════════════════════
     # 🧹 CLEANUP COMMAND
     # ═══════════════════════════════════════════════════════════
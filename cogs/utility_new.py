@@ -12,6 +12,8 @@ from discord import app_commands
 from discord.ext import commands
 
 import config
+from core.analytics import get_analytics
+from core.counters import get_guild_counters
 
 logger = logging.getLogger('ShlokMusic.Utility')
 
@@ -144,8 +146,9 @@ class Utility(commands.Cog, name="Utility"):
             color=config.BOT_COLOR
         )
         
-        embed.add_field(name="📡 Servers", value=f"{len(self.bot.guilds)}", inline=True)
-        embed.add_field(name="👥 Users", value=f"{sum(g.member_count for g in self.bot.guilds):,}", inline=True)
+        counters = get_guild_counters()
+        embed.add_field(name="📡 Servers", value=f"{counters.guilds:,}", inline=True)
+        embed.add_field(name="👥 Users", value=f"{counters.users:,}", inline=True)
         embed.add_field(name="🏓 Latency", value=f"{round(self.bot.latency * 1000)}ms", inline=True)
         embed.add_field(name="⏱️ Uptime", value=uptime_str, inline=True)
         embed.add_field(name="🎧 Voice", value=f"{len(self.bot.voice_clients)} active", inline=True)
@@ -154,6 +157,13 @@ class Utility(commands.Cog, name="Utility"):
         embed.add_field(name="💻 Platform", value=platform.system(), inline=True)
         embed.add_field(name="🎵 Audio", value="Wavelink/Lavalink", inline=True)
         
+        analytics = get_analytics()
+        if analytics:
+            summary = await analytics.summary()
+            embed.add_field(name="🎶 Songs Played", value=f"{summary.plays:,} ({summary.plays_24h:,} today)", inline=True)
+            embed.add_field(name="⌨️ Commands", value=f"{summary.commands:,} ({summary.commands_24h:,} today)", inline=True)
+            embed.add_field(name="🎧 Listened", value=f"{summary.listened / 3600:,.1f}h", inline=True)
+        
         embed.set_thumbnail(url=self.bot.user.display_avatar.url)
         embed.set_footer(text="🎵 24/7 High-Quality Music Streaming")
         
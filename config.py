@@ -30,6 +30,26 @@ BOT_COLOR_ERROR = 0xE74C3C  # Red
 BOT_COLOR_WARNING = 0xF39C12  # Orange
 BOT_COLOR_INFO = 0x3498DB  # Blue
 
+# ═══════════════════════════════════════════════════════════════
+# 🌐 GATEWAY
+# ═══════════════════════════════════════════════════════════════
+
+@dataclass
+class GatewaySettings:
+    """What the bot receives and caches from Discord"""
+    # "full": prefix commands, member cache, reaction controls
+    # "slim": slash commands only, members cached only while in voice, no
+    #         member chunking, buttons instead of reactions (GATEWAY_MODE env var)
+    mode: str = os.environ.get('GATEWAY_MODE', 'full')
+    message_cache: int = 100  # messages kept in slim mode (discord.py default: 1000)
+    mentions: bool = False  # slim mode: still receive messages, to answer mentions and mention-prefixed commands
+    
+    @property
+    def slim(self) -> bool:
+        return self.mode == "slim"
+
+GATEWAY = GatewaySettings()
+
 # ═══════════════════════════════════════════════════════════════
 # 🎵 MUSIC SETTINGS
 # ═══════════════════════════════════════════════════════════════
@@ -37,7 +57,7 @@ BOT_COLOR_INFO = 0x3498DB  # Blue
 @dataclass
 class MusicSettings:
     """Music player configuration"""
-    default_volume: int = 250
+    default_volume: int = 100  # Tracks are loudness-normalized, 100% is the target level
     max_volume: int = 500
     min_volume: int = 0
     
@@ -50,16 +70,124 @@ class MusicSettings:
     default_search_limit: int = 5
     max_playlist_size: int = 100
     
+    # Saved playlists (data/playlists)
+    max_saved_playlists: int = 50  # per user
+    max_saved_playlist_tracks: int = 10000
+    
     # Audio quality
     audio_bitrate: int = 128  # kbps
     audio_sample_rate: int = 48000  # Hz
     
     # Buffer settings for smooth playback
-    buffer_size: int = 32768
+    buffer_size: int = 192000  # bytes of read-ahead PCM per stream (1 second)
     reconnect_attempts: int = 5
+    reconnect_backoff_base: float = 0.25  # seconds, doubled per attempt with full jitter
+    reconnect_backoff_max: float = 8.0
+    
+    # Stream URL watchdog
+    stream_expiry_margin: int = 300  # re-resolve URLs this close to their expire= deadline
+    early_eof_tolerance: float = 5.0  # a track ending this far before its duration was cut off
+    pause_refresh_after: int = 600  # restart the stream when resuming from a longer pause
+    
+    # Listener-aware idle mode: release the stream while the channel is empty
+    listener_aware: bool = True
+    idle_grace_period: int = 60  # seconds without listeners before suspending
+    
+    # Local proxy that fetches streams as parallel byte ranges (throttled hosts)
+    range_proxy: bool = True
+    range_chunk_size: int = 1048576  # bytes per upstream Range request
+    range_concurrency: int = 4  # chunks in flight per stream
+    
+    # FFmpeg process supervision (node-wide cap, stall detection)
+    ffmpeg_max_processes: int = 64
+    ffmpeg_queue_timeout: float = 15.0  # seconds to wait for a free slot
+    ffmpeg_stall_timeout: float = 30.0  # kill a process that produced no audio for this long
+    ffmpeg_poll_interval: float = 5.0
+    
+    # Adaptive quality under CPU pressure
+    quality_governor: bool = True
+    governor_interval: float = 5.0
+    governor_overrun_high: float = 0.02  # share of late ticks/frames that steps quality down
+    governor_overrun_low: float = 0.002
+    governor_load_high: float = 0.9  # 1-minute load average per CPU
+    governor_load_low: float = 0.6
+    governor_recover_after: float = 30.0  # calm seconds before stepping back up
+    
+    # Shared audio send scheduler (one small thread pool for all guilds)
+    shared_scheduler: bool = True
+    scheduler_threads: int = 4
+    
+    # Out-of-process Opus encoding (0 = encode in the bot process)
+    encoder_processes: int = 0
+    encoder_streams_per_process: int = 32
+    
+    # Broadcast stations (one pipeline, many guilds)
+    station_ring_frames: int = 250  # 5 seconds of packets
+    station_jitter_frames: int = 3  # late joiners start this far behind live
+    station_idle_timeout: int = 300  # go off air after 5 minutes without listeners
+    
+    # Loudness normalization (EBU R128, measured once per track)
+    normalize_loudness: bool = True
+    loudness_target: float = -14.0  # LUFS
+    max_normalization_gain: float = 12.0  # dB, cap for quiet tracks
+    unmeasured_gain_db: float = 8.0  # dB until a track is measured, the old 250% default volume
     
 MUSIC = MusicSettings()
 
+# ═══════════════════════════════════════════════════════════════
+# 💾 AUDIO CACHE SETTINGS
+# ═══════════════════════════════════════════════════════════════
+
+@dataclass
+class CacheSettings:
+    """Local Ogg/Opus track cache configuration"""
+    enabled: bool = True
+    max_megabytes: int = 2048  # Disk budget
+    min_plays: int = 2  # Plays before a track gets cached
+    policy: str = "lru"  # Eviction policy: "lru" or "lfu"
+    bitrate: int = 128  # kbps of cached files
+    passthrough: bool = True  # Send cached Opus packets as-is at 100% volume (no FFmpeg)
+    warm_workers: int = 1  # Background transcode processes
+    warm_niceness: int = 10  # CPU niceness of the transcode processes
+    warm_io_idle: bool = True  # Run transcodes in the idle I/O class (ionice -c3)
+    warm_backlog: int = 500  # Max queued warming jobs
+    warm_upcoming: int = 2  # Queued tracks to warm ahead of playback
+
+CACHE = CacheSettings()
+
+# ═══════════════════════════════════════════════════════════════
+# 🗄️ DATABASE & SESSIONS
+# ═══════════════════════════════════════════════════════════════
+
+@dataclass
+class DatabaseSettings:
+    """SQLite store for state that survives restarts"""
+    filename: str = "shlok.db"  # inside DATA_DIR
+    flush_interval: float = 0.5  # seconds writes wait to be batched together
+    batch_size: int = 500  # most writes per transaction
+    
+    # Crash-safe player sessions
+    sessions: bool = True
+    checkpoint_interval: float = 10.0  # seconds between position checkpoints
+    session_max_age: int = 21600  # don't resume sessions older than this (seconds)
+    restore_rate: float = 1.0  # guilds resumed per second after a restart
+    
+    # Favorites
+    max_favorites: int = 5000  # per user
+    favorites_cached_users: int = 1000  # users whose favorite IDs stay in memory
+    
+    # Play history
+    play_log: bool = True
+    play_log_retention_days: int = 90
+    
+    # Analytics rollups (!stats)
+    analytics: bool = True
+    analytics_flush_interval: float = 60.0  # seconds events are counted in memory
+    analytics_minute_retention_days: int = 2
+    analytics_hour_retention_days: int = 90
+
+DATABASE = DatabaseSettings()
+
 # ═══════════════════════════════════════════════════════════════
 # 🎛️ AUDIO EFFECTS PRESETS
 # ═══════════════════════════════════════════════════════════════
@@ -282,3 +410,7 @@ BOT_ACTIVITIES = [
 
 # Activity rotation interval (seconds)
 ACTIVITY_ROTATION_INTERVAL = 30
+
+# Seconds between recounting servers and users from the guild cache
+# (join/leave events keep the counters current in between)
+COUNTER_RECONCILE_INTERVAL = 900
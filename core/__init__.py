@@ -2,14 +2,65 @@
 Core module initialization
 """
 
-from core.player import MusicPlayer, LoopMode
-from core.queue import MusicQueue
-from core.track import Track, TrackExtractor
-
-__all__ = [
-    'MusicPlayer',
-    'LoopMode',
-    'MusicQueue',
-    'Track',
-    'TrackExtractor',
-]
+import importlib
+
+# Public name -> module defining it. Imported on first use, so importing one
+# module of the package doesn't import all the others with it
+_EXPORTS = {
+    'MusicPlayer':           'core.player',
+    'LoopMode':              'core.player',
+    'MusicQueue':            'core.queue',
+    'BufferedAudioSource':   'core.buffer',
+    'AudioScheduler':        'core.scheduler',
+    'ScheduledStream':       'core.scheduler',
+    'get_scheduler':         'core.scheduler',
+    'EncoderPool':           'core.encoder',
+    'get_encoder_pool':      'core.encoder',
+    'QualityGovernor':       'core.governor',
+    'get_quality_governor':  'core.governor',
+    'AudioCache':            'core.cache',
+    'get_audio_cache':       'core.cache',
+    'CacheWarmer':           'core.warmer',
+    'get_cache_warmer':      'core.warmer',
+    'PacketStore':           'core.packet_store',
+    'OpusPacketSource':      'core.packet_store',
+    'get_packet_registry':   'core.packet_store',
+    'FavoritesStore':        'core.favorites',
+    'get_favorites_store':   'core.favorites',
+    'PlayLog':               'core.history',
+    'get_play_log':          'core.history',
+    'PlaylistStore':         'core.playlists',
+    'get_playlist_store':    'core.playlists',
+    'RangeFetchProxy':       'core.proxy',
+    'get_range_proxy':       'core.proxy',
+    'FFmpegSupervisor':      'core.supervisor',
+    'get_ffmpeg_supervisor': 'core.supervisor',
+    'Database':              'core.database',
+    'get_database':          'core.database',
+    'SessionStore':          'core.session',
+    'get_session_store':     'core.session',
+    'Analytics':             'core.analytics',
+    'AnalyticsSummary':      'core.analytics',
+    'get_analytics':         'core.analytics',
+    'GuildCounters':         'core.counters',
+    'get_guild_counters':    'core.counters',
+    'GuildSettings':         'core.settings',
+    'GuildSettingsStore':    'core.settings',
+    'get_guild_settings':    'core.settings',
+    'Station':               'core.station',
+    'StationManager':        'core.station',
+    'get_station_manager':   'core.station',
+    'Track':                 'core.track',
+    'TrackExtractor':        'core.track',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,247 @@
+"""
+📈 Analytics
+Play, skip and command events folded into per-minute/hour/day rollups
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import config
+from core.database import Database, get_database
+from core.history import OUTCOME_COMPLETE, OUTCOME_ERROR, OUTCOME_SKIP
+from core.track import Track
+
+logger = logging.getLogger('ShlokMusic.Analytics')
+
+# Bucket length of each period in seconds ("total" is a single bucket 0)
+PERIODS = {"minute": 60, "hour": 3600, "day": 86400, "total": 0}
+
+# Per-track and per-command rows are only kept at these resolutions
+KEYED_PERIODS = ("day", "total")
+
+# Outcome of a play -> the metric it counts towards
+_OUTCOME_METRICS = {
+    OUTCOME_COMPLETE: "completions",
+    OUTCOME_SKIP: "skips",
+    OUTCOME_ERROR: "errors",
+}
+
+_UPSERT = """
+    INSERT INTO analytics_rollups (period, guild_id, metric, bucket, key, count, seconds, label)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(period, guild_id, metric, bucket, key) DO UPDATE SET
+        count = count + excluded.count,
+        seconds = seconds + excluded.seconds,
+        label = COALESCE(excluded.label, label)
+"""
+
+
+@dataclass
+class AnalyticsSummary:
+    """What !stats shows, for the whole bot (guild 0) or one guild"""
+    plays: int = 0
+    completions: int = 0
+    skips: int = 0
+    errors: int = 0
+    commands: int = 0
+    listened: float = 0.0  # seconds
+    plays_24h: int = 0
+    commands_24h: int = 0
+    plays_hour: int = 0
+    commands_hour: int = 0
+    top_tracks: List[Tuple[str, int]] = field(default_factory=list)  # last 7 days
+    top_commands: List[Tuple[str, int]] = field(default_factory=list)  # last 7 days
+
+
+# ═══════════════════════════════════════════════════════════════
+# 📈 ANALYTICS
+# ═══════════════════════════════════════════════════════════════
+
+class Analytics:
+    """
+    In-memory aggregator in front of the ``analytics_rollups`` table
+    
+    Recording an event only bumps counters in a dict keyed by period,
+    bucket, guild, metric and key (track ID or command name); every event
+    counts for its guild and for the whole bot (guild 0). The dict is
+    written out as one batch of upserts every ``flush_interval`` seconds,
+    so a busy bot costs a few hundred rows a minute, not a row per event.
+    Queries read a handful of rollup rows through the primary key.
+    """
+    
+    def __init__(self, db: Database, flush_interval: float = None):
+        self.db = db
+        self.flush_interval = flush_interval or config.DATABASE.analytics_flush_interval
+        
+        # (period, guild_id, metric, bucket, key) -> [count, seconds, label]
+        self._pending: Dict[tuple, list] = {}
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+        self._last_prune = 0.0
+        
+        # Stats
+        self.events = 0
+        self.flushes = 0
+        self.rows_written = 0
+    
+    # ═══════════════════════════════════════════════════════════
+    # ✏️ EVENTS
+    # ═══════════════════════════════════════════════════════════
+    
+    def _add(self, now: float, guild_id: int, metric: str, key: str = "", label: str = None, seconds: float = 0.0):
+        periods = KEYED_PERIODS if key else PERIODS
+        for guild in ((guild_id, 0) if guild_id else (0,)):
+            for period in periods:
+                size = PERIODS[period]
+                bucket = int(now // size * size) if size else 0
+                entry = self._pending.get((period, guild, metric, bucket, key))
+                if entry is None:
+                    self._pending[(period, guild, metric, bucket, key)] = [1, seconds, label]
+                else:
+                    entry[0] += 1
+                    entry[1] += seconds
+    
+    def record_play(self, guild_id: int, track: Track, played: float, outcome: str):
+        """A play that ended, with the seconds actually heard"""
+        now = time.time()
+        self._add(now, guild_id, "plays", seconds=played)
+        self._add(now, guild_id, "plays", track.track_id, track.title, played)
+        metric = _OUTCOME_METRICS.get(outcome)
+        if metric:
+            self._add(now, guild_id, metric)
+        self.events += 1
+    
+    def record_command(self, guild_id: Optional[int], name: str):
+        now = time.time()
+        self._add(now, guild_id or 0, "commands")
+        self._add(now, guild_id or 0, "commands", name, name)
+        self.events += 1
+    
+    # ═══════════════════════════════════════════════════════════
+    # 💾 FLUSHING
+    # ═══════════════════════════════════════════════════════════
+    
+    def flush(self):
+        """Queue the counted rollups as one batch of upserts"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        self.db.write_many(_UPSERT, [
+            (period, guild, metric, bucket, key, count, round(seconds, 1), label)
+            for (period, guild, metric, bucket, key), (count, seconds, label) in pending.items()
+        ])
+        self._dirty = True
+        self.flushes += 1
+        self.rows_written += len(pending)
+    
+    async def _settle(self):
+        """Make counted events visible to reads"""
+        self.flush()
+        if self._dirty:
+            self._dirty = False
+            await self.db.flush()
+    
+    def prune(self):
+        """Drop minute and hour buckets past their retention (days and totals are kept)"""
+        now = time.time()
+        self._last_prune = now
+        self.db.write(
+            "DELETE FROM analytics_rollups WHERE period = 'minute' AND bucket < ?",
+            (now - config.DATABASE.analytics_minute_retention_days * 86400,),
+        )
+        self.db.write(
+            "DELETE FROM analytics_rollups WHERE period = 'hour' AND bucket < ?",
+            (now - config.DATABASE.analytics_hour_retention_days * 86400,),
+        )
+    
+    def start(self):
+        """Flush every ``flush_interval`` seconds and prune hourly"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_event_loop().create_task(self._run())
+    
+    def stop(self):
+        """Stop the flush task and queue what was counted so far"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        self.flush()
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
+            if time.time() - self._last_prune >= 3600:
+                self.prune()
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🔍 QUERIES
+    # ═══════════════════════════════════════════════════════════
+    
+    async def _sums(self, period: str, guild_id: int, since: float) -> Dict[str, int]:
+        rows = await self.db.fetch_all(
+            "SELECT metric, SUM(count) AS count FROM analytics_rollups "
+            "WHERE period = ? AND guild_id = ? AND metric IN ('plays', 'commands') AND bucket >= ? AND key = '' "
+            "GROUP BY metric",
+            (period, guild_id, since),
+        )
+        return {row["metric"]: row["count"] for row in rows}
+    
+    async def top(self, guild_id: int, metric: str, days: int = 7, limit: int = 5) -> List[Tuple[str, int]]:
+        """Most counted tracks or commands over the last ``days`` days"""
+        await self._settle()
+        rows = await self.db.fetch_all(
+            "SELECT MAX(label) AS label, SUM(count) AS count FROM analytics_rollups "
+            "WHERE period = 'day' AND guild_id = ? AND metric = ? AND bucket >= ? AND key != '' "
+            "GROUP BY key ORDER BY count DESC LIMIT ?",
+            (guild_id, metric, time.time() - days * 86400, limit),
+        )
+        return [(row["label"] or "Unknown", row["count"]) for row in rows]
+    
+    async def summary(self, guild_id: int = 0) -> AnalyticsSummary:
+        """Lifetime totals, recent activity and the week's top tracks and commands"""
+        await self._settle()
+        summary = AnalyticsSummary()
+        
+        rows = await self.db.fetch_all(
+            "SELECT metric, count, seconds FROM analytics_rollups "
+            "WHERE period = 'total' AND guild_id = ? AND bucket = 0 AND key = ''",
+            (guild_id,),
+        )
+        for row in rows:
+            if hasattr(summary, row["metric"]):
+                setattr(summary, row["metric"], row["count"])
+            if row["metric"] == "plays":
+                summary.listened = row["seconds"]
+        
+        now = time.time()
+        day = await self._sums("hour", guild_id, now - 86400)
+        hour = await self._sums("minute", guild_id, now - 3600)
+        summary.plays_24h, summary.commands_24h = day.get("plays", 0), day.get("commands", 0)
+        summary.plays_hour, summary.commands_hour = hour.get("plays", 0), hour.get("commands", 0)
+        
+        summary.top_tracks = await self.top(guild_id, "plays")
+        summary.top_commands = await self.top(guild_id, "commands")
+        return summary
+    
+    def stats(self) -> dict:
+        return {
+            "events": self.events,
+            "pending_rollups": len(self._pending),
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+        }
+
+
+_analytics: Optional[Analytics] = None
+
+
+def get_analytics() -> Optional[Analytics]:
+    """Get the process-wide analytics aggregator (None when disabled)"""
+    global _analytics
+    if (_analytics is None or not _analytics.db.is_open) and config.DATABASE.analytics:
+        _analytics = Analytics(get_database())
+        _analytics.prune()
+    return _analytics
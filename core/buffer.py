@@ -0,0 +1,196 @@
+"""
+🛟 Read-Ahead Buffer
+Decouples slow or bursty sources from the 20 ms send loop
+"""
+
+import logging
+import threading
+import weakref
+from collections import deque
+from typing import Optional
+
+import discord
+from discord import opus
+
+import config
+
+logger = logging.getLogger('ShlokMusic.Buffer')
+
+PCM_SILENCE = b'\x00' * opus.Encoder.FRAME_SIZE
+FRAME_DELAY = opus.Encoder.FRAME_LENGTH / 1000.0
+
+# How long cleanup waits for the feeder's read before cleaning up under it
+FEEDER_GRACE = 0.6
+
+# ═══════════════════════════════════════════════════════════════
+# 🛟 BUFFERED AUDIO SOURCE
+# ═══════════════════════════════════════════════════════════════
+
+class BufferedAudioSource(discord.AudioSource):
+    """
+    Wraps a source with a ring of frames filled by a feeder thread
+    
+    ``read`` never blocks: when the ring is empty it returns a frame of
+    silence and counts an underrun, so an upstream hiccup costs a gap of
+    silence instead of stalling the sender (and, with the shared
+    scheduler, every other stream on the same thread).
+    """
+    
+    # read() never waits, the shared scheduler may call it on a sender thread
+    nonblocking = True
+    
+    # Totals across every buffer since startup
+    total_underruns = 0
+    total_streams = 0
+    
+    def __init__(self, original: discord.AudioSource, capacity: int = None, label: str = None, start_at: float = 0.0):
+        self.original = original
+        self.start_at = start_at
+        self.capacity = max(2, capacity or config.MUSIC.buffer_size // opus.Encoder.FRAME_SIZE)
+        self.label = label
+        
+        self._frames: deque = deque()
+        self._cond = threading.Condition()
+        self._eof = False
+        self._closed = False
+        
+        # Stats
+        self.underruns = 0
+        self.frames_read = 0
+        self.min_fill: Optional[int] = None
+        self._fill_total = 0
+        self._started = False
+        
+        self._feeder = threading.Thread(target=self._feed, name=f'audio-feeder:{label or id(self)}', daemon=True)
+        self._feeder.start()
+        
+        BufferedAudioSource.total_streams += 1
+        _active.add(self)
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🧵 FEEDER
+    # ═══════════════════════════════════════════════════════════
+    
+    def _feed(self):
+        """Read ahead from the original source until EOF or cleanup"""
+        try:
+            while True:
+                with self._cond:
+                    while len(self._frames) >= self.capacity and not self._closed:
+                        self._cond.wait()
+                    if self._closed:
+                        return
+                
+                data = self.original.read()
+                
+                with self._cond:
+                    if not data:
+                        self._eof = True
+                        return
+                    self._frames.append(data)
+        except Exception as e:
+            logger.error(f"❌ Feeder for {self.label or 'stream'} failed: {e}")
+            with self._cond:
+                self._eof = True
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🎧 AUDIO SOURCE
+    # ═══════════════════════════════════════════════════════════
+    
+    @property
+    def fill(self) -> int:
+        """Frames currently buffered"""
+        return len(self._frames)
+    
+    @property
+    def position(self) -> float:
+        """Track position of the audio handed out so far (silence excluded)"""
+        return self.start_at + self.frames_read * FRAME_DELAY
+    
+    @property
+    def volume(self) -> float:
+        return getattr(self.original, 'volume', 1.0)
+    
+    @volume.setter
+    def volume(self, value: float):
+        if hasattr(self.original, 'volume'):
+            self.original.volume = value
+    
+    def is_opus(self) -> bool:
+        return self.original.is_opus()
+    
+    def read(self) -> bytes:
+        with self._cond:
+            fill = len(self._frames)
+            
+            if fill:
+                data = self._frames.popleft()
+                self._cond.notify()
+            elif self._eof or self._closed:
+                return b''
+            else:
+                data = None
+        
+        if data is None:
+            # Startup silence while the first frames arrive is not an underrun
+            if self._started:
+                self.underruns += 1
+                BufferedAudioSource.total_underruns += 1
+            return opus.OPUS_SILENCE if self.is_opus() else PCM_SILENCE
+        
+        self._started = True
+        self.frames_read += 1
+        self._fill_total += fill
+        if self.min_fill is None or fill < self.min_fill:
+            self.min_fill = fill
+        return data
+    
+    def cleanup(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._frames.clear()
+            self._cond.notify_all()
+        
+        # Let a read in progress finish before the original goes away; a read
+        # stuck on a stalled pipe only returns once cleanup kills the process
+        feeder = self._feeder if self._feeder is not threading.current_thread() else None
+        if feeder:
+            feeder.join(timeout=FEEDER_GRACE)
+        self.original.cleanup()
+        if feeder:
+            feeder.join(timeout=1)
+        _active.discard(self)
+    
+    def stats(self) -> dict:
+        """Per-stream buffer statistics"""
+        return {
+            "label": self.label,
+            "capacity": self.capacity,
+            "fill": self.fill,
+            "fill_pct": round(100 * self.fill / self.capacity, 1),
+            "avg_fill": round(self._fill_total / self.frames_read, 1) if self.frames_read else 0.0,
+            "min_fill": self.min_fill,
+            "underruns": self.underruns,
+            "frames_read": self.frames_read,
+        }
+
+
+# ═══════════════════════════════════════════════════════════════
+# 📊 METRICS
+# ═══════════════════════════════════════════════════════════════
+
+_active: "weakref.WeakSet[BufferedAudioSource]" = weakref.WeakSet()
+
+
+def buffer_stats() -> dict:
+    """Buffer statistics across all active streams"""
+    streams = [buffer.stats() for buffer in list(_active)]
+    return {
+        "active": len(streams),
+        "capacity_frames": max(2, config.MUSIC.buffer_size // opus.Encoder.FRAME_SIZE),
+        "total_streams": BufferedAudioSource.total_streams,
+        "total_underruns": BufferedAudioSource.total_underruns,
+        "streams": streams,
+    }
@@ -0,0 +1,358 @@
+"""
+💾 Local Audio Cache
+Keeps popular tracks on disk as Ogg/Opus, evicted by a disk budget
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional, Dict
+
+import config
+from core.packet_store import index_path_for
+
+logger = logging.getLogger('ShlokMusic.Cache')
+
+# Index changes within this many seconds go to disk in one write
+SAVE_DELAY = 5.0
+
+# Play counts kept for tracks that are not cached; the least played go first
+MAX_PLAY_COUNTS = 20000
+
+# ═══════════════════════════════════════════════════════════════
+# 💾 AUDIO CACHE
+# ═══════════════════════════════════════════════════════════════
+
+class AudioCache:
+    """
+    On-disk Ogg/Opus cache of played tracks
+    
+    Files are produced in the background by the cache warmer once a track
+    has been played ``min_plays`` times. The index (entries and play
+    counts) lives next to the files in ``index.json`` and is rewritten
+    atomically, so the cache survives restarts; changes are batched and
+    written in a worker thread. When the total size exceeds the budget,
+    entries are evicted least recently used first (or least frequently
+    used with ``policy='lfu'``).
+    """
+    
+    INDEX_FILE = "index.json"
+    
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int,
+        min_plays: int = 2,
+        policy: str = "lru",
+        bitrate: int = 128
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.min_plays = max(1, min_plays)
+        self.policy = policy
+        self.bitrate = bitrate
+        
+        # track_id -> {"file", "size", "created", "last_access", "hits"}
+        self.entries: Dict[str, dict] = {}
+        # track_id -> play count (cached or not)
+        self.plays: Dict[str, int] = {}
+        # track_id -> {"i", "lra", "tp", "baked_db"}, kept after eviction
+        self.loudness: Dict[str, dict] = {}
+        self.total_bytes = 0
+        self._dirty = False
+        self._save_handle: Optional[asyncio.TimerHandle] = None
+        
+        # One index write at a time; a snapshot older than the last one written is dropped
+        self._write_lock = threading.Lock()
+        self._snapshots = 0
+        self._written = 0
+        
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.stored = 0
+        self.evicted = 0
+        
+        os.makedirs(self.directory, exist_ok=True)
+        self._load()
+    
+    # ═══════════════════════════════════════════════════════════
+    # 📂 INDEX
+    # ═══════════════════════════════════════════════════════════
+    
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.directory, self.INDEX_FILE)
+    
+    def path_for(self, track_id: str) -> str:
+        """File path for a cached track"""
+        return os.path.join(self.directory, f"{track_id}.opus")
+    
+    def _load(self):
+        """Load the index and reconcile it with the files on disk"""
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.entries = data.get("entries", {})
+            self.plays = data.get("plays", {})
+            self.loudness = data.get("loudness", {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"⚠️ Audio cache index unreadable, starting empty: {e}")
+        
+        # Drop entries whose file is gone
+        for track_id, entry in list(self.entries.items()):
+            path = os.path.join(self.directory, entry["file"])
+            if not os.path.exists(path):
+                del self.entries[track_id]
+            else:
+                entry["size"] = os.path.getsize(path)
+        
+        # Remove files the index does not know about (e.g. interrupted transcodes)
+        known = {self.INDEX_FILE}
+        for entry in self.entries.values():
+            known.add(entry["file"])
+            known.add(os.path.basename(index_path_for(entry["file"])))
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name not in known and os.path.isfile(path) and name.endswith((".opus", ".idx", ".part", ".tmp")):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        
+        self.total_bytes = sum(entry["size"] for entry in self.entries.values())
+        logger.info(f"💾 Audio cache: {len(self.entries)} tracks, {self.total_bytes / 1024 / 1024:.1f} MB")
+    
+    def _save(self):
+        """Mark the index changed; it is written within ``SAVE_DELAY`` seconds"""
+        self._dirty = True
+        if self._save_handle:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop to hold us up (scripts, shutdown)
+            self.flush()
+            return
+        self._save_handle = loop.call_later(SAVE_DELAY, self._save_later)
+    
+    def _save_later(self):
+        self._save_handle = None
+        if self._dirty:
+            self._dirty = False
+            asyncio.ensure_future(asyncio.to_thread(self._write_index, self._snapshot()))
+    
+    def _snapshot(self) -> dict:
+        # Copied on the event loop, so the worker thread never sees the dicts change size
+        self._snapshots += 1
+        return {
+            "version": self._snapshots,
+            "entries": {track_id: dict(entry) for track_id, entry in self.entries.items()},
+            "plays": dict(self.plays),
+            "loudness": dict(self.loudness),
+        }
+    
+    def _write_index(self, data: dict):
+        """Atomically rewrite the index"""
+        tmp_path = self.index_path + ".tmp"
+        version = data.pop("version")
+        with self._write_lock:
+            if version < self._written:
+                return
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, separators=(",", ":"))
+                os.replace(tmp_path, self.index_path)
+                self._written = version
+            except Exception as e:
+                logger.error(f"❌ Failed to save audio cache index: {e}")
+    
+    def flush(self):
+        """Write pending index changes now (blocks, also on a write still running in a worker)"""
+        if self._save_handle:
+            self._save_handle.cancel()
+            self._save_handle = None
+        if self._dirty:
+            self._dirty = False
+            self._write_index(self._snapshot())
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🔍 LOOKUP
+    # ═══════════════════════════════════════════════════════════
+    
+    def contains(self, track_id: str) -> bool:
+        return track_id in self.entries
+    
+    def lookup(self, track_id: str, play: bool = False) -> Optional[str]:
+        """Path of the cached file; with ``play``, it counts as a hit or a miss"""
+        entry = self.entries.get(track_id)
+        if entry:
+            path = os.path.join(self.directory, entry["file"])
+            if os.path.exists(path):
+                entry["last_access"] = time.time()
+                if play:
+                    entry["hits"] = entry.get("hits", 0) + 1
+                    self.hits += 1
+                    self.bytes_saved += entry["size"]
+                return path
+            
+            # File vanished underneath us
+            self._drop(track_id)
+        
+        if play:
+            self.misses += 1
+        return None
+    
+    def record_play(self, track_id: str) -> int:
+        """Count a play of a track, cached or not"""
+        self.plays[track_id] = self.plays.get(track_id, 0) + 1
+        if len(self.plays) > MAX_PLAY_COUNTS:
+            self._trim_plays(keep=track_id)
+        self._save()
+        return self.plays[track_id]
+    
+    def _trim_plays(self, keep: str = None):
+        """Forget the least played uncached tracks, down to 3/4 of the limit"""
+        uncached = sorted(
+            (count, track_id) for track_id, count in self.plays.items()
+            if track_id not in self.entries and track_id != keep
+        )
+        for _, track_id in uncached[:len(self.plays) - MAX_PLAY_COUNTS * 3 // 4]:
+            del self.plays[track_id]
+    
+    def should_store(self, track_id: str) -> bool:
+        """True when a track has been played enough to be worth caching"""
+        return self.plays.get(track_id, 0) >= self.min_plays and track_id not in self.entries
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🔊 LOUDNESS
+    # ═══════════════════════════════════════════════════════════
+    
+    def get_loudness(self, track_id: str) -> Optional[dict]:
+        """Stored EBU R128 measurement of a track"""
+        return self.loudness.get(track_id)
+    
+    def set_loudness(self, track_id: str, loudness: dict):
+        """Store a measurement; ``baked_db`` is the gain already in the cached file"""
+        self.loudness[track_id] = loudness
+        self._save()
+    
+    def unmeasured(self) -> list:
+        """Cached tracks that have no loudness measurement yet"""
+        return [track_id for track_id in self.entries if track_id not in self.loudness]
+    
+    # ═══════════════════════════════════════════════════════════
+    # 📥 STORE
+    # ═══════════════════════════════════════════════════════════
+    
+    def add_file(self, track_id: str, path: str):
+        """Register a finished Ogg/Opus file and enforce the budget"""
+        size = os.path.getsize(path)
+        now = time.time()
+        
+        if track_id in self.entries:
+            self.total_bytes -= self.entries[track_id]["size"]
+        
+        self.entries[track_id] = {
+            "file": os.path.basename(path),
+            "size": size,
+            "created": now,
+            "last_access": now,
+            "hits": 0,
+        }
+        self.total_bytes += size
+        self.stored += 1
+        
+        self._evict(keep=track_id)
+        self._save()
+        
+        logger.info(f"💾 Cached {track_id} ({size / 1024 / 1024:.1f} MB)")
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🗑️ EVICTION
+    # ═══════════════════════════════════════════════════════════
+    
+    def _eviction_key(self, item):
+        track_id, entry = item
+        if self.policy == "lfu":
+            return (entry.get("hits", 0), entry["last_access"])
+        return entry["last_access"]
+    
+    def _evict(self, keep: str = None):
+        """Evict entries until the cache fits its budget"""
+        if self.total_bytes <= self.max_bytes:
+            return
+        
+        for track_id, _ in sorted(self.entries.items(), key=self._eviction_key):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if track_id == keep:
+                continue
+            self._drop(track_id)
+            self.evicted += 1
+    
+    def _drop(self, track_id: str):
+        entry = self.entries.pop(track_id, None)
+        if not entry:
+            return
+        self.total_bytes -= entry["size"]
+        self.plays.pop(track_id, None)  # earns its place again with min_plays new plays
+        path = os.path.join(self.directory, entry["file"])
+        for stale in (path, index_path_for(path)):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+    
+    # ═══════════════════════════════════════════════════════════
+    # 📊 STATS
+    # ═══════════════════════════════════════════════════════════
+    
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+    
+    def stats(self) -> dict:
+        return {
+            "tracks": len(self.entries),
+            "measured": len(self.loudness),
+            "bytes": self.total_bytes,
+            "budget_bytes": self.max_bytes,
+            "policy": self.policy,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hit_ratio, 3),
+            "bytes_saved": self.bytes_saved,
+            "stored": self.stored,
+            "evicted": self.evicted,
+        }
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🌐 SHARED INSTANCE
+# ═══════════════════════════════════════════════════════════════
+
+_cache: Optional[AudioCache] = None
+
+
+def get_audio_cache() -> Optional[AudioCache]:
+    """Get the process-wide audio cache, or None when caching is disabled"""
+    global _cache
+    if not config.CACHE.enabled:
+        return None
+    if _cache is None:
+        _cache = AudioCache(
+            directory=os.path.join(config.CACHE_DIR, "audio"),
+            max_bytes=config.CACHE.max_megabytes * 1024 * 1024,
+            min_plays=config.CACHE.min_plays,
+            policy=config.CACHE.policy,
+            bitrate=config.CACHE.bitrate,
+        )
+    return _cache
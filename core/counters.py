@@ -0,0 +1,123 @@
+"""
+🔢 Guild Counters
+Server and user totals kept current from gateway events
+"""
+
+import asyncio
+import logging
+from typing import Dict, Iterable, Optional
+
+import discord
+
+import config
+
+logger = logging.getLogger('ShlokMusic.Counters')
+
+# Guilds recounted between yields to the event loop
+_RECONCILE_CHUNK = 1000
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🔢 GUILD COUNTERS
+# ═══════════════════════════════════════════════════════════════
+
+class GuildCounters:
+    """
+    Number of servers and users, without summing every guild to show them
+    
+    Guild join/remove and member join/leave events adjust the totals by
+    what changed. A background task recounts them from the guild cache
+    every ``config.COUNTER_RECONCILE_INTERVAL`` seconds (yielding between
+    chunks of guilds), which corrects anything an event missed, e.g.
+    while the gateway was reconnecting.
+    """
+    
+    def __init__(self):
+        self._members: Dict[int, int] = {}
+        self.users = 0
+        self._task: Optional[asyncio.Task] = None
+        
+        # Stats
+        self.reconciles = 0
+        self.last_drift = 0
+    
+    @property
+    def guilds(self) -> int:
+        return len(self._members)
+    
+    # ═══════════════════════════════════════════════════════════
+    # 📡 EVENTS
+    # ═══════════════════════════════════════════════════════════
+    
+    def guild_joined(self, guild: discord.Guild):
+        count = guild.member_count or 0
+        self.users += count - self._members.get(guild.id, 0)
+        self._members[guild.id] = count
+    
+    def guild_removed(self, guild: discord.Guild):
+        self.users -= self._members.pop(guild.id, 0)
+    
+    def member_joined(self, guild: discord.Guild):
+        if guild.id in self._members:
+            self._members[guild.id] += 1
+            self.users += 1
+    
+    def member_left(self, guild: discord.Guild):
+        if self._members.get(guild.id):
+            self._members[guild.id] -= 1
+            self.users -= 1
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🔄 RECONCILE
+    # ═══════════════════════════════════════════════════════════
+    
+    async def reconcile(self, guilds: Iterable[discord.Guild]):
+        """Recount from the guild cache and replace the running totals"""
+        members: Dict[int, int] = {}
+        for index, guild in enumerate(list(guilds), 1):
+            members[guild.id] = guild.member_count or 0
+            if index % _RECONCILE_CHUNK == 0:
+                await asyncio.sleep(0)
+        
+        users = sum(members.values())
+        self.last_drift = users - self.users
+        if self.reconciles and self.last_drift:
+            logger.debug(f"🔢 Counters drifted by {self.last_drift} users, corrected")
+        
+        self._members = members
+        self.users = users
+        self.reconciles += 1
+    
+    def start(self, bot):
+        """Reconcile every ``config.COUNTER_RECONCILE_INTERVAL`` seconds"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_event_loop().create_task(self._run(bot))
+    
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+    
+    async def _run(self, bot):
+        while True:
+            await asyncio.sleep(config.COUNTER_RECONCILE_INTERVAL)
+            await self.reconcile(bot.guilds)
+    
+    def stats(self) -> dict:
+        return {
+            "guilds": self.guilds,
+            "users": self.users,
+            "reconciles": self.reconciles,
+            "last_drift": self.last_drift,
+        }
+
+
+_counters: Optional[GuildCounters] = None
+
+
+def get_guild_counters() -> GuildCounters:
+    """Get the process-wide guild counters"""
+    global _counters
+    if _counters is None:
+        _counters = GuildCounters()
+    return _counters
@@ -0,0 +1,387 @@
+"""
+🗄️ Database
+SQLite store in WAL mode with a batching write-behind thread
+"""
+
+import asyncio
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, List, NamedTuple, Optional, Sequence
+
+import config
+
+logger = logging.getLogger('ShlokMusic.Database')
+
+# Schema changes, applied in order and counted in PRAGMA user_version
+MIGRATIONS = [
+    # 1: player sessions, so a restart resumes every guild where it stopped
+    """
+    CREATE TABLE player_sessions (
+        guild_id INTEGER PRIMARY KEY,
+        voice_channel_id INTEGER NOT NULL,
+        text_channel_id INTEGER,
+        track TEXT,
+        position REAL NOT NULL DEFAULT 0,
+        paused INTEGER NOT NULL DEFAULT 0,
+        volume REAL NOT NULL DEFAULT 1,
+        loop_mode INTEGER NOT NULL DEFAULT 0,
+        queue TEXT NOT NULL DEFAULT '{}',
+        updated_at REAL NOT NULL
+    );
+    """,
+    # 2: favorites, one row per user and canonical track ID
+    """
+    CREATE TABLE favorites (
+        user_id INTEGER NOT NULL,
+        track_id TEXT NOT NULL,
+        title TEXT NOT NULL,
+        url TEXT NOT NULL,
+        duration INTEGER,
+        artist TEXT,
+        thumbnail TEXT,
+        source_type TEXT NOT NULL DEFAULT 'youtube',
+        added_at REAL NOT NULL,
+        PRIMARY KEY (user_id, track_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX favorites_by_user_added ON favorites (user_id, added_at);
+    """,
+    # 3: play log (append-only) and per-guild play counts
+    """
+    CREATE TABLE play_log (
+        id INTEGER PRIMARY KEY,
+        guild_id INTEGER NOT NULL,
+        track_id TEXT NOT NULL,
+        title TEXT NOT NULL,
+        url TEXT NOT NULL,
+        duration INTEGER,
+        artist TEXT,
+        thumbnail TEXT,
+        source_type TEXT NOT NULL DEFAULT 'youtube',
+        requester_id INTEGER,
+        started_at REAL NOT NULL,
+        played REAL NOT NULL DEFAULT 0,
+        outcome TEXT NOT NULL
+    );
+    CREATE INDEX play_log_by_guild_started ON play_log (guild_id, started_at);
+    CREATE TABLE play_counts (
+        guild_id INTEGER NOT NULL,
+        track_id TEXT NOT NULL,
+        title TEXT NOT NULL,
+        url TEXT NOT NULL,
+        duration INTEGER,
+        artist TEXT,
+        thumbnail TEXT,
+        source_type TEXT NOT NULL DEFAULT 'youtube',
+        plays INTEGER NOT NULL DEFAULT 0,
+        completions INTEGER NOT NULL DEFAULT 0,
+        skips INTEGER NOT NULL DEFAULT 0,
+        last_played REAL NOT NULL,
+        PRIMARY KEY (guild_id, track_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX play_counts_by_plays ON play_counts (guild_id, plays);
+    """,
+    # 4: per-guild settings (only the values a guild changed, as JSON)
+    """
+    CREATE TABLE guild_settings (
+        guild_id INTEGER PRIMARY KEY,
+        data TEXT NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    """,
+    # 5: analytics rollups per period bucket, guild (0 = whole bot), metric and key
+    """
+    CREATE TABLE analytics_rollups (
+        period TEXT NOT NULL,
+        guild_id INTEGER NOT NULL,
+        metric TEXT NOT NULL,
+        bucket INTEGER NOT NULL,
+        key TEXT NOT NULL DEFAULT '',
+        count INTEGER NOT NULL DEFAULT 0,
+        seconds REAL NOT NULL DEFAULT 0,
+        label TEXT,
+        PRIMARY KEY (period, guild_id, metric, bucket, key)
+    ) WITHOUT ROWID;
+    """,
+]
+
+
+class _Write(NamedTuple):
+    sql: Optional[str]  # None for a flush barrier
+    params: Any
+    many: bool
+    future: Optional[asyncio.Future]
+    loop: Optional[asyncio.AbstractEventLoop]
+
+
+_STOP = object()
+
+
+def _resolve(future: asyncio.Future, result: Any, error: Optional[BaseException]):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🗄️ DATABASE
+# ═══════════════════════════════════════════════════════════════
+
+class Database:
+    """
+    One SQLite file shared by every store of the bot
+    
+    Writes never run on the event loop: they queue up for a single writer
+    thread, which commits whatever arrived within ``flush_interval`` in one
+    transaction. ``write`` is fire-and-forget, ``execute`` and ``flush``
+    wait for the commit. Reads use their own connection in a worker thread;
+    WAL lets them run while the writer commits.
+    """
+    
+    def __init__(self, path: str, flush_interval: float = None, batch_size: int = None):
+        self.path = path
+        self.flush_interval = config.DATABASE.flush_interval if flush_interval is None else flush_interval
+        self.batch_size = batch_size or config.DATABASE.batch_size
+        
+        self._writes: "queue.Queue" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._reader: Optional[sqlite3.Connection] = None
+        self._read_lock = threading.Lock()
+        
+        # Stats
+        self.statements = 0
+        self.batches = 0
+        self.errors = 0
+        self.last_batch_ms = 0.0
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🔄 LIFECYCLE
+    # ═══════════════════════════════════════════════════════════
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints, no fsync per commit
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+    
+    def open(self):
+        """Create or migrate the schema and start the writer thread"""
+        if self._writer is not None:
+            return
+        
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = self._connect()
+        self._migrate(conn)
+        
+        self._reader = self._connect()
+        self._reader.row_factory = sqlite3.Row
+        
+        self._writer = threading.Thread(target=self._write_loop, args=(conn,), name="shlok-db-writer", daemon=True)
+        self._writer.start()
+    
+    @property
+    def is_open(self) -> bool:
+        return self._writer is not None
+    
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection):
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, script in enumerate(MIGRATIONS[version:], start=version + 1):
+            conn.executescript(f"BEGIN; {script} PRAGMA user_version = {number}; COMMIT;")
+            logger.info(f"🗄️ Database migrated to version {number}")
+    
+    def close(self):
+        """Commit everything still queued and close (blocks until done)"""
+        if self._writer is None:
+            return
+        self._writes.put(_STOP)
+        self._writer.join()
+        self._writer = None
+        
+        with self._read_lock:
+            self._reader.close()
+            self._reader = None
+    
+    # ═══════════════════════════════════════════════════════════
+    # ✏️ WRITES
+    # ═══════════════════════════════════════════════════════════
+    
+    def _check_open(self):
+        # A closed database has no writer thread: queued writes would be
+        # lost and waiting ones would never be answered
+        if self._writer is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+    
+    def write(self, sql: str, params: Sequence = ()):
+        """Queue a statement for the next batch"""
+        self._check_open()
+        self._writes.put(_Write(sql, params, False, None, None))
+    
+    def write_many(self, sql: str, rows: Sequence[Sequence]):
+        """Queue one statement for many parameter rows"""
+        self._check_open()
+        self._writes.put(_Write(sql, list(rows), True, None, None))
+    
+    async def execute(self, sql: str, params: Sequence = ()) -> int:
+        """Run a statement in the next batch and wait for its commit; returns lastrowid"""
+        return await self._submit(sql, params, False)
+    
+    async def execute_many(self, sql: str, rows: Sequence[Sequence]) -> int:
+        """Like ``execute`` for many parameter rows; returns the rows changed"""
+        return await self._submit(sql, list(rows), True)
+    
+    async def flush(self):
+        """Wait until everything queued so far is committed"""
+        await self._submit(None, (), False)
+    
+    async def _submit(self, sql: Optional[str], params: Any, many: bool) -> Any:
+        self._check_open()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._writes.put(_Write(sql, params, many, future, loop))
+        return await future
+    
+    def _write_loop(self, conn: sqlite3.Connection):
+        stopping = False
+        while not stopping:
+            first = self._writes.get()
+            if first is _STOP:
+                break
+            
+            # Gather what arrives within the flush interval into one transaction,
+            # but don't hold back a batch someone is waiting on
+            batch = [first]
+            waited = first.future is not None
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    if waited:
+                        item = self._writes.get_nowait()
+                    else:
+                        item = self._writes.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                waited = waited or item.future is not None
+            
+            self._commit(conn, batch)
+        
+        # Whatever was queued behind the stop marker
+        leftover = []
+        while True:
+            try:
+                item = self._writes.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftover.append(item)
+        if leftover:
+            self._commit(conn, leftover)
+        conn.close()
+    
+    def _commit(self, conn: sqlite3.Connection, batch: List[_Write]):
+        started = time.perf_counter()
+        results: List[Any] = []
+        errors: List[Optional[BaseException]] = []
+        try:
+            conn.execute("BEGIN")
+            for item in batch:
+                results.append(self._run(conn, item))
+                errors.append(None)
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logger.warning(f"⚠️ Batch of {len(batch)} writes failed ({e}), retrying one by one")
+            
+            # Commit each write alone, so one bad statement doesn't lose the rest
+            results, errors = [], []
+            for item in batch:
+                try:
+                    results.append(self._run(conn, item))
+                    errors.append(None)
+                except sqlite3.Error as error:
+                    self.errors += 1
+                    logger.error(f"❌ Database write failed: {error} ({item.sql.split()[0] if item.sql else 'flush'})")
+                    results.append(None)
+                    errors.append(error)
+        
+        self.statements += sum(1 for item in batch if item.sql)
+        self.batches += 1
+        self.last_batch_ms = (time.perf_counter() - started) * 1000
+        
+        for item, result, error in zip(batch, results, errors):
+            if item.future is not None:
+                item.loop.call_soon_threadsafe(_resolve, item.future, result, error)
+    
+    @staticmethod
+    def _run(conn: sqlite3.Connection, item: _Write) -> Any:
+        if item.sql is None:
+            return None
+        if item.many:
+            return conn.executemany(item.sql, item.params).rowcount
+        return conn.execute(item.sql, item.params).lastrowid
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🔍 READS
+    # ═══════════════════════════════════════════════════════════
+    
+    def _fetch(self, sql: str, params: Sequence, one: bool):
+        with self._read_lock:
+            cursor = self._reader.execute(sql, params)
+            return cursor.fetchone() if one else cursor.fetchall()
+    
+    async def fetch_all(self, sql: str, params: Sequence = ()) -> List[sqlite3.Row]:
+        """Rows committed so far (``flush`` first to see queued writes)"""
+        return await asyncio.to_thread(self._fetch, sql, params, False)
+    
+    async def fetch_one(self, sql: str, params: Sequence = ()) -> Optional[sqlite3.Row]:
+        return await asyncio.to_thread(self._fetch, sql, params, True)
+    
+    def stats(self) -> dict:
+        try:
+            size = os.path.getsize(self.path) + os.path.getsize(self.path + "-wal")
+        except OSError:
+            size = 0
+        return {
+            "pending_writes": self._writes.qsize(),
+            "statements": self.statements,
+            "batches": self.batches,
+            "errors": self.errors,
+            "last_batch_ms": round(self.last_batch_ms, 2),
+            "size_mb": round(size / 1024 / 1024, 2),
+        }
+
+
+_database: Optional[Database] = None
+
+
+def get_database() -> Database:
+    """Get the process-wide database, opening it on first use"""
+    global _database
+    if _database is None:
+        _database = Database(os.path.join(config.DATA_DIR, config.DATABASE.filename))
+        _database.open()
+    return _database
+
+
+def close_database():
+    """Commit pending writes and close the database (if it was opened)
+    
+    The stores notice it is closed and are rebuilt on a new instance the
+    next time they are asked for.
+    """
+    global _database
+    if _database is not None:
+        _database.close()
+        _database = None
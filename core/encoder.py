@@ -0,0 +1,504 @@
+"""
+🗜️ Out-of-Process Opus Encoder Pool
+Encodes PCM frames in worker processes through shared-memory rings
+"""
+
+import logging
+import multiprocessing as mp
+import struct
+import threading
+from multiprocessing import shared_memory
+from typing import Optional, List
+
+import discord
+from discord import opus
+
+import config
+
+logger = logging.getLogger('ShlokMusic.Encoder')
+
+# ═══════════════════════════════════════════════════════════════
+# 📐 RING LAYOUT
+# ═══════════════════════════════════════════════════════════════
+
+PCM_FRAME_SIZE = opus.Encoder.FRAME_SIZE       # 3840 bytes = 20 ms of 48 kHz stereo s16le
+PACKET_SLOT_SIZE = 2 + 4000                     # u16 length + largest packet we allow
+RING_FRAMES = 8                                 # frames per ring, must exceed LOOKAHEAD
+LOOKAHEAD = 4                                   # frames in flight per stream
+
+# Packet length the worker writes when it could not encode a frame
+ENCODE_FAILED = 0xFFFF
+
+# Times a dead worker is respawned before its streams stay in-process
+MAX_RESTARTS = 5
+
+# Slot header: state, complexity, generation, bitrate (kbps)
+HEADER = struct.Struct('<BBxxII')
+HEADER_SIZE = 16
+
+SLOT_FREE = 0
+SLOT_OPEN = 1
+SLOT_CLOSING = 2
+
+PCM_RING_OFFSET = HEADER_SIZE
+PACKET_RING_OFFSET = PCM_RING_OFFSET + RING_FRAMES * PCM_FRAME_SIZE
+SLOT_SIZE = PACKET_RING_OFFSET + RING_FRAMES * PACKET_SLOT_SIZE
+
+# libopus CTL that discord.py does not wrap
+OPUS_SET_COMPLEXITY = 4010
+MAX_COMPLEXITY = 10
+
+
+def set_encoder_quality(encoder: opus.Encoder, bitrate: int = None, complexity: int = None):
+    """Change the bitrate (kbps) and complexity (0-10) of a live encoder"""
+    if bitrate:
+        encoder.set_bitrate(bitrate)
+    if complexity is not None:
+        try:
+            opus._lib.opus_encoder_ctl(encoder._state, OPUS_SET_COMPLEXITY, max(0, min(MAX_COMPLEXITY, complexity)))
+        except Exception as e:
+            logger.debug(f"Could not set Opus complexity: {e}")
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing segment without registering it for cleanup"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always registers with the resource tracker, which
+        # would unlink the parent's segment when this worker exits
+        from multiprocessing import resource_tracker
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args, **kwargs: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🧵 WORKER PROCESS
+# ═══════════════════════════════════════════════════════════════
+
+def _worker_main(shm_name: str, slots: int, wake, stop, in_sems, out_sems):
+    """Encode every pending PCM frame of this worker's slots"""
+    shm = _attach(shm_name)
+    buf = shm.buf
+    
+    encoders: List[Optional[opus.Encoder]] = [None] * slots
+    generations = [-1] * slots
+    applied = [(0, 0)] * slots
+    read_index = [0] * slots
+    
+    try:
+        while not stop.is_set():
+            wake.acquire(timeout=1.0)
+            
+            for slot in range(slots):
+                base = slot * SLOT_SIZE
+                state, complexity, generation, bitrate = HEADER.unpack_from(buf, base)
+                
+                if state == SLOT_OPEN:
+                    if generations[slot] != generation:
+                        generations[slot] = generation
+                        read_index[slot] = 0
+                        applied[slot] = (bitrate, MAX_COMPLEXITY)
+                        try:
+                            encoders[slot] = opus.Encoder(bitrate=bitrate or 128)
+                        except Exception as e:
+                            encoders[slot] = None
+                            logger.error(f"❌ Encoder worker could not create an encoder: {e}")
+                    
+                    encoder = encoders[slot]
+                    if encoder and applied[slot] != (bitrate, complexity):
+                        # The quality governor changed this stream's settings
+                        try:
+                            set_encoder_quality(encoder, bitrate, complexity)
+                        except Exception as e:
+                            logger.error(f"❌ Encoder worker could not change quality: {e}")
+                        applied[slot] = (bitrate, complexity)
+                    
+                    while in_sems[slot].acquire(False):
+                        ring = read_index[slot] % RING_FRAMES
+                        pcm_at = base + PCM_RING_OFFSET + ring * PCM_FRAME_SIZE
+                        out_at = base + PACKET_RING_OFFSET + ring * PACKET_SLOT_SIZE
+                        
+                        # A bad frame is reported on its slot, the stream encodes it itself
+                        try:
+                            packet = encoder.encode(bytes(buf[pcm_at:pcm_at + PCM_FRAME_SIZE]), encoder.SAMPLES_PER_FRAME)
+                            if len(packet) > PACKET_SLOT_SIZE - 2:
+                                raise ValueError(f"{len(packet)} byte packet does not fit its slot")
+                            struct.pack_into('<H', buf, out_at, len(packet))
+                            buf[out_at + 2:out_at + 2 + len(packet)] = packet
+                        except Exception as e:
+                            struct.pack_into('<H', buf, out_at, ENCODE_FAILED)
+                            logger.error(f"❌ Encoder worker failed a frame: {e}")
+                        
+                        read_index[slot] += 1
+                        out_sems[slot].release()
+                
+                elif state == SLOT_CLOSING:
+                    while in_sems[slot].acquire(False):
+                        pass
+                    encoders[slot] = None
+                    HEADER.pack_into(buf, base, SLOT_FREE, complexity, generation, bitrate)
+    finally:
+        del buf
+        shm.close()
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🎧 POOLED OPUS SOURCE
+# ═══════════════════════════════════════════════════════════════
+
+class PooledOpusSource(discord.AudioSource):
+    """
+    Wraps a PCM source and returns Opus packets encoded by the pool
+    
+    Keeps a few frames in flight so the worker encodes ahead of the
+    sender and ``read`` usually finds its packet already waiting. Frames
+    the worker fails are encoded here instead; if the worker stops
+    answering or is respawned, the rest of the stream is encoded here.
+    """
+    
+    def __init__(self, pool: 'EncoderPool', worker: '_PoolWorker', slot: int, original: discord.AudioSource):
+        self.original = original
+        self._pool = pool
+        self._worker = worker
+        self._slot = slot
+        self._base = slot * SLOT_SIZE
+        self._generation = worker.generations[slot]
+        self._epoch = worker.epoch
+        _, self._complexity, _, self._bitrate = HEADER.unpack_from(worker.shm.buf, self._base)
+        
+        self._written = 0
+        self._read = 0
+        self._eof = False
+        self._closed = False
+        
+        # In-process fallback: the encoder and the PCM frames the worker never answered
+        self._local: Optional[opus.Encoder] = None
+        self._local_only = False
+        self._backlog: List[bytes] = []
+    
+    @property
+    def volume(self) -> float:
+        return getattr(self.original, 'volume', 1.0)
+    
+    @volume.setter
+    def volume(self, value: float):
+        if hasattr(self.original, 'volume'):
+            self.original.volume = value
+    
+    def is_opus(self) -> bool:
+        return True
+    
+    def set_quality(self, bitrate: int, complexity: int):
+        """Ask the worker to re-tune this stream's encoder"""
+        self._bitrate, self._complexity = bitrate, complexity
+        if self._local:
+            set_encoder_quality(self._local, bitrate, complexity)
+        with self._pool._lock:
+            if self._closed:
+                return
+            buf = self._worker.shm.buf
+            state, _, generation, _ = HEADER.unpack_from(buf, self._base)
+            if generation == self._generation:
+                HEADER.pack_into(buf, self._base, state, complexity, generation, bitrate)
+    
+    def _encode_locally(self, pcm: bytes) -> bytes:
+        if self._local is None:
+            self._local = opus.Encoder(bitrate=self._bitrate or config.MUSIC.audio_bitrate)
+            set_encoder_quality(self._local, None, self._complexity)
+        self._pool.local_frames += 1
+        return self._local.encode(pcm, self._local.SAMPLES_PER_FRAME)
+    
+    def _pcm_at(self, index: int) -> bytes:
+        pcm_at = self._base + PCM_RING_OFFSET + (index % RING_FRAMES) * PCM_FRAME_SIZE
+        return bytes(self._worker.shm.buf[pcm_at:pcm_at + PCM_FRAME_SIZE])
+    
+    def _leave_pool(self, keep_in_flight: bool = True):
+        """Encode the rest of the stream in-process, starting with the frames in flight"""
+        if not self._closed:
+            if keep_in_flight:
+                self._backlog = [self._pcm_at(index) for index in range(self._read, self._written)]
+            self._closed = True
+            self._pool._release(self._worker, self._slot, self._generation)
+        self._local_only = True
+        self._read = self._written
+    
+    def _read_local(self) -> bytes:
+        if self._backlog:
+            return self._encode_locally(self._backlog.pop(0))
+        pcm = self.original.read()
+        if len(pcm) != PCM_FRAME_SIZE:
+            return b''
+        return self._encode_locally(pcm)
+    
+    def read(self) -> bytes:
+        if not self._local_only and self._worker.epoch != self._epoch:
+            # The worker died and was respawned with fresh slots: our ring may
+            # belong to another stream by now, so the frames in flight are lost
+            self._leave_pool(keep_in_flight=False)
+        if self._local_only:
+            return self._read_local()
+        
+        buf = self._worker.shm.buf
+        
+        while not self._eof and self._written - self._read < LOOKAHEAD:
+            pcm = self.original.read()
+            if len(pcm) != PCM_FRAME_SIZE:
+                self._eof = True
+                break
+            
+            ring = self._written % RING_FRAMES
+            pcm_at = self._base + PCM_RING_OFFSET + ring * PCM_FRAME_SIZE
+            buf[pcm_at:pcm_at + PCM_FRAME_SIZE] = pcm
+            self._written += 1
+            
+            self._worker.in_sems[self._slot].release()
+            self._worker.wake.release()
+        
+        if self._read == self._written:
+            return b''
+        
+        if not self._worker.out_sems[self._slot].acquire(timeout=self._pool.timeout):
+            self._pool.timeouts += 1
+            logger.error(f"❌ Encoder worker did not answer within {self._pool.timeout}s, encoding in-process")
+            self._leave_pool()
+            self._pool._check_worker(self._worker)
+            return self._read_local()
+        
+        ring = self._read % RING_FRAMES
+        out_at = self._base + PACKET_RING_OFFSET + ring * PACKET_SLOT_SIZE
+        (length,) = struct.unpack_from('<H', buf, out_at)
+        if length == ENCODE_FAILED:
+            self._pool.encode_errors += 1
+            packet = self._encode_locally(self._pcm_at(self._read))
+        else:
+            packet = bytes(buf[out_at + 2:out_at + 2 + length])
+            self._pool.packets_encoded += 1
+        self._read += 1
+        return packet
+    
+    def cleanup(self):
+        if not self._closed:
+            self._closed = True
+            self._pool._release(self._worker, self._slot, self._generation)
+        self.original.cleanup()
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🗜️ ENCODER POOL
+# ═══════════════════════════════════════════════════════════════
+
+class _PoolWorker:
+    """Parent-side handle of one worker process and its slots"""
+    
+    def __init__(self, ctx, index: int, slots: int):
+        self.index = index
+        self.slots = slots
+        self.shm = shared_memory.SharedMemory(create=True, size=slots * SLOT_SIZE)
+        self.wake = ctx.Semaphore(0)
+        self.stop = ctx.Event()
+        self.in_sems = [ctx.Semaphore(0) for _ in range(slots)]
+        self.out_sems = [ctx.Semaphore(0) for _ in range(slots)]
+        self.generations = [0] * slots
+        self.epoch = 0  # bumped on every respawn, streams of an older epoch leave the pool
+        self.restarts = 0
+        
+        for slot in range(slots):
+            HEADER.pack_into(self.shm.buf, slot * SLOT_SIZE, SLOT_FREE, MAX_COMPLEXITY, 0, 0)
+        
+        self.process = self._new_process(ctx)
+    
+    def _new_process(self, ctx):
+        return ctx.Process(
+            target=_worker_main,
+            args=(self.shm.name, self.slots, self.wake, self.stop, self.in_sems, self.out_sems),
+            name=f'opus-encoder:{self.index}',
+            daemon=True
+        )
+    
+    def respawn(self, ctx):
+        """Start a new process on the same segment with every slot free"""
+        self.epoch += 1
+        self.restarts += 1
+        for slot in range(self.slots):
+            while self.in_sems[slot].acquire(False):
+                pass
+            while self.out_sems[slot].acquire(False):
+                pass
+            _, complexity, generation, bitrate = HEADER.unpack_from(self.shm.buf, slot * SLOT_SIZE)
+            HEADER.pack_into(self.shm.buf, slot * SLOT_SIZE, SLOT_FREE, complexity, generation, bitrate)
+        
+        self.process = self._new_process(ctx)
+        self.process.start()
+    
+    def state(self, slot: int) -> int:
+        return HEADER.unpack_from(self.shm.buf, slot * SLOT_SIZE)[0]
+
+
+class EncoderPool:
+    """
+    Fixed pool of Opus encoder processes
+    
+    Each worker owns a shared-memory segment split into stream slots.
+    A slot holds a PCM ring (bot → worker) and a packet ring
+    (worker → bot), paced by one semaphore per direction. When every
+    slot is taken, ``wrap`` hands the source back unchanged and it is
+    encoded in-process as before. A worker that dies is respawned (up to
+    ``MAX_RESTARTS`` times); its streams finish in-process meanwhile.
+    """
+    
+    def __init__(self, workers: int = 2, slots_per_worker: int = 32, timeout: float = 0.5):
+        self.workers = max(1, workers)
+        self.slots_per_worker = max(1, slots_per_worker)
+        self.timeout = timeout
+        
+        self._ctx = mp.get_context('spawn')
+        self._workers: List[_PoolWorker] = []
+        self._lock = threading.Lock()
+        self._started = False
+        
+        # Stats
+        self.streams_opened = 0
+        self.fallbacks = 0
+        self.packets_encoded = 0
+        self.timeouts = 0
+        self.encode_errors = 0
+        self.local_frames = 0
+        self.restarts = 0
+    
+    def start(self):
+        """Spawn the worker processes"""
+        with self._lock:
+            if self._started:
+                return
+            for index in range(self.workers):
+                worker = _PoolWorker(self._ctx, index, self.slots_per_worker)
+                worker.process.start()
+                self._workers.append(worker)
+            self._started = True
+        
+        logger.info(f"🗜️ Opus encoder pool started: {self.workers} processes × {self.slots_per_worker} streams")
+    
+    def shutdown(self):
+        """Stop the workers and free the shared memory"""
+        with self._lock:
+            for worker in self._workers:
+                worker.stop.set()
+                worker.wake.release()
+            for worker in self._workers:
+                worker.process.join(timeout=2)
+                if worker.process.is_alive():
+                    worker.process.terminate()
+                worker.shm.close()
+                worker.shm.unlink()
+            self._workers.clear()
+            self._started = False
+    
+    def wrap(self, source: discord.AudioSource, bitrate: int = None, complexity: int = MAX_COMPLEXITY) -> discord.AudioSource:
+        """Route a PCM source through the pool, or return it unchanged"""
+        if source.is_opus():
+            return source
+        
+        self.start()
+        
+        with self._lock:
+            # Least loaded live worker with a free slot
+            candidates = []
+            for worker in self._workers:
+                if not worker.process.is_alive() and not self._revive(worker):
+                    continue
+                free = [s for s in range(worker.slots) if worker.state(s) == SLOT_FREE]
+                if free:
+                    candidates.append((len(free), worker, free[0]))
+            
+            if not candidates:
+                self.fallbacks += 1
+                return source
+            
+            _, worker, slot = max(candidates, key=lambda c: c[0])
+            
+            # Drop packets left over from the slot's previous stream
+            while worker.out_sems[slot].acquire(False):
+                pass
+            
+            worker.generations[slot] += 1
+            HEADER.pack_into(
+                worker.shm.buf, slot * SLOT_SIZE,
+                SLOT_OPEN, complexity, worker.generations[slot], bitrate or config.MUSIC.audio_bitrate
+            )
+            self.streams_opened += 1
+        
+        return PooledOpusSource(self, worker, slot, source)
+    
+    def _release(self, worker: _PoolWorker, slot: int, generation: int):
+        """Hand a slot back to its worker for draining (unless it was reused meanwhile)"""
+        with self._lock:
+            if not self._started:
+                return
+            state, complexity, current, bitrate = HEADER.unpack_from(worker.shm.buf, slot * SLOT_SIZE)
+            if state != SLOT_OPEN or current != generation:
+                return
+            HEADER.pack_into(worker.shm.buf, slot * SLOT_SIZE, SLOT_CLOSING, complexity, generation, bitrate)
+        worker.wake.release()
+    
+    def _check_worker(self, worker: _PoolWorker):
+        """Respawn ``worker`` if its process died"""
+        with self._lock:
+            if self._started and not worker.process.is_alive():
+                self._revive(worker)
+    
+    def _revive(self, worker: _PoolWorker) -> bool:
+        # Caller holds the lock
+        if worker.restarts >= MAX_RESTARTS:
+            return False
+        logger.warning(f"⚠️ Encoder process {worker.index} died (exit code {worker.process.exitcode}), restarting it")
+        try:
+            worker.respawn(self._ctx)
+        except Exception as e:
+            logger.error(f"❌ Could not restart encoder process {worker.index}, its streams stay in-process: {e}")
+            return False
+        self.restarts += 1
+        return True
+    
+    def stats(self) -> dict:
+        """Encoder pool statistics"""
+        active = 0
+        for worker in self._workers:
+            active += sum(1 for s in range(worker.slots) if worker.state(s) != SLOT_FREE)
+        return {
+            "processes": len(self._workers),
+            "alive": sum(1 for w in self._workers if w.process.is_alive()),
+            "capacity": self.workers * self.slots_per_worker,
+            "active_streams": active,
+            "streams_opened": self.streams_opened,
+            "fallbacks": self.fallbacks,
+            "packets_encoded": self.packets_encoded,
+            "timeouts": self.timeouts,
+            "encode_errors": self.encode_errors,
+            "local_frames": self.local_frames,
+            "restarts": self.restarts,
+        }
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🌐 SHARED INSTANCE
+# ═══════════════════════════════════════════════════════════════
+
+_pool: Optional[EncoderPool] = None
+
+
+def get_encoder_pool() -> Optional[EncoderPool]:
+    """Get the process-wide encoder pool, or None when it is disabled"""
+    global _pool
+    if config.MUSIC.encoder_processes <= 0:
+        return None
+    if _pool is None:
+        _pool = EncoderPool(
+            workers=config.MUSIC.encoder_processes,
+            slots_per_worker=config.MUSIC.encoder_streams_per_process
+        )
+    return _pool
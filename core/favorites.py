@@ -0,0 +1,155 @@
+"""
+❤️ Favorites Store
+Bot-wide favorites per user, in the database behind an in-memory ID index
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import discord
+
+import config
+from core.database import Database, get_database
+from core.track import Track
+
+logger = logging.getLogger('ShlokMusic.Favorites')
+
+_COLUMNS = "title, url, duration, artist, thumbnail, source_type"
+
+
+def _track_from_row(row, requester: Optional[discord.Member] = None) -> Track:
+    return Track(
+        title=row["title"],
+        url=row["url"],
+        duration=row["duration"],
+        thumbnail=row["thumbnail"],
+        artist=row["artist"],
+        requester=requester,
+        source_type=row["source_type"],
+    )
+
+
+# ═══════════════════════════════════════════════════════════════
+# ❤️ FAVORITES STORE
+# ═══════════════════════════════════════════════════════════════
+
+class FavoritesStore:
+    """
+    Favorites keyed by (user, canonical track ID), the same in every guild
+    
+    The track IDs of recently active users are kept in memory, so add,
+    remove and contains are dictionary operations; the rows follow through
+    the database's write-behind queue. Listing and enqueueing read the
+    table through its (user_id, added_at) index a page at a time.
+    """
+    
+    def __init__(self, db: Database, max_favorites: int = None, cached_users: int = None):
+        self.db = db
+        self.max_favorites = max_favorites or config.DATABASE.max_favorites
+        self.cached_users = cached_users or config.DATABASE.favorites_cached_users
+        
+        # user_id -> {track_id: added_at}, least recently used user first
+        self._ids: "OrderedDict[int, Dict[str, float]]" = OrderedDict()
+        self._dirty = False
+    
+    async def _user(self, user_id: int) -> Dict[str, float]:
+        ids = self._ids.get(user_id)
+        if ids is not None:
+            self._ids.move_to_end(user_id)
+            return ids
+        
+        await self._settle()
+        rows = await self.db.fetch_all(
+            "SELECT track_id, added_at FROM favorites WHERE user_id = ? ORDER BY added_at", (user_id,)
+        )
+        # Another call may have loaded (and changed) this user while we read
+        ids = self._ids.get(user_id)
+        if ids is None:
+            ids = self._ids[user_id] = {row["track_id"]: row["added_at"] for row in rows}
+            while len(self._ids) > self.cached_users:
+                self._ids.popitem(last=False)
+        return ids
+    
+    async def _settle(self):
+        """Make queued writes visible to reads"""
+        if self._dirty:
+            self._dirty = False
+            await self.db.flush()
+    
+    # ═══════════════════════════════════════════════════════════
+    # ✏️ CHANGES
+    # ═══════════════════════════════════════════════════════════
+    
+    async def add(self, user_id: int, track: Track) -> bool:
+        """False when the track is already a favorite or the user is at the limit"""
+        ids = await self._user(user_id)
+        track_id = track.track_id
+        if track_id in ids or len(ids) >= self.max_favorites:
+            return False
+        
+        added_at = time.time()
+        ids[track_id] = added_at
+        self.db.write(
+            f"INSERT OR REPLACE INTO favorites (user_id, track_id, {_COLUMNS}, added_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                user_id, track_id, track.title, track.url, int(track.duration) if track.duration else None,
+                track.artist, track.thumbnail, track.source_type, added_at,
+            ),
+        )
+        self._dirty = True
+        return True
+    
+    async def remove(self, user_id: int, track: Track) -> bool:
+        ids = await self._user(user_id)
+        if ids.pop(track.track_id, None) is None:
+            return False
+        self.db.write("DELETE FROM favorites WHERE user_id = ? AND track_id = ?", (user_id, track.track_id))
+        self._dirty = True
+        return True
+    
+    async def contains(self, user_id: int, track: Track) -> bool:
+        return track.track_id in await self._user(user_id)
+    
+    async def count(self, user_id: int) -> int:
+        return len(await self._user(user_id))
+    
+    # ═══════════════════════════════════════════════════════════
+    # 📄 LISTING
+    # ═══════════════════════════════════════════════════════════
+    
+    async def page(self, user_id: int, page: int = 1, per_page: int = 10) -> List[Track]:
+        """One page of favorites, newest first"""
+        await self._settle()
+        rows = await self.db.fetch_all(
+            f"SELECT {_COLUMNS} FROM favorites WHERE user_id = ? ORDER BY added_at DESC LIMIT ? OFFSET ?",
+            (user_id, per_page, (max(1, page) - 1) * per_page),
+        )
+        return [_track_from_row(row) for row in rows]
+    
+    async def tracks(self, user_id: int, requester: Optional[discord.Member] = None, limit: int = None) -> List[Track]:
+        """Favorites oldest first, ready to enqueue"""
+        await self._settle()
+        rows = await self.db.fetch_all(
+            f"SELECT {_COLUMNS} FROM favorites WHERE user_id = ? ORDER BY added_at LIMIT ?",
+            (user_id, limit or self.max_favorites),
+        )
+        return [_track_from_row(row, requester) for row in rows]
+    
+    def stats(self) -> dict:
+        return {
+            "cached_users": len(self._ids),
+            "cached_favorites": sum(len(ids) for ids in self._ids.values()),
+        }
+
+
+_store: Optional[FavoritesStore] = None
+
+
+def get_favorites_store() -> FavoritesStore:
+    """Get the process-wide favorites store"""
+    global _store
+    if _store is None or not _store.db.is_open:
+        _store = FavoritesStore(get_database())
+    return _store
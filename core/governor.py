@@ -0,0 +1,217 @@
+"""
+🎚️ Quality Governor
+Steps audio quality down under CPU pressure and back up when it passes
+"""
+
+import asyncio
+import logging
+import os
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Optional
+
+import config
+from core.scheduler import get_scheduler
+
+logger = logging.getLogger('ShlokMusic.Governor')
+
+# Lowest bitrate any step may choose (kbps)
+MIN_BITRATE = 32
+
+# Consecutive hot samples before stepping down
+HOT_SAMPLES = 2
+
+# ═══════════════════════════════════════════════════════════════
+# 📶 QUALITY LEVELS
+# ═══════════════════════════════════════════════════════════════
+
+@dataclass(frozen=True)
+class QualityLevel:
+    """One step of the degradation ladder"""
+    name: str
+    bitrate_scale: float  # share of the guild's bitrate ceiling
+    complexity: int  # Opus encoder complexity (0-10)
+    effects: bool  # audio effects allowed
+    passthrough: bool  # move cached tracks to stored packets, skipping volume
+    
+    def bitrate(self, ceiling: int) -> int:
+        return min(ceiling, max(MIN_BITRATE, int(ceiling * self.bitrate_scale)))
+
+
+QUALITY_LEVELS = [
+    QualityLevel("full", 1.0, 10, True, False),
+    QualityLevel("no effects", 1.0, 10, False, False),
+    QualityLevel("reduced", 0.75, 7, False, False),
+    QualityLevel("low", 0.5, 5, False, True),
+    QualityLevel("minimal", 0.375, 3, False, True),
+]
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🎚️ GOVERNOR
+# ═══════════════════════════════════════════════════════════════
+
+class QualityGovernor:
+    """
+    Samples send-loop overruns and system load, and moves every player
+    one level at a time along QUALITY_LEVELS
+    
+    It steps down after HOT_SAMPLES consecutive samples above the high
+    thresholds and steps back up after ``recover_after`` seconds below
+    the low ones, so one busy moment doesn't flap the whole node.
+    """
+    
+    def __init__(self, interval: float = None, recover_after: float = None):
+        self.interval = interval or config.MUSIC.governor_interval
+        self.recover_after = recover_after or config.MUSIC.governor_recover_after
+        
+        self.level_index = 0
+        self._players: "weakref.WeakSet" = weakref.WeakSet()
+        self._task: Optional[asyncio.Task] = None
+        self._last_counters: Optional[tuple] = None
+        self._hot = 0
+        self._calm_since: Optional[float] = None
+        
+        # Stats
+        self.steps_down = 0
+        self.steps_up = 0
+        self.pressure = {"overrun_ratio": 0.0, "late_ratio": 0.0, "load": 0.0}
+        self.changed_at: Optional[float] = None
+    
+    @property
+    def level(self) -> QualityLevel:
+        return QUALITY_LEVELS[self.level_index]
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🔄 LIFECYCLE
+    # ═══════════════════════════════════════════════════════════
+    
+    def register(self, player):
+        """Apply future quality changes to ``player``"""
+        self._players.add(player)
+        self.start()
+    
+    def start(self):
+        """Start sampling on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_event_loop().create_task(self._run())
+    
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"❌ Quality governor failed: {e}")
+    
+    # ═══════════════════════════════════════════════════════════
+    # 📈 SAMPLING
+    # ═══════════════════════════════════════════════════════════
+    
+    def sample(self) -> dict:
+        """Overrun and late-frame ratios since the last sample, and load per CPU"""
+        scheduler = get_scheduler()
+        counters = (scheduler.ticks, scheduler.tick_overruns, scheduler.frames_sent, scheduler.late_frames)
+        last, self._last_counters = self._last_counters, counters
+        
+        overrun_ratio = late_ratio = 0.0
+        if last:
+            ticks, overruns, frames, late = (now - before for now, before in zip(counters, last))
+            overrun_ratio = overruns / ticks if ticks > 0 else 0.0
+            late_ratio = late / frames if frames > 0 else 0.0
+        
+        try:
+            load = os.getloadavg()[0] / (os.cpu_count() or 1)
+        except OSError:
+            load = 0.0
+        
+        self.pressure = {
+            "overrun_ratio": round(overrun_ratio, 4),
+            "late_ratio": round(late_ratio, 4),
+            "load": round(load, 2),
+        }
+        return self.pressure
+    
+    def tick(self, now: float = None):
+        """Take one sample and step the level if pressure calls for it"""
+        now = time.monotonic() if now is None else now
+        pressure = self.sample()
+        music = config.MUSIC
+        
+        hot = (
+            pressure["overrun_ratio"] >= music.governor_overrun_high
+            or pressure["late_ratio"] >= music.governor_overrun_high
+            or pressure["load"] >= music.governor_load_high
+        )
+        calm = (
+            pressure["overrun_ratio"] <= music.governor_overrun_low
+            and pressure["late_ratio"] <= music.governor_overrun_low
+            and pressure["load"] <= music.governor_load_low
+        )
+        
+        if hot:
+            self._calm_since = None
+            self._hot += 1
+            if self._hot >= HOT_SAMPLES and self.level_index < len(QUALITY_LEVELS) - 1:
+                self._hot = 0
+                self._step(+1)
+        elif calm:
+            self._hot = 0
+            if self._calm_since is None:
+                self._calm_since = now
+            elif now - self._calm_since >= self.recover_after and self.level_index > 0:
+                self._calm_since = now
+                self._step(-1)
+        else:
+            self._hot = 0
+            self._calm_since = None
+    
+    def _step(self, direction: int):
+        self.level_index += direction
+        self.changed_at = time.time()
+        if direction > 0:
+            self.steps_down += 1
+            logger.warning(f"📉 Node under pressure {self.pressure}, quality down to '{self.level.name}'")
+        else:
+            self.steps_up += 1
+            logger.info(f"📈 Load eased, quality up to '{self.level.name}'")
+        
+        for player in list(self._players):
+            try:
+                player.apply_quality(self.level)
+            except Exception as e:
+                logger.error(f"❌ Could not apply quality in guild {getattr(player, 'guild_id', None)}: {e}")
+    
+    def stats(self) -> dict:
+        return {
+            "level": self.level.name,
+            "level_index": self.level_index,
+            "players": len(self._players),
+            "pressure": self.pressure,
+            "steps_down": self.steps_down,
+            "steps_up": self.steps_up,
+            "changed_at": self.changed_at,
+        }
+
+
+_governor: Optional[QualityGovernor] = None
+
+
+def get_quality_governor() -> Optional[QualityGovernor]:
+    """Get the process-wide quality governor (None when disabled)"""
+    global _governor
+    if _governor is None and config.MUSIC.quality_governor:
+        _governor = QualityGovernor()
+    return _governor
+
+
+def current_quality() -> QualityLevel:
+    """Quality level players should use right now"""
+    governor = get_quality_governor()
+    return governor.level if governor else QUALITY_LEVELS[0]
@@ -0,0 +1,160 @@
+"""
+📜 Play Log
+Every finished play per guild, with outcome, for history and most-played queries
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import discord
+
+import config
+from core.database import Database, get_database
+from core.track import Track
+
+logger = logging.getLogger('ShlokMusic.History')
+
+# Why a play ended
+OUTCOME_COMPLETE = "complete"
+OUTCOME_SKIP = "skip"
+OUTCOME_STOP = "stop"
+OUTCOME_ERROR = "error"
+
+_COLUMNS = "title, url, duration, artist, thumbnail, source_type"
+
+
+def _track_from_row(row, requester: Optional[discord.Member] = None) -> Track:
+    return Track(
+        title=row["title"],
+        url=row["url"],
+        duration=row["duration"],
+        thumbnail=row["thumbnail"],
+        artist=row["artist"],
+        requester=requester,
+        source_type=row["source_type"],
+    )
+
+
+@dataclass
+class PlayRecord:
+    """One play from the log"""
+    track: Track
+    requester_id: Optional[int]
+    started_at: float
+    played: float  # seconds actually heard
+    outcome: str
+
+
+# ═══════════════════════════════════════════════════════════════
+# 📜 PLAY LOG
+# ═══════════════════════════════════════════════════════════════
+
+class PlayLog:
+    """
+    Append-only ``play_log`` plus running ``play_counts`` per guild and track
+    
+    A play is recorded once, when it ends, through the database's
+    write-behind queue; the log row and the count update land in the same
+    batch. "Recently played" walks the (guild_id, started_at) index and
+    "most played" the (guild_id, plays) one, so neither scans the log.
+    """
+    
+    def __init__(self, db: Database):
+        self.db = db
+        self._dirty = False
+        self.recorded = 0
+    
+    def record(self, guild_id: int, track: Track, started_at: float, played: float, outcome: str):
+        duration = int(track.duration) if track.duration else None
+        values = (track.title, track.url, duration, track.artist, track.thumbnail, track.source_type)
+        
+        self.db.write(
+            f"INSERT INTO play_log (guild_id, track_id, {_COLUMNS}, requester_id, started_at, played, outcome) "
+            f"VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (guild_id, track.track_id, *values, track.requester_id, started_at, round(played, 1), outcome),
+        )
+        self.db.write(
+            f"""
+            INSERT INTO play_counts (guild_id, track_id, {_COLUMNS}, plays, completions, skips, last_played)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, ?, ?, ?)
+            ON CONFLICT(guild_id, track_id) DO UPDATE SET
+                title = excluded.title,
+                url = excluded.url,
+                duration = excluded.duration,
+                artist = excluded.artist,
+                thumbnail = excluded.thumbnail,
+                source_type = excluded.source_type,
+                plays = plays + 1,
+                completions = completions + excluded.completions,
+                skips = skips + excluded.skips,
+                last_played = excluded.last_played
+            """,
+            (guild_id, track.track_id, *values, int(outcome == OUTCOME_COMPLETE), int(outcome == OUTCOME_SKIP), started_at),
+        )
+        self._dirty = True
+        self.recorded += 1
+    
+    async def _settle(self):
+        """Make queued writes visible to reads"""
+        if self._dirty:
+            self._dirty = False
+            await self.db.flush()
+    
+    def prune(self, days: int = None):
+        """Drop log rows older than the retention period (counts are kept)"""
+        days = days or config.DATABASE.play_log_retention_days
+        self.db.write("DELETE FROM play_log WHERE started_at < ?", (time.time() - days * 86400,))
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🔍 QUERIES
+    # ═══════════════════════════════════════════════════════════
+    
+    async def recent(self, guild_id: int, limit: int = 10, offset: int = 0) -> List[PlayRecord]:
+        """Plays in this guild, newest first"""
+        await self._settle()
+        rows = await self.db.fetch_all(
+            f"SELECT {_COLUMNS}, requester_id, started_at, played, outcome FROM play_log "
+            f"WHERE guild_id = ? ORDER BY started_at DESC LIMIT ? OFFSET ?",
+            (guild_id, limit, offset),
+        )
+        return [
+            PlayRecord(_track_from_row(row), row["requester_id"], row["started_at"], row["played"], row["outcome"])
+            for row in rows
+        ]
+    
+    async def most_played(self, guild_id: int, limit: int = 10) -> List[Tuple[Track, int]]:
+        """Tracks played most often in this guild, with their play counts"""
+        await self._settle()
+        rows = await self.db.fetch_all(
+            f"SELECT {_COLUMNS}, plays FROM play_counts WHERE guild_id = ? ORDER BY plays DESC LIMIT ?",
+            (guild_id, limit),
+        )
+        return [(_track_from_row(row), row["plays"]) for row in rows]
+    
+    async def play_again(self, guild_id: int, position: int, requester: Optional[discord.Member] = None) -> Optional[Track]:
+        """The ``position``-th most recent play (1 = last one), ready to enqueue"""
+        if position < 1:
+            return None
+        records = await self.recent(guild_id, limit=1, offset=position - 1)
+        if not records:
+            return None
+        track = records[0].track
+        track.requester = requester
+        return track
+    
+    def stats(self) -> dict:
+        return {"recorded": self.recorded}
+
+
+_log: Optional[PlayLog] = None
+
+
+def get_play_log() -> Optional[PlayLog]:
+    """Get the process-wide play log (None when disabled)"""
+    global _log
+    if (_log is None or not _log.db.is_open) and config.DATABASE.play_log:
+        _log = PlayLog(get_database())
+        _log.prune()
+    return _log
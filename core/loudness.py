@@ -0,0 +1,91 @@
+"""
+🔊 Loudness Analysis
+EBU R128 measurement and static normalization gain per track
+"""
+
+import logging
+import re
+import subprocess
+from typing import Optional
+
+import config
+
+logger = logging.getLogger('ShlokMusic.Loudness')
+
+INTEGRATED_PATTERN = re.compile(r'I:\s+(-?[\d.]+) LUFS')
+RANGE_PATTERN = re.compile(r'LRA:\s+(-?[\d.]+) LU\b')
+PEAK_PATTERN = re.compile(r'Peak:\s+(-?[\d.]+|-inf) dBFS')
+
+# Keep normalized audio this far below full scale
+TRUE_PEAK_CEILING = -1.0
+
+# ═══════════════════════════════════════════════════════════════
+# 📏 MEASUREMENT
+# ═══════════════════════════════════════════════════════════════
+
+def measure_loudness(source: str, timeout: float = 600) -> Optional[dict]:
+    """
+    Measure integrated loudness, loudness range and true peak of a file
+    
+    Runs FFmpeg's ebur128 filter once over the whole input. Returns
+    ``{"i": LUFS, "lra": LU, "tp": dBTP}`` or None when it fails.
+    """
+    try:
+        result = subprocess.run(
+            [
+                "ffmpeg", "-nostdin", "-hide_banner", "-nostats",
+                "-i", source,
+                "-vn", "-af", "ebur128=peak=true:framelog=verbose",
+                "-f", "null", "-",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            timeout=timeout
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Loudness measurement failed: {e}")
+        return None
+    
+    return parse_ebur128(result.stderr.decode(errors="ignore"))
+
+
+def parse_ebur128(output: str) -> Optional[dict]:
+    """Read the summary printed by FFmpeg's ebur128 filter"""
+    summary = output[output.rfind("Summary:"):] if "Summary:" in output else ""
+    
+    integrated = INTEGRATED_PATTERN.search(summary)
+    if not integrated:
+        return None
+    
+    loudness_range = RANGE_PATTERN.search(summary)
+    peak = PEAK_PATTERN.search(summary)
+    true_peak = float(peak.group(1)) if peak and peak.group(1) != "-inf" else -70.0
+    
+    return {
+        "i": float(integrated.group(1)),
+        "lra": float(loudness_range.group(1)) if loudness_range else 0.0,
+        "tp": true_peak,
+    }
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🎚️ GAIN
+# ═══════════════════════════════════════════════════════════════
+
+def normalization_gain_db(loudness: dict, target: float = None, max_gain: float = None) -> float:
+    """
+    Static gain (dB) that brings a track to the loudness target
+    
+    Boosts are limited by ``max_gain`` and by the true peak ceiling, so
+    quiet tracks with loud transients are not pushed into clipping.
+    """
+    target = config.MUSIC.loudness_target if target is None else target
+    max_gain = config.MUSIC.max_normalization_gain if max_gain is None else max_gain
+    
+    gain = target - loudness["i"]
+    gain = min(gain, max_gain, TRUE_PEAK_CEILING - loudness["tp"])
+    return round(gain, 2)
+
+
+def db_to_linear(db: float) -> float:
+    return 10 ** (db / 20)
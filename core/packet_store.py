@@ -0,0 +1,398 @@
+"""
+📦 Opus Packet Store
+Plays cached Ogg/Opus files packet by packet, straight from a memory map
+"""
+
+import logging
+import mmap
+import os
+import struct
+import threading
+from typing import Optional, Dict, List, Tuple
+
+import discord
+from discord import opus
+
+logger = logging.getLogger('ShlokMusic.PacketStore')
+
+# Length of one Opus frame in seconds (20 ms)
+FRAME_DELAY = opus.Encoder.FRAME_LENGTH / 1000.0
+SAMPLES_PER_PACKET = 960  # 20 ms at 48 kHz
+
+# ═══════════════════════════════════════════════════════════════
+# 📐 FILE FORMATS
+# ═══════════════════════════════════════════════════════════════
+
+# Ogg page header: capture, version, type, granule, serial, sequence, crc, segments
+OGG_PAGE = struct.Struct('<4sBBqIIIB')
+
+# Packet index: magic, version, pre-skip, packets, source size, source mtime (ns)
+INDEX_MAGIC = b'OPIX'
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct('<4sHHIQQ')
+
+# One entry per packet: file offset and length. Packets split across Ogg
+# pages have length 0 and an offset pointing at their fragment record.
+INDEX_ENTRY = struct.Struct('<QI')
+FRAGMENT_COUNT = struct.Struct('<H')
+
+
+def index_path_for(path: str) -> str:
+    """Path of the packet index that belongs to an Ogg/Opus file"""
+    return os.path.splitext(path)[0] + '.idx'
+
+
+def _packet_samples(packet) -> int:
+    """Duration of an Opus packet in 48 kHz samples, from its TOC byte"""
+    toc = packet[0]
+    config_number = toc >> 3
+    
+    if config_number < 12:
+        # SILK: 10, 20, 40, 60 ms
+        frame = (480, 960, 1920, 2880)[config_number % 4]
+    elif config_number < 16:
+        # Hybrid: 10, 20 ms
+        frame = (480, 960)[config_number % 2]
+    else:
+        # CELT: 2.5, 5, 10, 20 ms
+        frame = (120, 240, 480, 960)[config_number % 4]
+    
+    code = toc & 0x03
+    if code == 0:
+        frames = 1
+    elif code in (1, 2):
+        frames = 2
+    else:
+        frames = packet[1] & 0x3F if len(packet) > 1 else 0
+    return frame * frames
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🗂️ INDEX BUILDER
+# ═══════════════════════════════════════════════════════════════
+
+def _scan_packets(data) -> List[List[Tuple[int, int]]]:
+    """Split an Ogg stream into packets, each a list of (offset, length) fragments"""
+    packets: List[List[Tuple[int, int]]] = []
+    current: List[Tuple[int, int]] = []
+    serial = None
+    pos = 0
+    size = len(data)
+    
+    while pos + OGG_PAGE.size <= size:
+        capture, version, _, _, page_serial, _, _, segments = OGG_PAGE.unpack_from(data, pos)
+        if capture != b'OggS' or version != 0:
+            raise ValueError(f"Invalid Ogg page at offset {pos}")
+        
+        if serial is None:
+            serial = page_serial
+        elif page_serial != serial:
+            raise ValueError("Multiplexed or chained Ogg streams are not supported")
+        
+        table_at = pos + OGG_PAGE.size
+        offset = table_at + segments
+        for lacing in data[table_at:table_at + segments]:
+            if lacing:
+                if current and current[-1][0] + current[-1][1] == offset:
+                    # Same page, the fragment simply grows
+                    current[-1] = (current[-1][0], current[-1][1] + lacing)
+                else:
+                    current.append((offset, lacing))
+                offset += lacing
+            
+            if lacing < 255:
+                packets.append(current)
+                current = []
+        
+        pos = offset
+    
+    if pos != size:
+        raise ValueError("Truncated Ogg file")
+    return packets
+
+
+def build_index(path: str) -> str:
+    """
+    Write the packet index of an Ogg/Opus file and return its path
+    
+    Only files made of 20 ms packets are indexed, since every packet is
+    sent as one voice frame. Raises ValueError for anything else.
+    """
+    with open(path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        if not stat.st_size:
+            raise ValueError("Empty file")
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            packets = _scan_packets(mm)
+            
+            if len(packets) < 2 or not packets[0] or mm[packets[0][0][0]:packets[0][0][0] + 8] != b'OpusHead':
+                raise ValueError("Not an Ogg/Opus file")
+            
+            head_at = packets[0][0][0]
+            (pre_skip,) = struct.unpack_from('<H', mm, head_at + 10)
+            
+            # Skip OpusHead and OpusTags
+            audio = packets[2:]
+            entries = bytearray()
+            fragments = bytearray()
+            fragments_at = INDEX_HEADER.size + len(audio) * INDEX_ENTRY.size
+            
+            for parts in audio:
+                first_at, first_len = parts[0] if parts else (0, 0)
+                if not parts or not first_len:
+                    raise ValueError("Empty Opus packet")
+                
+                toc = mm[first_at:first_at + 2]
+                if _packet_samples(toc) != SAMPLES_PER_PACKET:
+                    raise ValueError("Opus packets are not 20 ms long")
+                
+                if len(parts) == 1:
+                    entries += INDEX_ENTRY.pack(first_at, first_len)
+                else:
+                    entries += INDEX_ENTRY.pack(fragments_at + len(fragments), 0)
+                    fragments += FRAGMENT_COUNT.pack(len(parts))
+                    for part in parts:
+                        fragments += INDEX_ENTRY.pack(*part)
+    
+    index_path = index_path_for(path)
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, pre_skip, len(audio), stat.st_size, stat.st_mtime_ns))
+        f.write(entries)
+        f.write(fragments)
+    os.replace(tmp_path, index_path)
+    
+    return index_path
+
+
+# ═══════════════════════════════════════════════════════════════
+# 📦 PACKET STORE
+# ═══════════════════════════════════════════════════════════════
+
+class PacketStore:
+    """
+    A cached Ogg/Opus file and its packet index, both memory mapped
+    
+    Reading a packet is one index lookup and a slice of the mapping, so
+    any number of streams can share the same file without a decoder, an
+    encoder or an FFmpeg process. Seeking is a multiplication.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.refs = 0
+        
+        self._file = open(path, 'rb')
+        try:
+            stat = os.fstat(self._file.fileno())
+            self.key = (path, stat.st_size, stat.st_mtime_ns)
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                self._index_file, self._index = self._open_index(stat)
+            except Exception:
+                self._data.close()
+                raise
+        except Exception:
+            self._file.close()
+            raise
+        
+        self._view = memoryview(self._data)
+        _, _, self.pre_skip, self.packets, _, _ = INDEX_HEADER.unpack_from(self._index, 0)
+    
+    def _open_index(self, stat: os.stat_result):
+        """Map the packet index, (re)building it when missing or stale"""
+        index_path = index_path_for(self.path)
+        
+        for attempt in range(2):
+            try:
+                index_file = open(index_path, 'rb')
+            except FileNotFoundError:
+                index_file = None
+            
+            if index_file is not None:
+                try:
+                    index = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:
+                    # Empty file
+                    index = None
+                
+                if index is not None:
+                    if len(index) >= INDEX_HEADER.size:
+                        magic, version, _, _, size, mtime = INDEX_HEADER.unpack_from(index, 0)
+                        if (magic, version, size, mtime) == (INDEX_MAGIC, INDEX_VERSION, stat.st_size, stat.st_mtime_ns):
+                            return index_file, index
+                    index.close()
+                index_file.close()
+            
+            if attempt == 0:
+                build_index(self.path)
+        
+        raise ValueError(f"Could not index {self.path}")
+    
+    @property
+    def duration(self) -> float:
+        """Length of the track in seconds"""
+        return self.packets * FRAME_DELAY
+    
+    def index_for(self, seconds: float) -> int:
+        """Packet that plays at ``seconds`` into the track"""
+        return max(0, min(self.packets, int(seconds / FRAME_DELAY)))
+    
+    def packet(self, index: int):
+        """Packet ``index``, as a zero-copy view where possible"""
+        offset, length = INDEX_ENTRY.unpack_from(self._index, INDEX_HEADER.size + index * INDEX_ENTRY.size)
+        if length:
+            return self._view[offset:offset + length]
+        
+        # Split across Ogg pages, join the fragments
+        (count,) = FRAGMENT_COUNT.unpack_from(self._index, offset)
+        parts = []
+        at = offset + FRAGMENT_COUNT.size
+        for _ in range(count):
+            part_at, part_len = INDEX_ENTRY.unpack_from(self._index, at)
+            parts.append(self._data[part_at:part_at + part_len])
+            at += INDEX_ENTRY.size
+        return b''.join(parts)
+    
+    def close(self):
+        """Unmap the file and its index"""
+        for handle in (self._view, self._index, self._index_file, self._data, self._file):
+            try:
+                handle.release() if isinstance(handle, memoryview) else handle.close()
+            except BufferError:
+                # A packet view is still alive somewhere, the GC unmaps it later
+                pass
+
+
+class PacketStoreRegistry:
+    """Open packet stores, shared by every stream playing the same file"""
+    
+    def __init__(self):
+        self._stores: Dict[tuple, PacketStore] = {}
+        self._lock = threading.Lock()
+        
+        # Stats
+        self.streams_opened = 0
+        self.packets_served = 0
+        self.open_failures = 0
+    
+    def acquire(self, path: str) -> Optional[PacketStore]:
+        """Open (or share) the store for a file, or None if it can't be indexed"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        key = (path, stat.st_size, stat.st_mtime_ns)
+        
+        with self._lock:
+            store = self._stores.get(key)
+            if store is None:
+                try:
+                    store = PacketStore(path)
+                except Exception as e:
+                    self.open_failures += 1
+                    logger.warning(f"⚠️ Can't play {os.path.basename(path)} as packets: {e}")
+                    return None
+                self._stores[store.key] = store
+            
+            store.refs += 1
+            self.streams_opened += 1
+            return store
+    
+    def release(self, store: PacketStore):
+        """Drop a reference, closing the store when it was the last"""
+        with self._lock:
+            store.refs -= 1
+            if store.refs > 0:
+                return
+            if self._stores.get(store.key) is store:
+                del self._stores[store.key]
+        store.close()
+    
+    def stats(self) -> dict:
+        with self._lock:
+            stores = list(self._stores.values())
+        return {
+            "open_files": len(stores),
+            "active_streams": sum(store.refs for store in stores),
+            "streams_opened": self.streams_opened,
+            "packets_served": self.packets_served,
+            "open_failures": self.open_failures,
+        }
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🎧 OPUS PACKET SOURCE
+# ═══════════════════════════════════════════════════════════════
+
+class OpusPacketSource(discord.AudioSource):
+    """
+    Hands pre-encoded 20 ms Opus packets straight to the voice client
+    
+    No subprocess, no decoding and no encoding: volume and effects can't
+    be applied, so players only use it at unity gain.
+    """
+    
+    # Packets are views into the mapped file, read() never waits
+    nonblocking = True
+    
+    def __init__(self, registry: PacketStoreRegistry, store: PacketStore, start_at: float = 0.0):
+        self._registry = registry
+        self.store = store
+        self._index = store.index_for(start_at)
+        self._closed = False
+    
+    @property
+    def path(self) -> str:
+        return self.store.path
+    
+    @property
+    def position(self) -> float:
+        """Track position of the next packet, in seconds"""
+        return self._index * FRAME_DELAY
+    
+    def seek(self, seconds: float):
+        """Jump to ``seconds`` into the track"""
+        self._index = self.store.index_for(seconds)
+    
+    def is_opus(self) -> bool:
+        return True
+    
+    def read(self):
+        if self._closed or self._index >= self.store.packets:
+            return b''
+        
+        packet = self.store.packet(self._index)
+        self._index += 1
+        self._registry.packets_served += 1
+        return packet
+    
+    def cleanup(self):
+        if not self._closed:
+            self._closed = True
+            self._registry.release(self.store)
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🌐 SHARED INSTANCE
+# ═══════════════════════════════════════════════════════════════
+
+_registry: Optional[PacketStoreRegistry] = None
+
+
+def get_packet_registry() -> PacketStoreRegistry:
+    """Get the process-wide packet store registry"""
+    global _registry
+    if _registry is None:
+        _registry = PacketStoreRegistry()
+    return _registry
+
+
+def open_packet_source(path: str, start_at: float = 0.0) -> Optional[OpusPacketSource]:
+    """Packet source for a cached Ogg/Opus file, or None if it can't be used"""
+    registry = get_packet_registry()
+    store = registry.acquire(path)
+    if store is None:
+        return None
+    return OpusPacketSource(registry, store, start_at)
@@ -5,16 +5,32 @@ Handles all audio playback and voice connection logic
 
 import asyncio
 import logging
+import random
+import time
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, Any
 from enum import Enum
 
 import discord
 from discord.ext import commands
 
 import config
+from core.analytics import get_analytics
+from core.buffer import BufferedAudioSource
+from core.cache import get_audio_cache
+from core.encoder import MAX_COMPLEXITY, PooledOpusSource, get_encoder_pool
+from core.governor import QualityLevel, current_quality, get_quality_governor
+from core.history import OUTCOME_COMPLETE, OUTCOME_ERROR, OUTCOME_SKIP, OUTCOME_STOP, get_play_log
+from core.packet_store import OpusPacketSource, open_packet_source
 from core.queue import MusicQueue
+from core.scheduler import get_scheduler, ScheduledStream
+from core.session import get_session_store
+from core.settings import get_guild_settings
+from core.station import Station
+from core.supervisor import get_ffmpeg_supervisor
 from core.track import Track
+from core.warmer import PRIORITY_UPCOMING, get_cache_warmer
 
 logger = logging.getLogger('ShlokMusic.Player')
 
@@ -49,11 +65,39 @@ class MusicPlayer:
     def __init__(self, bot: commands.Bot, guild_id: int):
         self.bot = bot
         self.guild_id = guild_id
+        settings = get_guild_settings().get(guild_id)
         
         # Voice connection
         self.voice_client: Optional[discord.VoiceClient] = None
         self.text_channel: Optional[discord.TextChannel] = None
         
+        # Stream on the shared audio scheduler (None when using AudioPlayer)
+        self._stream: Optional[ScheduledStream] = None
+        self._stream_generation = 0
+        
+        # Innermost source of the current stream that knows its position
+        self._position_source: Optional[discord.AudioSource] = None
+        
+        # Stream watchdog
+        self._skip_requested = False
+        self._recoveries = 0
+        self.stream_recoveries = 0
+        
+        # Broadcast station this player is tuned in to
+        self.station: Optional[Station] = None
+        
+        # Idle mode: stream released while nobody is listening
+        self.suspended = False
+        self.suspensions = 0
+        self._suspend_position = 0.0
+        self._suspend_paused = False
+        self._idle_task: Optional[asyncio.Task] = None
+        
+        # Voice reconnects (time to audio restored, ms)
+        self._reconnecting = False
+        self.voice_reconnects = 0
+        self.reconnect_times: deque = deque(maxlen=20)
+        
         # Queue
         self.queue = MusicQueue()
         
@@ -62,32 +106,36 @@ class MusicPlayer:
         self.now_playing_message: Optional[discord.Message] = None
         
         # Player state
-        self.volume = config.MUSIC.default_volume / 100
+        self.volume = settings.default_volume / 100
+        self._track_gain = 1.0  # Loudness normalization of the current track
         self.loop_mode = LoopMode.OFF
         self.is_paused = False
         self.is_playing = False
         
         # Audio effect
-        self.current_effect = "none"
+        self.current_effect = settings.default_effect
         
         # Track timing
         self.track_start_time: Optional[datetime] = None
         self.paused_duration = timedelta()
         self.pause_start_time: Optional[datetime] = None
         
-        # History
-        self.history: List[Track] = []
+        # History (ring buffer of finished tracks)
         self.max_history = 50
-        
-        # Favorites per user
-        self.favorites: Dict[int, List[Track]] = {}
+        self.history: deque = deque(maxlen=self.max_history)
+        self._play_started: Optional[float] = None  # when the current play began (epoch)
         
         # Auto-update task
         self._progress_task: Optional[asyncio.Task] = None
         self._play_lock = asyncio.Lock()
         
         # 24/7 mode
-        self.stay_connected = config.MUSIC.stay_connected_24_7
+        self.stay_connected = settings.stay_connected
+        
+        # Quality steps down together with the rest of the node under CPU pressure
+        governor = get_quality_governor()
+        if governor:
+            governor.register(self)
         
     @property
     def guild(self) -> Optional[discord.Guild]:
@@ -99,6 +147,44 @@ class MusicPlayer:
         """Check if connected to voice"""
         return self.voice_client is not None and self.voice_client.is_connected()
     
+    @property
+    def audio(self):
+        """Playback control for the current stream (scheduler stream or voice client)"""
+        if self._stream is not None and not self._stream.is_done():
+            return self._stream
+        return self.voice_client
+    
+    @property
+    def quality(self) -> QualityLevel:
+        """Quality level set by the governor"""
+        return current_quality()
+    
+    @property
+    def bitrate_ceiling(self) -> int:
+        """Highest useful bitrate (kbps): the configured one, capped by the voice channel"""
+        channel = self.voice_client.channel if self.voice_client else None
+        channel_bitrate = getattr(channel, 'bitrate', 0) // 1000
+        return min(config.MUSIC.audio_bitrate, channel_bitrate) if channel_bitrate else config.MUSIC.audio_bitrate
+    
+    @property
+    def target_bitrate(self) -> int:
+        return self.quality.bitrate(self.bitrate_ceiling)
+    
+    @property
+    def effects_enabled(self) -> bool:
+        """False while the node is too busy for audio effects"""
+        return self.quality.effects
+    
+    @property
+    def queue_limit(self) -> int:
+        """The guild's max queue size (see !settings maxqueue)"""
+        return get_guild_settings().get(self.guild_id).max_queue_size
+    
+    @property
+    def queue_space(self) -> int:
+        """Tracks that still fit in the queue under the guild's max queue size"""
+        return max(0, self.queue_limit - len(self.queue))
+    
     @property
     def elapsed_time(self) -> timedelta:
         """Get elapsed time of current track"""
@@ -112,15 +198,25 @@ class MusicPlayer:
         
         return elapsed
     
+    @property
+    def playback_position(self) -> float:
+        """Seconds into the current track that have actually been played"""
+        if self._position_source is None:
+            return self.elapsed_time.total_seconds()
+        return self._position_source.position
+    
     # ═══════════════════════════════════════════════════════════
     # 🔊 CONNECTION METHODS
     # ═══════════════════════════════════════════════════════════
     
     async def connect(self, channel: discord.VoiceChannel) -> bool:
-        """Connect to a voice channel with retry logic"""
-        max_retries = 3
+        """Connect to a voice channel, retrying with jittered exponential backoff"""
+        max_retries = max(1, config.MUSIC.reconnect_attempts)
         
         for attempt in range(max_retries):
+            if attempt:
+                await asyncio.sleep(self._backoff_delay(attempt - 1))
+            
             try:
                 # Clean up existing connection first
                 if self.voice_client:
@@ -153,17 +249,12 @@ class MusicPlayer:
                     self_deaf=True
                 )
                 
-                # Wait a moment for connection to stabilize
-                await asyncio.sleep(0.5)
-                
                 if self.voice_client and self.voice_client.is_connected():
                     logger.info(f"🔊 Connected to {channel.name} in {channel.guild.name}")
                     return True
                     
             except asyncio.TimeoutError:
                 logger.warning(f"⏱️ Timeout connecting to {channel.name} (attempt {attempt + 1})")
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(2)  # Wait before retry
                 continue
             except discord.ClientException as e:
                 logger.warning(f"⚠️ Client exception: {e}")
@@ -175,17 +266,20 @@ class MusicPlayer:
                         except:
                             pass
                 self.voice_client = None
-                await asyncio.sleep(1)
                 continue
             except Exception as e:
                 logger.error(f"❌ Error connecting to voice: {e}")
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(2)
                 continue
         
         logger.error(f"❌ Failed to connect after {max_retries} attempts")
         return False
     
+    @staticmethod
+    def _backoff_delay(attempt: int) -> float:
+        """Full-jitter exponential backoff, so guilds dropped together don't retry in lockstep"""
+        ceiling = min(config.MUSIC.reconnect_backoff_max, config.MUSIC.reconnect_backoff_base * 2 ** attempt)
+        return random.uniform(0, ceiling)
+    
     async def disconnect(self):
         """Disconnect from voice channel"""
         try:
@@ -195,6 +289,11 @@ class MusicPlayer:
                 await self.voice_client.disconnect(force=True)
                 self.voice_client = None
             
+            # Left on purpose: nothing to resume after a restart
+            store = get_session_store()
+            if store:
+                store.forget(self.guild_id)
+            
             # Clear state
             self.current_track = None
             self.is_playing = False
@@ -205,13 +304,70 @@ class MusicPlayer:
         except Exception as e:
             logger.error(f"❌ Error disconnecting: {e}")
     
-    async def reconnect(self):
-        """Reconnect to the last voice channel"""
-        if self.voice_client and self.voice_client.channel:
-            channel = self.voice_client.channel
-            await self.disconnect()
-            await asyncio.sleep(1)
-            await self.connect(channel)
+    async def reconnect(self) -> bool:
+        """
+        Rejoin the last voice channel and carry on where playback stopped
+        
+        Unlike ``disconnect``, this keeps the queue and the current track:
+        the playback state is snapshotted first and the same track resumes
+        at the same position once voice is back.
+        """
+        channel = self.voice_client.channel if self.voice_client else None
+        if not channel or self._reconnecting:
+            return False
+        
+        self._reconnecting = True
+        started = time.perf_counter()
+        try:
+            # Snapshot before the old stream goes away
+            track = self.current_track
+            station = self.station
+            position = self.playback_position
+            was_paused = self.is_paused
+            
+            self._stop_stream()
+            try:
+                await self.voice_client.disconnect(force=True)
+            except Exception:
+                pass
+            self.voice_client = None
+            
+            if not await self.connect(channel):
+                return False
+            
+            if self.suspended:
+                # Nothing was playing, wake() restores it when someone listens
+                resumed = True
+            elif station:
+                self.station = None
+                resumed = station.is_live and await self.tune_in(station)
+            elif track:
+                async with self._play_lock:
+                    resumed = await self._restart_at(track, position)
+                if resumed and was_paused:
+                    self.pause()
+            else:
+                resumed = True
+            
+            if not resumed and track:
+                await self.play_next()
+            
+            self.voice_reconnects += 1
+            asyncio.create_task(self._measure_time_to_audio(started, position if resumed and track and not station else None))
+            return True
+        finally:
+            self._reconnecting = False
+    
+    async def _measure_time_to_audio(self, started: float, position: Optional[float], timeout: float = 15.0):
+        """Record how long a reconnect took until audio flowed again"""
+        if position is not None and not self.is_paused:
+            deadline = started + timeout
+            while self.playback_position <= position and time.perf_counter() < deadline:
+                await asyncio.sleep(0.02)
+        
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.reconnect_times.append(elapsed_ms)
+        logger.info(f"🔌 Voice reconnected in guild {self.guild_id}, audio restored in {elapsed_ms:.0f} ms")
     
     # ═══════════════════════════════════════════════════════════
     # ▶️ PLAYBACK CONTROLS
@@ -226,55 +382,55 @@ class MusicPlayer:
             
             try:
                 # Stop current playback
-                if self.voice_client.is_playing():
-                    self.voice_client.stop()
-                
-                if self.voice_client.is_paused():
-                    self.voice_client.stop()
+                self._finish_play(OUTCOME_SKIP)
+                self._stop_stream()
+                self.suspended = False
                 
                 logger.info(f"🎵 Getting audio source for: {track.title}")
                 
-                # Get audio source
-                source = await track.get_source()
+                # Get audio source (cached packets skip FFmpeg at unity gain)
+                source = await track.get_source(passthrough=self._wants_passthrough(), guild_id=self.guild_id)
                 if not source:
                     logger.error(f"❌ Failed to get audio source for: {track.title}")
                     # Try to play next track
                     await self.play_next()
                     return False
                 
-                logger.info(f"🎵 Audio source obtained, applying volume transformer")
-                
-                # Apply volume
-                source = discord.PCMVolumeTransformer(source, volume=self.volume)
+                self._track_gain = track.gain
+                if not source.is_opus():
+                    logger.info(f"🎵 Audio source obtained, applying volume transformer")
+                    source = self._prepare_pcm(source)
                 
                 logger.info(f"🎵 Starting playback...")
                 
-                # Play with error handling
-                def after_play(error):
-                    if error:
-                        logger.error(f"❌ Playback error: {error}")
-                    self.bot.loop.call_soon_threadsafe(
-                        lambda: asyncio.create_task(self._on_track_end(error))
-                    )
-                
-                self.voice_client.play(source, after=after_play)
+                self._start_stream(source)
                 
                 # Update state
+                self.station = None
                 self.current_track = track
                 self.is_playing = True
                 self.is_paused = False
                 self.track_start_time = datetime.now()
                 self.paused_duration = timedelta()
                 self.pause_start_time = None
-                
-                # Add to history
-                self._add_to_history(track)
+                self._recoveries = 0
+                self._play_started = time.time()
                 
                 # Update stats
                 self.bot.songs_played += 1
                 
                 logger.info(f"▶️ Now playing: {track.title}")
                 
+                # Cache what is about to play while this track runs
+                warmer = get_cache_warmer()
+                if warmer and config.CACHE.warm_upcoming:
+                    warmer.submit_upcoming(self.queue.get_list(0, config.CACHE.warm_upcoming))
+                
+                # Checkpoint the new track right away instead of at the next interval
+                store = get_session_store()
+                if store:
+                    store.checkpoint(self)
+                
                 # Send now playing message
                 await self._send_now_playing()
                 
@@ -318,33 +474,97 @@ class MusicPlayer:
                 if not self.is_playing:
                     await self.disconnect()
     
+    async def tune_in(self, station: Station) -> bool:
+        """
+        Follow a broadcast station instead of the local queue
+        
+        The station's packets are already Opus-encoded, so this guild costs
+        no decoding or encoding. Per-guild volume and effects do not apply.
+        """
+        async with self._play_lock:
+            if not self.is_connected:
+                logger.error("❌ Not connected to voice channel")
+                return False
+            
+            if not station.is_live:
+                return False
+            
+            # Hand the interrupted queue track back so the queue resumes with it
+            if self.current_track and not self.station:
+                self._finish_play(OUTCOME_STOP, remember=False)
+                self.queue.add_to_front(self.current_track)
+            
+            self._stop_stream()
+            
+            self._start_stream(station.subscribe())
+            
+            self.station = station
+            self.current_track = station.current_track
+            self.is_playing = True
+            self.is_paused = False
+            self.track_start_time = datetime.now()
+            self.paused_duration = timedelta()
+            self.pause_start_time = None
+            
+            logger.info(f"📻 Guild {self.guild_id} tuned in to '{station.name}'")
+            return True
+    
+    async def leave_station(self) -> bool:
+        """Stop following the station and go back to the local queue"""
+        if not self.station:
+            return False
+        
+        # The stream end runs _on_track_end, which clears the station
+        if self.audio:
+            self.audio.stop()
+        return True
+    
     def pause(self) -> bool:
         """Pause playback"""
-        if self.voice_client and self.voice_client.is_playing():
-            self.voice_client.pause()
+        if self.audio and self.audio.is_playing():
+            self.audio.pause()
             self.is_paused = True
             self.pause_start_time = datetime.now()
             return True
         return False
     
-    def resume(self) -> bool:
+    async def resume(self) -> bool:
         """Resume playback"""
-        if self.voice_client and self.voice_client.is_paused():
-            self.voice_client.resume()
-            self.is_paused = False
+        if self.audio and self.audio.is_paused():
+            paused_for = (datetime.now() - self.pause_start_time).total_seconds() if self.pause_start_time else 0
             
+            self.is_paused = False
             if self.pause_start_time:
                 self.paused_duration += datetime.now() - self.pause_start_time
                 self.pause_start_time = None
             
+            # The remote stream may have expired or dropped while paused,
+            # restart it from the same position with a fresh URL instead
+            track = self.current_track
+            if track and track.streaming and not self.station and (
+                track.stream_expires_soon() or paused_for > config.MUSIC.pause_refresh_after
+            ):
+                track.invalidate_stream()
+                if await self._recover("resume after long pause", refresh=True):
+                    return True
+                
+                # No fresh stream: end the stale one, _on_track_end retries or moves on
+                logger.warning(f"⚠️ Couldn't restart {track.title} after the pause in guild {self.guild_id}")
+                if self.audio and track is self.current_track and not self.suspended:
+                    self.audio.stop()
+                return True
+            
+            self.audio.resume()
             return True
         return False
     
     def stop(self):
         """Stop playback"""
-        if self.voice_client:
-            self.voice_client.stop()
+        self._finish_play(OUTCOME_STOP)
+        if self.audio:
+            self.audio.stop()
         
+        self.suspended = False
         self.current_track = None
         self.is_playing = False
         self.is_paused = False
@@ -352,8 +572,9 @@ class MusicPlayer:
     
     async def skip(self) -> bool:
         """Skip current track"""
-        if self.voice_client and (self.voice_client.is_playing() or self.voice_client.is_paused()):
-            self.voice_client.stop()
+        if self.audio and (self.audio.is_playing() or self.audio.is_paused()):
+            self._skip_requested = True
+            self.audio.stop()
             return True
         return False
     
@@ -364,6 +585,7 @@ class MusicPlayer:
             
             # Add current track back to front of queue
             if self.current_track:
+                self._finish_play(OUTCOME_SKIP, remember=False)
                 self.queue.add_to_front(self.current_track)
             
             await self.play(track)
@@ -375,8 +597,14 @@ class MusicPlayer:
         volume = max(config.MUSIC.min_volume, min(config.MUSIC.max_volume, volume))
         self.volume = volume / 100
         
-        if self.voice_client and self.voice_client.source:
-            self.voice_client.source.volume = self.volume
+        if self.audio and self.audio.source:
+            source = self.audio.source
+            if isinstance(source, OpusPacketSource):
+                # Stored packets can't change gain, continue through FFmpeg
+                if self.volume != 1.0:
+                    self._leave_passthrough(source)
+            else:
+                source.volume = self.volume * self._track_gain
         
         return True
     
@@ -443,6 +671,12 @@ class MusicPlayer:
                 except:
                     pass
             
+            # Slim gateway mode gets no reaction events, the controls are buttons there
+            if config.GATEWAY.slim:
+                events = self.bot.get_cog("Events")
+                self.now_playing_message = await self.text_channel.send(embed=embed, view=events.controls if events else None)
+                return
+            
             # Send new message
             self.now_playing_message = await self.text_channel.send(embed=embed)
             
@@ -514,6 +748,9 @@ class MusicPlayer:
     
     async def update_now_playing(self):
         """Update the now playing message"""
+        if self.station:
+            self.current_track = self.station.current_track
+        
         if self.now_playing_message and self.current_track:
             try:
                 embed = self._create_now_playing_embed()
@@ -527,19 +764,410 @@ class MusicPlayer:
     # 🔧 HELPER METHODS
     # ═══════════════════════════════════════════════════════════
     
-    async def _on_track_end(self, error):
+    def _prepare_pcm(self, source: discord.AudioSource, start_at: float = 0.0) -> discord.AudioSource:
+        """Apply volume and loudness gain and, when enabled, route through the encoder pool"""
+        # Read ahead so a slow upstream never blocks the sender
+        source = BufferedAudioSource(source, label=str(self.guild_id), start_at=start_at)
+        source = discord.PCMVolumeTransformer(source, volume=self.volume * self._track_gain)
+        
+        # Encode out of process when the encoder pool is enabled
+        pool = get_encoder_pool()
+        if pool:
+            source = pool.wrap(source, bitrate=self.target_bitrate, complexity=self.quality.complexity)
+        return source
+    
+    def _wants_passthrough(self) -> bool:
+        """Whether cached tracks may play as stored packets (no volume, no FFmpeg)"""
+        return self.volume == 1.0 or self.quality.passthrough
+    
+    def _leave_passthrough(self, packets: OpusPacketSource):
+        """Switch a packet stream to FFmpeg at the same position"""
+        position = packets.position
+        # Replaces a stream this guild already has, so it does not queue for a slot
+        source = get_ffmpeg_supervisor().spawn_nowait(self.guild_id, packets.path, before_options=f'-ss {position:.2f}', options='-vn')
+        
+        was_paused = self.audio.is_paused()
+        
+        self._stop_stream()
+        self._start_stream(self._prepare_pcm(source, start_at=position))
+        if was_paused:
+            self.audio.pause()
+        
+        logger.info(f"🎚️ Left packet passthrough at {position:.1f}s in guild {self.guild_id}")
+    
+    def _enter_passthrough(self) -> bool:
+        """Move a cached track from FFmpeg to its stored packets at the same position"""
+        track = self.current_track
+        if self.station or not track or track.streaming or not config.CACHE.passthrough:
+            return False
+        if isinstance(self._position_source, OpusPacketSource) or not self.audio or not self.audio.source:
+            return False
+        
+        cache = get_audio_cache()
+        path = cache.lookup(track.track_id) if cache else None
+        position = self.playback_position
+        packets = open_packet_source(path, position) if path else None
+        if not packets:
+            return False
+        
+        was_paused = self.audio.is_paused()
+        
+        self._stop_stream()
+        self._track_gain = 1.0
+        self._start_stream(packets)
+        if was_paused:
+            self.audio.pause()
+        
+        logger.info(f"📦 Moved to packet passthrough at {position:.1f}s in guild {self.guild_id} to save CPU")
+        return True
+    
+    def apply_quality(self, level: QualityLevel):
+        """Re-tune the current stream for a new quality level (called by the governor)"""
+        if not self.is_connected or not self.audio or not self.audio.source:
+            return
+        
+        if level.passthrough and self._enter_passthrough():
+            return
+        
+        bitrate = level.bitrate(self.bitrate_ceiling)
+        
+        # Pooled streams are encoded by a worker, others by the voice client's encoder
+        source = self.audio.source
+        while source is not None and not isinstance(source, PooledOpusSource):
+            source = getattr(source, 'original', None)
+        
+        if source is not None:
+            source.set_quality(bitrate, level.complexity)
+        elif self._stream is not None:
+            self._stream.set_quality(bitrate, level.complexity)
+    
+    def _stop_stream(self):
+        """Stop the current stream without it counting as a track end"""
+        # The new generation makes the old stream's end a no-op
+        self._stream_generation += 1
+        if self.audio and (self.audio.is_playing() or self.audio.is_paused()):
+            self.audio.stop()
+    
+    def _start_stream(self, source: discord.AudioSource):
+        """Hand a source to the shared scheduler or to discord.py's AudioPlayer"""
+        self._stream_generation += 1
+        generation = self._stream_generation
+        
+        # Innermost source that knows how far it has played
+        self._position_source = source
+        while self._position_source is not None and not hasattr(self._position_source, 'position'):
+            self._position_source = getattr(self._position_source, 'original', None)
+        
+        # Play with error handling
+        def after(error):
+            if error:
+                logger.error(f"❌ Playback error: {error}")
+            self.bot.loop.call_soon_threadsafe(
+                lambda: asyncio.create_task(self._on_track_end(error, generation))
+            )
+        
+        if config.MUSIC.shared_scheduler:
+            self._stream = get_scheduler().play(self.voice_client, source, after=after, bitrate=self.target_bitrate)
+            if self.quality.complexity < MAX_COMPLEXITY:
+                self._stream.set_quality(self.target_bitrate, self.quality.complexity)
+        else:
+            self._stream = None
+            self.voice_client.play(source, after=after, bitrate=self.target_bitrate)
+    
+    async def _on_track_end(self, error, generation: int = None):
         """Called when a track ends"""
+        if generation is not None and generation != self._stream_generation:
+            # A newer stream replaced this one, it is not a real track end
+            return
+        
         if error:
             logger.error(f"❌ Playback error: {error}")
         
+        skipped = self._skip_requested
+        self._skip_requested = False
+        
+        if self.station:
+            logger.info(f"📴 Station '{self.station.name}' ended in guild {self.guild_id}")
+            self.station = None
+            self.current_track = None
+        
+        elif not skipped and self._ended_early():
+            # Expired URL, 403 or dropped connection: pick up where it stopped
+            if await self._recover("stream ended early", refresh=self._recoveries > 0):
+                return
+            error = error or "stream ended early"
+        
+        self._finish_play(OUTCOME_SKIP if skipped else OUTCOME_ERROR if error else OUTCOME_COMPLETE)
         await self.play_next()
     
+    def _ended_early(self) -> bool:
+        """True when the current track stopped well before its duration"""
+        track = self.current_track
+        if not track or not track.duration:
+            return False
+        return self.playback_position < track.duration - config.MUSIC.early_eof_tolerance
+    
+    async def _recover(self, reason: str, refresh: bool = False) -> bool:
+        """
+        Restart the current track at the position it reached
+        
+        Also True when a play, skip, stop or wake replaced the stream in the
+        meantime: there is nothing left to recover and no track end to report.
+        """
+        track = self.current_track
+        if not track or not self.is_connected or self._recoveries >= config.MUSIC.reconnect_attempts:
+            return False
+        
+        generation = self._stream_generation
+        async with self._play_lock:
+            if self._superseded(track, generation):
+                return True
+            
+            self._recoveries += 1
+            position = self.playback_position
+            started = time.perf_counter()
+            
+            # Reuse the extracted URL unless it is stale or already failed once
+            if refresh or track.stream_expires_soon():
+                track.invalidate_stream()
+            
+            if not await self._restart_at(track, position):
+                return self._superseded(track, generation)
+        self.stream_recoveries += 1
+        
+        logger.info(
+            f"🩹 Resumed {track.title} at {position:.1f}s in guild {self.guild_id} "
+            f"({reason}, {(time.perf_counter() - started) * 1000:.0f} ms)"
+        )
+        return True
+    
+    def _superseded(self, track: Track, generation: int) -> bool:
+        """True when ``track``'s stream was replaced, stopped or suspended since ``generation``"""
+        return track is not self.current_track or generation != self._stream_generation or self.suspended
+    
+    async def _restart_at(self, track: Track, position: float) -> bool:
+        """Start ``track`` again at ``position`` seconds on a fresh stream"""
+        source = await track.get_source(passthrough=self._wants_passthrough(), start_at=position, guild_id=self.guild_id)
+        if not source or track is not self.current_track or self.suspended:
+            if source:
+                source.cleanup()
+            return False
+        
+        self._track_gain = track.gain
+        if not source.is_opus():
+            source = self._prepare_pcm(source, start_at=position)
+        
+        self._stop_stream()
+        self._start_stream(source)
+        
+        self.is_playing = True
+        self.is_paused = False
+        self.track_start_time = datetime.now() - timedelta(seconds=position)
+        self.paused_duration = timedelta()
+        self.pause_start_time = None
+        return True
+    
+    # ═══════════════════════════════════════════════════════════
+    # 💤 IDLE MODE
+    # ═══════════════════════════════════════════════════════════
+    
+    @property
+    def listener_count(self) -> int:
+        """Members other than bots in our voice channel"""
+        channel = self.voice_client.channel if self.voice_client else None
+        return sum(1 for member in channel.members if not member.bot) if channel else 0
+    
+    def listeners_changed(self):
+        """Someone joined or left our voice channel (from on_voice_state_update)"""
+        if not config.MUSIC.listener_aware or not self.is_connected:
+            return
+        
+        if self.listener_count:
+            if self._idle_task:
+                self._idle_task.cancel()
+                self._idle_task = None
+            if self.suspended:
+                asyncio.create_task(self.wake())
+        elif not self.suspended and self._idle_task is None and (self.current_track or self.station):
+            self._idle_task = asyncio.create_task(self._suspend_after_grace())
+    
+    async def _suspend_after_grace(self):
+        try:
+            await asyncio.sleep(config.MUSIC.idle_grace_period)
+            if not self.listener_count:
+                await self.suspend()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._idle_task = None
+    
+    async def suspend(self) -> bool:
+        """
+        Release the stream while nobody is listening, staying in the channel
+        
+        Checkpoints the position, stops the stream (which kills FFmpeg and
+        frees the buffers) and drops the extracted URL, which would expire
+        anyway. ``wake`` picks up from the checkpoint.
+        """
+        async with self._play_lock:
+            if self.suspended or not self.is_connected or not (self.current_track or self.station):
+                return False
+            
+            track = self.current_track
+            self._suspend_position = self.playback_position
+            self._suspend_paused = self.is_paused
+            
+            self._stop_stream()
+            self.suspended = True
+            self.suspensions += 1
+            if not self.is_paused:
+                self.pause_start_time = datetime.now()
+            
+            if track and not self.station:
+                track.invalidate_stream()
+                
+                # Cache it meanwhile, so the return starts from local packets
+                warmer = get_cache_warmer()
+                if warmer:
+                    warmer.submit(track, PRIORITY_UPCOMING, "idle")
+            
+            logger.info(f"💤 Nobody listening in guild {self.guild_id}, released the stream at {self._suspend_position:.1f}s")
+            return True
+    
+    async def wake(self) -> bool:
+        """Resume from the idle checkpoint"""
+        if not self.suspended:
+            return False
+        self.suspended = False
+        started = time.perf_counter()
+        
+        station = self.station
+        if station:
+            self.station = None
+            if station.is_live and await self.tune_in(station):
+                logger.info(f"▶️ Listener back in guild {self.guild_id}, rejoined station '{station.name}'")
+                return True
+            await self.play_next()
+            return False
+        
+        track = self.current_track
+        if not track or not self.is_connected:
+            return False
+        
+        async with self._play_lock:
+            resumed = await self._restart_at(track, self._suspend_position)
+        
+        if not resumed:
+            if not self.suspended:
+                await self.play_next()
+            return False
+        
+        if self._suspend_paused:
+            self.pause()
+        
+        logger.info(
+            f"▶️ Listener back in guild {self.guild_id}, resumed {track.title} at "
+            f"{self._suspend_position:.1f}s ({(time.perf_counter() - started) * 1000:.0f} ms)"
+        )
+        return True
+    
+    # ═══════════════════════════════════════════════════════════
+    # 💾 SESSIONS
+    # ═══════════════════════════════════════════════════════════
+    
+    def session_state(self) -> Optional[dict]:
+        """What a restart needs to resume this guild (None when there is nothing to resume)"""
+        if not self.is_connected or not (self.current_track or len(self.queue)):
+            return None
+        
+        return {
+            "voice_channel_id": self.voice_client.channel.id,
+            "text_channel_id": self.text_channel.id if self.text_channel else None,
+            "track": self.current_track.to_dict() if self.current_track else None,
+            "position": self._suspend_position if self.suspended else self.playback_position,
+            "paused": self._suspend_paused if self.suspended else self.is_paused,
+            "volume": self.volume,
+            "loop_mode": self.loop_mode.value,
+            "queue": self.queue.to_dict(),
+        }
+    
+    async def restore(self, state: dict) -> bool:
+        """
+        Rejoin and resume a checkpointed session after a restart
+        
+        Nothing is re-extracted until the track actually streams. With
+        nobody in the channel the player comes back idle at the saved
+        position, and ``wake`` starts it when someone joins.
+        """
+        guild = self.guild
+        channel = guild.get_channel(state["voice_channel_id"]) if guild else None
+        if not isinstance(channel, discord.VoiceChannel):
+            return False
+        
+        if state.get("text_channel_id"):
+            self.text_channel = guild.get_channel(state["text_channel_id"])
+        self.queue = MusicQueue.from_dict(state.get("queue") or {})
+        self.volume = state.get("volume", self.volume)
+        self.loop_mode = LoopMode(state.get("loop_mode", LoopMode.OFF.value))
+        
+        if not await self.connect(channel):
+            return False
+        
+        if not state.get("track"):
+            # Went down between two tracks
+            if len(self.queue):
+                await self.play_next()
+            return True
+        
+        track = Track.from_dict(state["track"])
+        position = state.get("position", 0.0)
+        self.current_track = track
+        self._play_started = time.time() - position
+        self.track_start_time = datetime.now() - timedelta(seconds=position)
+        self.paused_duration = timedelta()
+        
+        if config.MUSIC.listener_aware and not self.listener_count:
+            self.suspended = True
+            self._suspend_position = position
+            self._suspend_paused = state.get("paused", False)
+            self.pause_start_time = datetime.now()
+            logger.info(f"💤 Restored guild {self.guild_id} idle at {track.title} ({position:.1f}s)")
+            return True
+        
+        async with self._play_lock:
+            resumed = await self._restart_at(track, position)
+        if not resumed:
+            await self.play_next()
+            return self.is_playing
+        
+        if state.get("paused"):
+            self.pause()
+        
+        logger.info(f"💾 Restored guild {self.guild_id}: {track.title} at {position:.1f}s, {len(self.queue)} queued")
+        return True
+    
+    def _finish_play(self, outcome: str, remember: bool = True):
+        """Put the current play in the history and the play log, once, when it ends"""
+        track, started = self.current_track, self._play_started
+        if track is None or started is None:
+            return
+        self._play_started = None
+        
+        if remember:
+            self._add_to_history(track)
+        
+        played = self.playback_position
+        play_log = get_play_log()
+        if play_log:
+            play_log.record(self.guild_id, track, started, played, outcome)
+        
+        analytics = get_analytics()
+        if analytics:
+            analytics.record_play(self.guild_id, track, played, outcome)
+    
     def _add_to_history(self, track: Track):
-        """Add track to history"""
+        """Add track to history (the deque drops the oldest past max_history)"""
         self.history.append(track)
-        
-        if len(self.history) > self.max_history:
-            self.history.pop(0)
     
     @staticmethod
     def _format_duration(seconds: int) -> str:
@@ -553,28 +1181,3 @@ class MusicPlayer:
         if hours > 0:
             return f"{hours}:{minutes:02d}:{secs:02d}"
         return f"{minutes}:{secs:02d}"
-    
-    # ═══════════════════════════════════════════════════════════
-    # ❤️ FAVORITES
-    # ═══════════════════════════════════════════════════════════
-    
-    def add_favorite(self, user_id: int, track: Track) -> bool:
-        """Add track to user's favorites"""
-        if user_id not in self.favorites:
-            self.favorites[user_id] = []
-        
-        if track not in self.favorites[user_id]:
-            self.favorites[user_id].append(track)
-            return True
-        return False
-    
-    def remove_favorite(self, user_id: int, track: Track) -> bool:
-        """Remove track from user's favorites"""
-        if user_id in self.favorites and track in self.favorites[user_id]:
-            self.favorites[user_id].remove(track)
-            return True
-        return False
-    
-    def get_favorites(self, user_id: int) -> List[Track]:
-        """Get user's favorites"""
-        return self.favorites.get(user_id, [])
@@ -0,0 +1,289 @@
+"""
+📁 Playlist Store
+Saved playlists in data/playlists: one tab-separated file per playlist, one index per owner
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import discord
+
+import config
+from core.track import Track
+
+logger = logging.getLogger('ShlokMusic.Playlists')
+
+FORMAT_HEADER = "#shlok-playlist\t1"
+
+# Column order of a track line; empty columns are None
+FIELDS = ("url", "duration", "title", "artist", "source_type", "thumbnail")
+
+
+class PlaylistError(Exception):
+    """A playlist operation the user asked for can't be done (message is user-facing)"""
+
+
+@dataclass
+class PlaylistInfo:
+    """Index entry of a saved playlist"""
+    name: str
+    file: str
+    tracks: int = 0
+    duration: int = 0  # seconds, tracks with unknown length count as 0
+    created: float = 0.0
+    updated: float = 0.0
+
+
+def playlist_key(name: str) -> str:
+    """Lookup key of a playlist name: case and repeated spaces don't matter, anything else does"""
+    return " ".join(name.casefold().split())
+
+
+def file_name(name: str) -> str:
+    """File name of a playlist: a readable slug plus a hash of its key, unique per key"""
+    key = playlist_key(name)
+    slug = re.sub(r"[^a-z0-9]+", "-", key).strip("-")[:48] or "playlist"
+    return f"{slug}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:10]}.tsv"
+
+
+def _clean(value) -> str:
+    if value is None:
+        return ""
+    return str(value).replace("\t", " ").replace("\n", " ").replace("\r", " ")
+
+
+def encode_track(track: Track) -> str:
+    return "\t".join((
+        _clean(track.url),
+        _clean(int(track.duration) if track.duration else None),
+        _clean(track.title),
+        _clean(track.artist),
+        _clean(track.source_type),
+        _clean(track.thumbnail),
+    )) + "\n"
+
+
+def decode_track(line: str, requester: Optional[discord.Member] = None) -> Optional[Track]:
+    """Track from one line, None for a malformed one (e.g. cut off by a crash)"""
+    parts = line.rstrip("\n").split("\t")
+    if len(parts) != len(FIELDS) or not parts[0]:
+        return None
+    url, duration, title, artist, source_type, thumbnail = parts
+    return Track(
+        title=title or "Unknown",
+        url=url,
+        duration=int(duration) if duration.isdigit() else None,
+        thumbnail=thumbnail or None,
+        artist=artist or None,
+        requester=requester,
+        source_type=source_type or "youtube",
+    )
+
+
+# ═══════════════════════════════════════════════════════════════
+# 📁 PLAYLIST STORE
+# ═══════════════════════════════════════════════════════════════
+
+class PlaylistStore:
+    """
+    Playlists saved by users, kept on disk under ``<root>/<owner_id>/``
+    
+    Each playlist is a header line and one tab-separated line per track,
+    so it is read as a stream and never has to be parsed as a whole.
+    ``index.json`` in the owner's directory holds names, track counts and
+    durations, so listing never opens a playlist. Every change writes a
+    temporary file and renames it over the old one.
+    
+    Tracks carry what is needed to show and re-resolve them; the stream
+    URL is extracted when a track plays, so loading never calls yt-dlp.
+    """
+    
+    INDEX_FILE = "index.json"
+    
+    def __init__(self, root: str, max_playlists: int = None, max_tracks: int = None):
+        self.root = root
+        self.max_playlists = max_playlists or config.MUSIC.max_saved_playlists
+        self.max_tracks = max_tracks or config.MUSIC.max_saved_playlist_tracks
+        
+        self._indexes: Dict[int, Dict[str, PlaylistInfo]] = {}
+        self._lock = threading.RLock()
+        os.makedirs(root, exist_ok=True)
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🗂️ INDEX
+    # ═══════════════════════════════════════════════════════════
+    
+    def _owner_dir(self, owner_id: int) -> str:
+        return os.path.join(self.root, str(owner_id))
+    
+    def _path(self, owner_id: int, info: PlaylistInfo) -> str:
+        return os.path.join(self._owner_dir(owner_id), info.file)
+    
+    def _index(self, owner_id: int) -> Dict[str, PlaylistInfo]:
+        index = self._indexes.get(owner_id)
+        if index is not None:
+            return index
+        
+        index = {}
+        try:
+            with open(os.path.join(self._owner_dir(owner_id), self.INDEX_FILE), "r", encoding="utf-8") as f:
+                # Keyed by the stored name, so entries saved under an older key scheme still resolve
+                for entry in json.load(f).values():
+                    info = PlaylistInfo(**entry)
+                    index[playlist_key(info.name)] = info
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"⚠️ Playlist index of {owner_id} unreadable: {e}")
+        
+        self._indexes[owner_id] = index
+        return index
+    
+    def _save_index(self, owner_id: int):
+        index = self._index(owner_id)
+        path = os.path.join(self._owner_dir(owner_id), self.INDEX_FILE)
+        self._replace(path, lambda f: json.dump({key: asdict(info) for key, info in index.items()}, f, separators=(",", ":")))
+    
+    @staticmethod
+    def _replace(path: str, write):
+        """Write through a temporary file and rename it over ``path``"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🔍 READING
+    # ═══════════════════════════════════════════════════════════
+    
+    def list(self, owner_id: int) -> List[PlaylistInfo]:
+        """Owner's playlists, most recently changed first"""
+        with self._lock:
+            return sorted(self._index(owner_id).values(), key=lambda info: info.updated, reverse=True)
+    
+    def get(self, owner_id: int, name: str) -> Optional[PlaylistInfo]:
+        with self._lock:
+            return self._index(owner_id).get(playlist_key(name))
+    
+    def iter_tracks(
+        self,
+        owner_id: int,
+        name: str,
+        requester: Optional[discord.Member] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> Iterator[Track]:
+        """Stream a playlist's tracks from disk without reading the whole file"""
+        info = self.get(owner_id, name)
+        if not info:
+            raise PlaylistError(f"You have no playlist named **{name}**")
+        
+        with open(self._path(owner_id, info), "r", encoding="utf-8") as f:
+            f.readline()  # header
+            index = 0
+            for line in f:
+                if limit is not None and index >= offset + limit:
+                    break
+                if index >= offset:
+                    track = decode_track(line, requester)
+                    if track is None:
+                        continue
+                    yield track
+                index += 1
+    
+    def load(self, owner_id: int, name: str, requester: Optional[discord.Member] = None, limit: Optional[int] = None) -> List[Track]:
+        return list(self.iter_tracks(owner_id, name, requester, limit=limit))
+    
+    # ═══════════════════════════════════════════════════════════
+    # ✏️ WRITING
+    # ═══════════════════════════════════════════════════════════
+    
+    def save(self, owner_id: int, name: str, tracks: Iterable[Track]) -> PlaylistInfo:
+        """Create a playlist, or replace the tracks of an existing one"""
+        tracks = list(tracks)
+        if len(tracks) > self.max_tracks:
+            raise PlaylistError(f"Playlists hold at most **{self.max_tracks}** tracks")
+        
+        key = playlist_key(name)
+        with self._lock:
+            index = self._index(owner_id)
+            info = index.get(key)
+            if info is None:
+                if len(index) >= self.max_playlists:
+                    raise PlaylistError(f"You already have **{self.max_playlists}** playlists, delete one first")
+                info = PlaylistInfo(name=name, file=file_name(name), created=time.time())
+            
+            os.makedirs(self._owner_dir(owner_id), exist_ok=True)
+            
+            def write(f):
+                f.write(f"{FORMAT_HEADER}\t{_clean(name)}\n")
+                f.writelines(encode_track(track) for track in tracks)
+            
+            self._replace(self._path(owner_id, info), write)
+            
+            info.name = name
+            info.tracks = len(tracks)
+            info.duration = sum(track.duration or 0 for track in tracks)
+            info.updated = time.time()
+            index[key] = info
+            self._save_index(owner_id)
+            return info
+    
+    def append(self, owner_id: int, name: str, tracks: Iterable[Track]) -> PlaylistInfo:
+        """Add tracks to the end of a playlist (created when missing)"""
+        tracks = list(tracks)
+        with self._lock:
+            info = self._index(owner_id).get(playlist_key(name))
+            if info is None:
+                return self.save(owner_id, name, tracks)
+            if info.tracks + len(tracks) > self.max_tracks:
+                raise PlaylistError(f"Playlists hold at most **{self.max_tracks}** tracks")
+            
+            path = self._path(owner_id, info)
+            
+            def write(f):
+                with open(path, "r", encoding="utf-8") as old:
+                    shutil.copyfileobj(old, f)
+                f.writelines(encode_track(track) for track in tracks)
+            
+            self._replace(path, write)
+            
+            info.tracks += len(tracks)
+            info.duration += sum(track.duration or 0 for track in tracks)
+            info.updated = time.time()
+            self._save_index(owner_id)
+            return info
+    
+    def delete(self, owner_id: int, name: str) -> bool:
+        with self._lock:
+            index = self._index(owner_id)
+            info = index.pop(playlist_key(name), None)
+            if info is None:
+                return False
+            self._save_index(owner_id)
+            try:
+                os.remove(self._path(owner_id, info))
+            except OSError:
+                pass
+            return True
+
+
+_store: Optional[PlaylistStore] = None
+
+
+def get_playlist_store() -> PlaylistStore:
+    """Get the process-wide playlist store"""
+    global _store
+    if _store is None:
+        _store = PlaylistStore(config.PLAYLISTS_DIR)
+    return _store
@@ -0,0 +1,431 @@
+"""
+🚀 Range Fetch Proxy
+Local HTTP endpoint that fetches media as parallel byte ranges for FFmpeg
+"""
+
+import asyncio
+import logging
+import os
+import re
+import secrets
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional, Callable, Dict, Tuple
+
+import aiohttp
+from aiohttp import web
+
+import config
+
+logger = logging.getLogger('ShlokMusic.Proxy')
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+RANGE_PATTERN = re.compile(r'bytes=(\d+)-(\d*)')
+CONTENT_RANGE_PATTERN = re.compile(r'bytes \d+-\d+/(\d+|\*)')
+
+# Stream URLs expire after a few hours, registrations don't need to outlive them
+STREAM_TTL = 6 * 3600
+CHUNK_RETRIES = 3
+RELAY_READ_SIZE = 64 * 1024
+
+
+class UpstreamError(Exception):
+    """The media host refused or cut short a range request"""
+
+
+def _parse_range(header: Optional[str]) -> Tuple[int, Optional[int]]:
+    """First and last byte of a client ``Range: bytes=a-b`` header"""
+    match = RANGE_PATTERN.match(header or '')
+    if not match:
+        return 0, None
+    return int(match.group(1)), int(match.group(2)) if match.group(2) else None
+
+
+def _total_size(header: Optional[str]) -> Optional[int]:
+    """Full size from an upstream ``Content-Range`` header"""
+    match = CONTENT_RANGE_PATTERN.match(header or '')
+    if not match or match.group(1) == '*':
+        return None
+    return int(match.group(1))
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🔗 PROXIED STREAMS
+# ═══════════════════════════════════════════════════════════════
+
+@dataclass
+class ProxiedStream:
+    """An upstream URL FFmpeg can read through the proxy"""
+    url: str
+    tee_path: Optional[str] = None
+    on_done: Optional[Callable[[Optional[str]], None]] = None
+    created: float = field(default_factory=time.time)
+    teeing: bool = False
+    tee_finished: bool = False
+    
+    def finish_tee(self, path: Optional[str]):
+        """Report the tee result once: the file, or None if it was abandoned"""
+        if self.tee_finished:
+            return
+        self.tee_finished = True
+        self.teeing = False
+        if self.on_done:
+            try:
+                self.on_done(path)
+            except Exception as e:
+                logger.error(f"❌ Tee callback failed: {e}")
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🚀 RANGE FETCH PROXY
+# ═══════════════════════════════════════════════════════════════
+
+class RangeFetchProxy:
+    """
+    Serves registered media URLs on localhost, fetched as parallel ranges
+    
+    Media hosts throttle each connection to about real time, so a single
+    FFmpeg connection starts slowly and stalls on any hiccup. The proxy
+    answers FFmpeg's request by fetching the same bytes as fixed-size
+    Range requests, several in flight at once over one pooled session,
+    and writes them back in order. A full read from byte 0 can also be
+    teed to disk, so the cache warmer transcodes the file without
+    downloading it again.
+    """
+    
+    def __init__(self, chunk_size: int = None, concurrency: int = None, host: str = '127.0.0.1'):
+        self.chunk_size = max(64 * 1024, chunk_size or config.MUSIC.range_chunk_size)
+        self.concurrency = max(1, concurrency or config.MUSIC.range_concurrency)
+        self.host = host
+        self.port: Optional[int] = None
+        
+        self._streams: Dict[str, ProxiedStream] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._start_lock = asyncio.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # Stats
+        self.requests = 0
+        self.active = 0
+        self.chunks = 0
+        self.chunk_retries = 0
+        self.relayed = 0
+        self.failures = 0
+        self.bytes_upstream = 0
+        self.bytes_served = 0
+        self.tees_completed = 0
+        self.tees_abandoned = 0
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🔄 LIFECYCLE
+    # ═══════════════════════════════════════════════════════════
+    
+    @property
+    def is_running(self) -> bool:
+        return self._runner is not None
+    
+    async def start(self):
+        """Start the local server and the shared upstream session"""
+        async with self._start_lock:
+            if self._runner:
+                return
+            
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=64, limit_per_host=16, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=20),
+                headers={'User-Agent': USER_AGENT, 'Accept-Encoding': 'identity'},
+                auto_decompress=False
+            )
+            
+            app = web.Application()
+            app.router.add_get('/s/{token}', self._handle)
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, self.host, 0)
+            await site.start()
+            
+            self._runner = runner
+            self._loop = asyncio.get_running_loop()
+            self.port = runner.addresses[0][1]
+            logger.info(f"🚀 Range fetch proxy on {self.host}:{self.port} ({self.concurrency} x {self.chunk_size // 1024} KiB)")
+    
+    async def close(self):
+        """Stop serving and close upstream connections"""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+        if self._session:
+            await self._session.close()
+            self._session = None
+        self._streams.clear()
+    
+    async def open(self, url: str, tee_path: str = None, on_done: Callable[[Optional[str]], None] = None) -> str:
+        """
+        Register ``url`` and return the local URL to hand to FFmpeg
+        
+        With ``tee_path``, the first complete read of the stream is written
+        there and ``on_done`` gets the path; it gets None when playback
+        stopped before the end and the partial file was discarded.
+        """
+        await self.start()
+        self._expire()
+        
+        token = secrets.token_urlsafe(12)
+        self._streams[token] = ProxiedStream(url=url, tee_path=tee_path, on_done=on_done)
+        return f'http://{self.host}:{self.port}/s/{token}'
+    
+    def close_stream(self, local_url: str):
+        """Forget a URL from ``open()`` once its FFmpeg is gone (safe from any thread)"""
+        token = local_url.rsplit('/', 1)[-1]
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            if asyncio.get_running_loop() is loop:
+                self._drop(token)
+                return
+        except RuntimeError:
+            pass
+        loop.call_soon_threadsafe(self._drop, token)
+    
+    def _drop(self, token: str):
+        stream = self._streams.pop(token, None)
+        # A tee still being written reports its own result when the response ends
+        if stream and not stream.teeing:
+            stream.finish_tee(None)
+    
+    def _expire(self):
+        cutoff = time.time() - STREAM_TTL
+        for token, stream in list(self._streams.items()):
+            if stream.created < cutoff:
+                self._drop(token)
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🌐 SERVING
+    # ═══════════════════════════════════════════════════════════
+    
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        stream = self._streams.get(request.match_info['token'])
+        if stream is None:
+            raise web.HTTPNotFound()
+        
+        self.requests += 1
+        self.active += 1
+        try:
+            return await self._serve(request, stream)
+        finally:
+            self.active -= 1
+    
+    async def _serve(self, request: web.Request, stream: ProxiedStream) -> web.StreamResponse:
+        ranged = 'Range' in request.headers
+        start, end = _parse_range(request.headers.get('Range'))
+        head = request.method == 'HEAD'
+        
+        # The first chunk also tells us the size and whether the host honours ranges
+        probe_end = start if head else start + self.chunk_size - 1
+        if end is not None:
+            probe_end = min(probe_end, end)
+        
+        try:
+            upstream = await self._session.get(stream.url, headers={'Range': f'bytes={start}-{probe_end}'})
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.failures += 1
+            logger.warning(f"⚠️ Upstream unreachable: {e}")
+            return web.Response(status=502, text="Upstream unreachable")
+        
+        try:
+            total = _total_size(upstream.headers.get('Content-Range'))
+            
+            if upstream.status == 416:
+                return web.Response(status=416)
+            if upstream.status == 200 or (upstream.status == 206 and total is None):
+                # No usable ranges, fall back to one plain connection
+                upstream.release()
+                return await self._relay(request, stream, start, end)
+            if upstream.status != 206:
+                self.failures += 1
+                logger.warning(f"⚠️ Upstream answered HTTP {upstream.status}")
+                return web.Response(status=502, text=f"Upstream HTTP {upstream.status}")
+            
+            last = total - 1 if end is None else min(end, total - 1)
+            response = web.StreamResponse(status=206 if ranged else 200)
+            response.content_type = upstream.content_type
+            response.content_length = last - start + 1
+            response.headers['Accept-Ranges'] = 'bytes'
+            if ranged:
+                response.headers['Content-Range'] = f'bytes {start}-{last}/{total}'
+            await response.prepare(request)
+            if head:
+                return response
+            
+            first_end = min(probe_end, last)
+            tee = await self._open_tee(stream, start, last == total - 1)
+            ranges = iter([(offset, min(offset + self.chunk_size, last + 1) - 1) for offset in range(first_end + 1, last + 1, self.chunk_size)])
+            pending: deque = deque()
+            complete = False
+            
+            def schedule():
+                span = next(ranges, None)
+                if span:
+                    pending.append(asyncio.ensure_future(self._fetch_chunk(stream.url, *span)))
+            
+            async def send(data: bytes):
+                await response.write(data)
+                self.bytes_served += len(data)
+                if tee:
+                    await asyncio.to_thread(tee.write, data)
+            
+            try:
+                for _ in range(self.concurrency):
+                    schedule()
+                
+                # FFmpeg gets the first range as it arrives, the next ones download meanwhile
+                received = 0
+                async for data in upstream.content.iter_chunked(RELAY_READ_SIZE):
+                    received += len(data)
+                    self.bytes_upstream += len(data)
+                    await send(data)
+                if received != first_end - start + 1:
+                    raise UpstreamError(f"Short read for bytes {start}-{first_end}")
+                self.chunks += 1
+                
+                while pending:
+                    chunk = await pending.popleft()
+                    schedule()
+                    await send(chunk)
+                
+                await response.write_eof()
+                complete = True
+            except ConnectionResetError:
+                # FFmpeg closed the connection (skip, seek or shutdown)
+                pass
+            except (aiohttp.ClientError, asyncio.TimeoutError, UpstreamError) as e:
+                # Leaves FFmpeg with a short read, the player's watchdog resumes the track
+                self.failures += 1
+                logger.warning(f"⚠️ Range fetch failed: {e}")
+            finally:
+                for task in pending:
+                    task.cancel()
+                if tee:
+                    await self._close_tee(stream, tee, complete)
+            return response
+        finally:
+            upstream.release()
+    
+    async def _relay(self, request: web.Request, stream: ProxiedStream, start: int, end: Optional[int]) -> web.StreamResponse:
+        """Pipe one upstream connection through, for hosts without range support"""
+        self.relayed += 1
+        headers = {'Range': f"bytes={start}-{'' if end is None else end}"} if start or end is not None else {}
+        
+        async with self._session.get(stream.url, headers=headers) as upstream:
+            response = web.StreamResponse(status=upstream.status)
+            response.content_type = upstream.content_type
+            if upstream.content_length is not None:
+                response.content_length = upstream.content_length
+            for name in ('Accept-Ranges', 'Content-Range'):
+                if name in upstream.headers:
+                    response.headers[name] = upstream.headers[name]
+            await response.prepare(request)
+            if request.method == 'HEAD':
+                return response
+            
+            tee = await self._open_tee(stream, start, end is None and upstream.status == 200)
+            complete = False
+            try:
+                async for data in upstream.content.iter_chunked(RELAY_READ_SIZE):
+                    await response.write(data)
+                    self.bytes_upstream += len(data)
+                    self.bytes_served += len(data)
+                    if tee:
+                        await asyncio.to_thread(tee.write, data)
+                await response.write_eof()
+                complete = True
+            except ConnectionResetError:
+                pass
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.failures += 1
+                logger.warning(f"⚠️ Relay failed: {e}")
+            finally:
+                if tee:
+                    await self._close_tee(stream, tee, complete)
+        return response
+    
+    async def _fetch_chunk(self, url: str, first: int, last: int) -> bytes:
+        """One byte range, retried on connection errors and short reads"""
+        for attempt in range(CHUNK_RETRIES):
+            try:
+                async with self._session.get(url, headers={'Range': f'bytes={first}-{last}'}) as upstream:
+                    if upstream.status != 206:
+                        raise UpstreamError(f"HTTP {upstream.status} for bytes {first}-{last}")
+                    data = await upstream.read()
+                if len(data) != last - first + 1:
+                    raise UpstreamError(f"Short read for bytes {first}-{last}")
+                
+                self.chunks += 1
+                self.bytes_upstream += len(data)
+                return data
+            except (aiohttp.ClientError, asyncio.TimeoutError, UpstreamError):
+                if attempt == CHUNK_RETRIES - 1:
+                    raise
+                self.chunk_retries += 1
+                await asyncio.sleep(0.5 * (attempt + 1))
+    
+    # ═══════════════════════════════════════════════════════════
+    # 💾 TEE
+    # ═══════════════════════════════════════════════════════════
+    
+    async def _open_tee(self, stream: ProxiedStream, start: int, to_end: bool):
+        """File to copy this response into, if it reads the whole stream"""
+        if not stream.tee_path or stream.teeing or stream.tee_finished or start or not to_end:
+            return None
+        try:
+            handle = await asyncio.to_thread(open, stream.tee_path, 'wb')
+        except OSError as e:
+            logger.warning(f"⚠️ Cannot tee stream to {stream.tee_path}: {e}")
+            stream.finish_tee(None)
+            return None
+        stream.teeing = True
+        return handle
+    
+    async def _close_tee(self, stream: ProxiedStream, handle, complete: bool):
+        await asyncio.to_thread(handle.close)
+        if complete:
+            self.tees_completed += 1
+            stream.finish_tee(stream.tee_path)
+            return
+        
+        self.tees_abandoned += 1
+        try:
+            os.remove(stream.tee_path)
+        except OSError:
+            pass
+        stream.finish_tee(None)
+    
+    def stats(self) -> dict:
+        return {
+            "running": self.is_running,
+            "streams": len(self._streams),
+            "active": self.active,
+            "requests": self.requests,
+            "chunks": self.chunks,
+            "chunk_retries": self.chunk_retries,
+            "relayed": self.relayed,
+            "failures": self.failures,
+            "mb_upstream": round(self.bytes_upstream / 1024 / 1024, 1),
+            "mb_served": round(self.bytes_served / 1024 / 1024, 1),
+            "tees_completed": self.tees_completed,
+            "tees_abandoned": self.tees_abandoned,
+        }
+
+
+_proxy: Optional[RangeFetchProxy] = None
+
+
+def get_range_proxy() -> Optional[RangeFetchProxy]:
+    """Get the process-wide range fetch proxy (None when disabled)"""
+    global _proxy
+    if _proxy is None and config.MUSIC.range_proxy:
+        _proxy = RangeFetchProxy()
+    return _proxy
@@ -67,8 +67,7 @@ class MusicQueue:
     
     def add_multiple(self, tracks: List[Track]) -> int:
         """Add multiple tracks to the queue"""
-        for track in tracks:
-            self._queue.append(track)
+        self._queue.extend(tracks)
         return len(self._queue)
     
     # ═══════════════════════════════════════════════════════════
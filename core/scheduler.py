@@ -0,0 +1,458 @@
+"""
+⏱️ Shared Audio Send Scheduler
+Drives every voice connection from a small fixed pool of sender threads
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Any, Callable
+
+import discord
+from discord import opus
+from discord.enums import SpeakingState
+
+import config
+from core.buffer import BufferedAudioSource
+from core.encoder import set_encoder_quality
+
+logger = logging.getLogger('ShlokMusic.Scheduler')
+
+# Length of one Opus frame in seconds (20 ms)
+FRAME_DELAY = opus.Encoder.FRAME_LENGTH / 1000.0
+
+# Frames read ahead for sources whose read() can block (e.g. pooled encoding)
+READ_AHEAD_FRAMES = 10
+
+
+def _never_blocks(source: discord.AudioSource) -> bool:
+    """True when ``source.read()`` returns without waiting on a pipe, a worker or a lock held elsewhere"""
+    while isinstance(source, discord.PCMVolumeTransformer):
+        source = source.original
+    return getattr(source, 'nonblocking', False)
+
+# ═══════════════════════════════════════════════════════════════
+# 🎧 SCHEDULED STREAM
+# ═══════════════════════════════════════════════════════════════
+
+class ScheduledStream:
+    """
+    One audio stream driven by the shared scheduler
+    
+    Mirrors the parts of discord.py's AudioPlayer API that the player uses
+    (is_playing, is_paused, pause, resume, stop, source) so it can stand in
+    for ``VoiceClient`` playback control.
+    """
+    
+    def __init__(
+        self,
+        scheduler: 'AudioScheduler',
+        client: discord.VoiceClient,
+        source: discord.AudioSource,
+        after: Optional[Callable[[Optional[Exception]], Any]] = None
+    ):
+        self.scheduler = scheduler
+        self.client = client
+        self.source = source
+        self.after = after
+        
+        self._ended = False
+        self._paused = False
+        self._pending_silence = False
+        self._error: Optional[Exception] = None
+        self._disconnected_since: Optional[float] = None
+        self._quality: Optional[tuple] = None
+        self._worker = 0  # index of the sender thread that reads the source
+        
+        # Per-connection clock, used for drift correction
+        self._start = 0.0
+        self.loops = 0
+        
+        # Stats
+        self.frames_sent = 0
+        self.late_frames = 0
+        self.resyncs = 0
+    
+    @property
+    def guild_id(self) -> Optional[int]:
+        """Guild this stream is playing in"""
+        guild = getattr(self.client, 'guild', None)
+        return guild.id if guild else None
+    
+    @property
+    def next_deadline(self) -> float:
+        """When the next frame is due"""
+        return self._start + self.loops * FRAME_DELAY
+    
+    def is_playing(self) -> bool:
+        return not self._ended and not self._paused
+    
+    def is_paused(self) -> bool:
+        return not self._ended and self._paused
+    
+    def is_done(self) -> bool:
+        return self._ended
+    
+    def pause(self):
+        """Pause the stream"""
+        if self._ended or self._paused:
+            return
+        self._paused = True
+        self._pending_silence = True
+        self.scheduler._speak(self.client, SpeakingState.none)
+    
+    def resume(self):
+        """Resume the stream"""
+        if self._ended or not self._paused:
+            return
+        self._reset_clock()
+        self._paused = False
+        self.scheduler._speak(self.client, SpeakingState.voice)
+    
+    def stop(self):
+        """Stop the stream and run its finalizer"""
+        self.scheduler._finish(self)
+    
+    def set_quality(self, bitrate: int, complexity: int):
+        """Re-tune the client's encoder; applied by the sender thread between frames"""
+        self._quality = (bitrate, complexity)
+    
+    def _reset_clock(self, now: Optional[float] = None):
+        """Restart this stream's clock at the next frame boundary"""
+        self._start = now if now is not None else time.perf_counter()
+        self.loops = 0
+    
+    def stats(self) -> dict:
+        """Per-stream statistics"""
+        return {
+            "guild_id": self.guild_id,
+            "playing": self.is_playing(),
+            "paused": self.is_paused(),
+            "frames_sent": self.frames_sent,
+            "late_frames": self.late_frames,
+            "resyncs": self.resyncs,
+        }
+
+
+# ═══════════════════════════════════════════════════════════════
+# ⏱️ AUDIO SCHEDULER
+# ═══════════════════════════════════════════════════════════════
+
+class AudioScheduler:
+    """
+    Fixed pool of sender threads sharing a single 20 ms tick
+    
+    Each stream is pinned to one worker. On every tick a worker sends the
+    frames that are due for each of its streams, catching up a little when
+    a stream has fallen behind and resyncing its clock when it is too far
+    behind to recover without an audible burst.
+    """
+    
+    def __init__(
+        self,
+        workers: int = 4,
+        max_catchup: int = 2,
+        resync_threshold: float = 0.2
+    ):
+        self.workers = max(1, workers)
+        self.max_catchup = max(1, max_catchup)
+        self.resync_threshold = resync_threshold
+        
+        self._shards: List[List[ScheduledStream]] = [[] for _ in range(self.workers)]
+        # Streams stopped from other threads, finalized by their sender between ticks
+        self._retired: List[List[ScheduledStream]] = [[] for _ in range(self.workers)]
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._running = False
+        
+        # Finalizers (after callbacks, FFmpeg cleanup) must never block a tick
+        self._finalizer = ThreadPoolExecutor(max_workers=2, thread_name_prefix='audio-finalizer')
+        
+        # Stats
+        self.ticks = 0
+        self.tick_overruns = 0
+        self.max_tick_time = 0.0
+        self.frames_sent = 0
+        self.late_frames = 0
+        self.resyncs = 0
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🔄 LIFECYCLE
+    # ═══════════════════════════════════════════════════════════
+    
+    def start(self):
+        """Start the sender threads"""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            
+            for index in range(self.workers):
+                thread = threading.Thread(
+                    target=self._run_worker,
+                    args=(index,),
+                    name=f'audio-sender:{index}',
+                    daemon=True
+                )
+                self._threads.append(thread)
+                thread.start()
+        
+        logger.info(f"⏱️ Audio scheduler started with {self.workers} sender threads")
+    
+    def shutdown(self):
+        """Stop every stream and the sender threads"""
+        for stream in self.streams:
+            stream.stop()
+        
+        self._running = False
+        for thread in self._threads:
+            thread.join(timeout=1)
+        self._threads.clear()
+        self._finalizer.shutdown(wait=False)
+    
+    # ═══════════════════════════════════════════════════════════
+    # ▶️ PLAYBACK
+    # ═══════════════════════════════════════════════════════════
+    
+    def play(
+        self,
+        client: discord.VoiceClient,
+        source: discord.AudioSource,
+        *,
+        after: Optional[Callable[[Optional[Exception]], Any]] = None,
+        bitrate: int = None
+    ) -> ScheduledStream:
+        """Start playing a source on a voice client"""
+        if not client.is_connected():
+            raise discord.ClientException('Not connected to voice.')
+        
+        if not isinstance(source, discord.AudioSource):
+            raise TypeError(f'source must be an AudioSource not {source.__class__.__name__}')
+        
+        if not source.is_opus():
+            # send_audio_packet encodes through the client's encoder
+            client.encoder = opus.Encoder(bitrate=bitrate or config.MUSIC.audio_bitrate)
+        
+        # A read that waits would hold up every stream on the sender thread,
+        # so anything that can block is read ahead by a feeder thread instead
+        if not _never_blocks(source):
+            guild = getattr(client, 'guild', None)
+            source = BufferedAudioSource(source, capacity=READ_AHEAD_FRAMES, label=f"send:{guild.id if guild else '?'}")
+        
+        self.start()
+        
+        stream = ScheduledStream(self, client, source, after)
+        stream._reset_clock()
+        
+        with self._lock:
+            stream._worker = min(range(self.workers), key=lambda index: len(self._shards[index]))
+            self._shards[stream._worker].append(stream)
+        
+        self._speak(client, SpeakingState.voice)
+        return stream
+    
+    @property
+    def streams(self) -> List[ScheduledStream]:
+        """All active streams"""
+        with self._lock:
+            return [s for shard in self._shards for s in shard]
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🧵 SENDER THREADS
+    # ═══════════════════════════════════════════════════════════
+    
+    def _run_worker(self, index: int):
+        """Main loop of one sender thread"""
+        shard = self._shards[index]
+        next_tick = time.perf_counter()
+        
+        while self._running:
+            tick_start = time.perf_counter()
+            
+            for stream in list(shard):
+                try:
+                    self._service(stream, tick_start)
+                except Exception as e:
+                    stream._error = e
+                    self._finish(stream, from_sender=True)
+            
+            tick_time = time.perf_counter() - tick_start
+            self.ticks += 1
+            if tick_time > self.max_tick_time:
+                self.max_tick_time = tick_time
+            if tick_time > FRAME_DELAY:
+                self.tick_overruns += 1
+            
+            # Not inside any read() now, sources stopped meanwhile can be cleaned up
+            self._release_retired(index)
+            
+            next_tick += FRAME_DELAY
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Whole ticks were missed, realign instead of spinning
+                next_tick = time.perf_counter()
+        
+        self._release_retired(index)
+    
+    def _service(self, stream: ScheduledStream, now: float):
+        """Send every frame that is due for a stream"""
+        if stream._ended:
+            return
+        
+        client = stream.client
+        
+        if stream._paused:
+            if stream._pending_silence and client.is_connected():
+                stream._pending_silence = False
+                self._send_silence(client)
+            return
+        
+        if not client.is_connected():
+            if stream._disconnected_since is None:
+                stream._disconnected_since = now
+            elif now - stream._disconnected_since > client.timeout:
+                logger.debug(f"Voice not reconnected in time, aborting stream in guild {stream.guild_id}")
+                self._finish(stream, from_sender=True)
+            return
+        
+        if stream._disconnected_since is not None:
+            # Reconnected, restart the clock
+            stream._disconnected_since = None
+            stream._reset_clock(now)
+            self._speak(client, SpeakingState.voice)
+        
+        lag = now - stream.next_deadline
+        if lag > self.resync_threshold:
+            # Too far behind to catch up smoothly
+            stream.resyncs += 1
+            self.resyncs += 1
+            stream._reset_clock(now)
+            lag = 0.0
+        
+        quality, stream._quality = stream._quality, None
+        if quality and client.encoder and not stream.source.is_opus():
+            set_encoder_quality(client.encoder, *quality)
+        
+        sent = 0
+        while lag >= 0 and sent < self.max_catchup:
+            data = stream.source.read()
+            
+            if not data:
+                if stream._error is None:
+                    stream._error = getattr(stream.source, '_current_error', None)
+                self._finish(stream, from_sender=True)
+                return
+            
+            client.send_audio_packet(data, encode=not stream.source.is_opus())
+            
+            if lag >= FRAME_DELAY:
+                stream.late_frames += 1
+                self.late_frames += 1
+            
+            stream.loops += 1
+            stream.frames_sent += 1
+            self.frames_sent += 1
+            sent += 1
+            lag = now - stream.next_deadline
+    
+    def _finish(self, stream: ScheduledStream, from_sender: bool = False):
+        """Remove a stream and run its finalizer off the sender thread"""
+        with self._lock:
+            if stream._ended:
+                return
+            stream._ended = True
+            self._shards[stream._worker].remove(stream)
+            if not from_sender:
+                # Its sender may be in the middle of source.read(): let it
+                # hand the stream to the finalizer once the tick is over
+                self._retired[stream._worker].append(stream)
+        
+        # Only the owning sender thread may touch the packet sequence
+        if from_sender and stream.client.is_connected():
+            self._send_silence(stream.client)
+        self._speak(stream.client, SpeakingState.none)
+        
+        if from_sender:
+            self._submit_finalizer(stream)
+    
+    def _release_retired(self, index: int):
+        """Finalize the streams stopped while sender ``index`` was running (sender thread only)"""
+        with self._lock:
+            retired, self._retired[index] = self._retired[index], []
+        for stream in retired:
+            self._submit_finalizer(stream)
+    
+    def _submit_finalizer(self, stream: ScheduledStream):
+        try:
+            self._finalizer.submit(self._call_after, stream)
+        except RuntimeError:
+            # Executor already shut down
+            self._call_after(stream)
+    
+    @staticmethod
+    def _call_after(stream: ScheduledStream):
+        """Run the stream's after callback and clean up its source"""
+        try:
+            if stream.after is not None:
+                try:
+                    stream.after(stream._error)
+                except Exception as e:
+                    logger.exception(f"❌ After callback failed: {e}")
+            elif stream._error:
+                logger.error(f"❌ Error in scheduled stream: {stream._error}")
+        finally:
+            stream.source.cleanup()
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🔧 HELPERS
+    # ═══════════════════════════════════════════════════════════
+    
+    @staticmethod
+    def _speak(client: discord.VoiceClient, state: SpeakingState):
+        """Update the speaking indicator from any thread"""
+        try:
+            asyncio.run_coroutine_threadsafe(client.ws.speak(state), client.client.loop)
+        except Exception:
+            pass
+    
+    @staticmethod
+    def _send_silence(client: discord.VoiceClient, count: int = 5):
+        """Send a few silence frames to avoid interpolation glitches"""
+        try:
+            for _ in range(count):
+                client.send_audio_packet(opus.OPUS_SILENCE, encode=False)
+        except Exception:
+            pass
+    
+    def stats(self) -> dict:
+        """Scheduler statistics"""
+        streams = self.streams
+        return {
+            "workers": self.workers,
+            "streams": len(streams),
+            "ticks": self.ticks,
+            "tick_overruns": self.tick_overruns,
+            "max_tick_ms": round(self.max_tick_time * 1000, 2),
+            "frames_sent": self.frames_sent,
+            "late_frames": self.late_frames,
+            "resyncs": self.resyncs,
+        }
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🌐 SHARED INSTANCE
+# ═══════════════════════════════════════════════════════════════
+
+_scheduler: Optional[AudioScheduler] = None
+
+
+def get_scheduler() -> AudioScheduler:
+    """Get the process-wide audio scheduler"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = AudioScheduler(workers=config.MUSIC.scheduler_threads)
+    return _scheduler
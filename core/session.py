@@ -0,0 +1,226 @@
+"""
+💾 Session Store
+Checkpoints every guild's player so a crash or restart resumes where it stopped
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import config
+from core.database import Database, get_database
+
+logger = logging.getLogger('ShlokMusic.Sessions')
+
+# Columns written together whenever anything but the position changed
+_UPSERT = """
+    INSERT INTO player_sessions
+        (guild_id, voice_channel_id, text_channel_id, track, position, paused, volume, loop_mode, queue, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(guild_id) DO UPDATE SET
+        voice_channel_id = excluded.voice_channel_id,
+        text_channel_id = excluded.text_channel_id,
+        track = excluded.track,
+        position = excluded.position,
+        paused = excluded.paused,
+        volume = excluded.volume,
+        loop_mode = excluded.loop_mode,
+        queue = excluded.queue,
+        updated_at = excluded.updated_at
+"""
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+
+# ═══════════════════════════════════════════════════════════════
+# 💾 SESSION STORE
+# ═══════════════════════════════════════════════════════════════
+
+class SessionStore:
+    """
+    Player state per guild in the ``player_sessions`` table
+    
+    Checkpoints go through the database's write-behind queue, so they never
+    wait on the disk. A guild whose queue, track and settings are unchanged
+    since its last checkpoint only gets its position updated; a paused or
+    idle one gets nothing written at all.
+    """
+    
+    def __init__(self, db: Database, interval: float = None):
+        self.db = db
+        self.interval = interval or config.DATABASE.checkpoint_interval
+        
+        # guild_id -> (state written last, position written last)
+        self._written: Dict[int, Tuple[tuple, float]] = {}
+        self._task: Optional[asyncio.Task] = None
+        
+        # Stats
+        self.checkpoints = 0
+        self.position_updates = 0
+        self.restored = 0
+        self.restore_failures = 0
+    
+    # ═══════════════════════════════════════════════════════════
+    # ✏️ CHECKPOINTS
+    # ═══════════════════════════════════════════════════════════
+    
+    def checkpoint(self, player):
+        """Queue the player's current state (or its removal when there is nothing to resume)"""
+        state = player.session_state()
+        if state is None:
+            if player.guild_id in self._written:
+                self.forget(player.guild_id)
+            return
+        
+        guild_id = player.guild_id
+        position = round(state["position"], 1)
+        key = (
+            state["voice_channel_id"],
+            state["text_channel_id"],
+            _dumps(state["track"]) if state["track"] else None,
+            int(state["paused"]),
+            state["volume"],
+            state["loop_mode"],
+            _dumps(state["queue"]),
+        )
+        
+        written = self._written.get(guild_id)
+        if written and written[0] == key:
+            if written[1] == position:
+                return
+            self.db.write(
+                "UPDATE player_sessions SET position = ?, updated_at = ? WHERE guild_id = ?",
+                (position, time.time(), guild_id),
+            )
+            self.position_updates += 1
+        else:
+            voice_channel_id, text_channel_id, track, paused, volume, loop_mode, queue = key
+            self.db.write(_UPSERT, (
+                guild_id, voice_channel_id, text_channel_id, track, position,
+                paused, volume, loop_mode, queue, time.time(),
+            ))
+            self.checkpoints += 1
+        self._written[guild_id] = (key, position)
+    
+    def checkpoint_all(self, bot):
+        for player in list(bot.music_players.values()):
+            try:
+                self.checkpoint(player)
+            except Exception as e:
+                logger.error(f"❌ Checkpoint failed in guild {player.guild_id}: {e}")
+    
+    def forget(self, guild_id: int):
+        """Drop a guild's session (it left on purpose, nothing to resume)"""
+        self._written.pop(guild_id, None)
+        self.db.write("DELETE FROM player_sessions WHERE guild_id = ?", (guild_id,))
+    
+    def start(self, bot):
+        """Checkpoint every player each ``interval`` seconds"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_event_loop().create_task(self._run(bot))
+    
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+    
+    async def _run(self, bot):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.checkpoint_all(bot)
+    
+    # ═══════════════════════════════════════════════════════════
+    # ▶️ RESTORE
+    # ═══════════════════════════════════════════════════════════
+    
+    async def load(self) -> List[dict]:
+        """Sessions young enough to resume; older ones are deleted"""
+        cutoff = time.time() - config.DATABASE.session_max_age
+        await self.db.execute("DELETE FROM player_sessions WHERE updated_at < ?", (cutoff,))
+        
+        sessions = []
+        for row in await self.db.fetch_all("SELECT * FROM player_sessions"):
+            try:
+                sessions.append({
+                    **dict(row),
+                    "track": json.loads(row["track"]) if row["track"] else None,
+                    "queue": json.loads(row["queue"]),
+                    "paused": bool(row["paused"]),
+                })
+            except ValueError as e:
+                logger.warning(f"⚠️ Unreadable session for guild {row['guild_id']}: {e}")
+                self.forget(row["guild_id"])
+        return sessions
+    
+    async def restore(self, bot):
+        """
+        Rejoin and resume every saved session, one guild at a time
+        
+        Guilds with people in the channel go first. At most ``restore_rate``
+        guilds per second reconnect, so a restart doesn't hit the voice
+        gateway with every guild at once. Players whose channel is empty
+        come back idle and only start streaming when someone joins.
+        """
+        sessions = await self.load()
+        if not sessions:
+            return
+        
+        def listeners(state: dict) -> int:
+            guild = bot.get_guild(state["guild_id"])
+            channel = guild.get_channel(state["voice_channel_id"]) if guild else None
+            return sum(1 for member in channel.members if not member.bot) if channel else 0
+        
+        sessions.sort(key=listeners, reverse=True)
+        logger.info(f"💾 Resuming {len(sessions)} sessions from before the restart")
+        
+        delay = 1.0 / config.DATABASE.restore_rate if config.DATABASE.restore_rate > 0 else 0.0
+        for state in sessions:
+            guild_id = state["guild_id"]
+            if not bot.get_guild(guild_id):
+                self.forget(guild_id)
+                continue
+            
+            player = bot.get_player(guild_id)
+            if player.is_connected:
+                continue
+            
+            try:
+                resumed = await player.restore(state)
+            except Exception as e:
+                logger.error(f"❌ Could not resume session in guild {guild_id}: {e}")
+                resumed = False
+            
+            if resumed:
+                self.restored += 1
+                self.checkpoint(player)
+            else:
+                self.restore_failures += 1
+                self.forget(guild_id)
+            
+            await asyncio.sleep(delay)
+        
+        logger.info(f"💾 Resumed {self.restored} sessions ({self.restore_failures} failed)")
+    
+    def stats(self) -> dict:
+        return {
+            "tracked": len(self._written),
+            "checkpoints": self.checkpoints,
+            "position_updates": self.position_updates,
+            "restored": self.restored,
+            "restore_failures": self.restore_failures,
+        }
+
+
+_store: Optional[SessionStore] = None
+
+
+def get_session_store() -> Optional[SessionStore]:
+    """Get the process-wide session store (None when disabled)"""
+    global _store
+    if (_store is None or not _store.db.is_open) and config.DATABASE.sessions:
+        _store = SessionStore(get_database())
+    return _store
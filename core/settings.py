@@ -0,0 +1,138 @@
+"""
+⚙️ Guild Settings
+Per-guild settings read from memory and written behind to the database
+"""
+
+import json
+import logging
+import time
+from dataclasses import dataclass, field, fields
+from typing import Dict, Iterable, List, Optional
+
+import discord
+
+import config
+from core.database import Database, get_database
+
+logger = logging.getLogger('ShlokMusic.Settings')
+
+# Guilds per query when priming the cache
+_LOAD_CHUNK = 500
+
+
+@dataclass
+class GuildSettings:
+    """Settings of one guild; anything it never changed follows config"""
+    stay_connected: bool = field(default_factory=lambda: config.MUSIC.stay_connected_24_7)
+    default_volume: int = field(default_factory=lambda: config.MUSIC.default_volume)
+    max_queue_size: int = field(default_factory=lambda: config.MUSIC.max_queue_size)
+    dj_role_id: Optional[int] = None
+    default_effect: str = "none"
+    prefixes: List[str] = field(default_factory=list)  # empty: the bot's default prefixes
+    
+    def is_dj(self, member: discord.Member) -> bool:
+        """Server managers, and members with the DJ role (by ID, or by config.DJ_ROLE_NAME when unset)"""
+        if member.guild_permissions.manage_guild:
+            return True
+        if self.dj_role_id:
+            return any(role.id == self.dj_role_id for role in member.roles)
+        return any(role.name == config.DJ_ROLE_NAME for role in member.roles)
+
+
+SETTING_NAMES = {f.name for f in fields(GuildSettings)}
+
+
+# ═══════════════════════════════════════════════════════════════
+# ⚙️ SETTINGS STORE
+# ═══════════════════════════════════════════════════════════════
+
+class GuildSettingsStore:
+    """
+    Hot map of guild settings in front of the ``guild_settings`` table
+    
+    ``get`` never touches the database: guilds are loaded in bulk when the
+    bot becomes ready (only the guilds this process serves) or joins one.
+    Only the values a guild changed are stored, so changing a default in
+    config reaches every guild that kept it. Changes go through the
+    database's write-behind queue.
+    """
+    
+    def __init__(self, db: Database):
+        self.db = db
+        self._settings: Dict[int, GuildSettings] = {}
+        self._overrides: Dict[int, dict] = {}
+        
+        # Stats
+        self.loaded = 0
+        self.updates = 0
+    
+    async def load(self, guild_ids: Iterable[int]):
+        """Prime the cache with the stored settings of these guilds"""
+        guild_ids = list(guild_ids)
+        for start in range(0, len(guild_ids), _LOAD_CHUNK):
+            chunk = guild_ids[start:start + _LOAD_CHUNK]
+            rows = await self.db.fetch_all(
+                f"SELECT guild_id, data FROM guild_settings WHERE guild_id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            for row in rows:
+                try:
+                    overrides = {k: v for k, v in json.loads(row["data"]).items() if k in SETTING_NAMES}
+                except ValueError as e:
+                    logger.warning(f"⚠️ Unreadable settings for guild {row['guild_id']}: {e}")
+                    continue
+                self._overrides[row["guild_id"]] = overrides
+                self._settings[row["guild_id"]] = GuildSettings(**overrides)
+                self.loaded += 1
+        
+        logger.info(f"⚙️ Loaded settings of {self.loaded} guilds")
+    
+    def get(self, guild_id: int) -> GuildSettings:
+        settings = self._settings.get(guild_id)
+        if settings is None:
+            settings = self._settings[guild_id] = GuildSettings()
+        return settings
+    
+    def update(self, guild_id: int, **changes) -> GuildSettings:
+        """Change settings now and store them with the next batch"""
+        unknown = set(changes) - SETTING_NAMES
+        if unknown:
+            raise ValueError(f"Unknown guild settings: {', '.join(sorted(unknown))}")
+        
+        settings = self.get(guild_id)
+        overrides = self._overrides.setdefault(guild_id, {})
+        for name, value in changes.items():
+            setattr(settings, name, value)
+            overrides[name] = value
+        
+        self.db.write(
+            "INSERT INTO guild_settings (guild_id, data, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(guild_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+            (guild_id, json.dumps(overrides, separators=(",", ":")), time.time()),
+        )
+        self.updates += 1
+        return settings
+    
+    def reset(self, guild_id: int):
+        """Back to the config defaults"""
+        self._settings.pop(guild_id, None)
+        self._overrides.pop(guild_id, None)
+        self.db.write("DELETE FROM guild_settings WHERE guild_id = ?", (guild_id,))
+    
+    def stats(self) -> dict:
+        return {
+            "cached": len(self._settings),
+            "customized": len(self._overrides),
+            "updates": self.updates,
+        }
+
+
+_store: Optional[GuildSettingsStore] = None
+
+
+def get_guild_settings() -> GuildSettingsStore:
+    """Get the process-wide guild settings store"""
+    global _store
+    if _store is None or not _store.db.is_open:
+        _store = GuildSettingsStore(get_database())
+    return _store
@@ -0,0 +1,315 @@
+"""
+📻 Broadcast Stations
+Decode and encode a source once, fan the Opus packets out to many guilds
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Optional, List, Dict
+
+import discord
+from discord import opus
+
+import config
+from core.queue import MusicQueue
+from core.track import Track
+
+logger = logging.getLogger('ShlokMusic.Station')
+
+FRAME_DELAY = opus.Encoder.FRAME_LENGTH / 1000.0
+
+# ═══════════════════════════════════════════════════════════════
+# 🎧 SUBSCRIBER SOURCE
+# ═══════════════════════════════════════════════════════════════
+
+class StationSource(discord.AudioSource):
+    """
+    Reads a station's shared packet ring at its own cursor
+    
+    A subscriber never decodes or encodes anything: ``read`` only hands
+    out a reference to a packet the station already produced. Late
+    joiners start a few frames behind the live edge, which absorbs the
+    timing jitter between the producer and the sender.
+    """
+    
+    # Packets come from memory, read() never waits
+    nonblocking = True
+    
+    def __init__(self, station: 'Station'):
+        self.station = station
+        self._cursor = station.live_position()
+        self._closed = False
+    
+    def is_opus(self) -> bool:
+        return True
+    
+    def read(self) -> bytes:
+        if self._closed:
+            return b''
+        
+        packet, self._cursor = self.station._packet_at(self._cursor)
+        if packet is None:
+            # Station went off air
+            return b''
+        return packet
+    
+    def cleanup(self):
+        if not self._closed:
+            self._closed = True
+            self.station.unsubscribe(self)
+
+
+# ═══════════════════════════════════════════════════════════════
+# 📻 STATION
+# ═══════════════════════════════════════════════════════════════
+
+class Station:
+    """
+    One source pipeline (yt-dlp → FFmpeg → Opus) shared by many players
+    
+    The producer thread plays the station queue in real time and appends
+    every encoded packet to a bounded ring. Subscribers read from the ring
+    at the live position; adding a guild costs one cursor.
+    """
+    
+    def __init__(self, manager: 'StationManager', name: str, loop: asyncio.AbstractEventLoop):
+        self.manager = manager
+        self.name = name
+        self.loop = loop
+        
+        self.queue = MusicQueue()
+        self.current_track: Optional[Track] = None
+        self.subscribers: List[StationSource] = []
+        
+        # Shared packet ring, addressed by absolute sequence number
+        self._packets: deque = deque(maxlen=config.MUSIC.station_ring_frames)
+        self._head = 0
+        self._lock = threading.Lock()
+        
+        self._encoder: Optional[opus.Encoder] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._idle_since: Optional[float] = None
+        
+        # Stats
+        self.packets_produced = 0
+        self.tracks_played = 0
+        self.started_at: Optional[float] = None
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🔄 LIFECYCLE
+    # ═══════════════════════════════════════════════════════════
+    
+    @property
+    def is_live(self) -> bool:
+        return self._running
+    
+    def start(self):
+        """Start the producer thread"""
+        if self._running:
+            return
+        self._running = True
+        self.started_at = time.time()
+        self._idle_since = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name=f'station:{self.name}', daemon=True)
+        self._thread.start()
+        logger.info(f"📻 Station '{self.name}' on air")
+    
+    def stop(self):
+        """Take the station off air; subscribers end on their next read"""
+        self._running = False
+    
+    # ═══════════════════════════════════════════════════════════
+    # 👥 SUBSCRIBERS
+    # ═══════════════════════════════════════════════════════════
+    
+    def subscribe(self) -> StationSource:
+        """Create a source that follows this station from the live position"""
+        source = StationSource(self)
+        with self._lock:
+            self.subscribers.append(source)
+            self._idle_since = None
+        return source
+    
+    def unsubscribe(self, source: StationSource):
+        """Detach a subscriber"""
+        with self._lock:
+            if source in self.subscribers:
+                self.subscribers.remove(source)
+            if not self.subscribers:
+                self._idle_since = time.perf_counter()
+    
+    def live_position(self) -> int:
+        """Sequence number a new subscriber should start from"""
+        with self._lock:
+            return max(self._head - config.MUSIC.station_jitter_frames, self._head - len(self._packets))
+    
+    def _packet_at(self, cursor: int):
+        """Packet at ``cursor`` and the cursor to use next time"""
+        with self._lock:
+            if not self._running:
+                return None, cursor
+            
+            tail = self._head - len(self._packets)
+            if cursor < tail:
+                # Fell out of the ring, rejoin at the live edge
+                cursor = max(tail, self._head - config.MUSIC.station_jitter_frames)
+            
+            if cursor >= self._head:
+                # Caught up with the producer, hold with silence
+                return opus.OPUS_SILENCE, cursor
+            
+            return self._packets[cursor - tail], cursor + 1
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🎙️ PRODUCER
+    # ═══════════════════════════════════════════════════════════
+    
+    def _next_source(self) -> Optional[discord.AudioSource]:
+        """Advance the station queue and open the next track"""
+        for _ in range(max(1, len(self.queue))):
+            track = self.queue.get_next()
+            if not track:
+                return None
+            
+            # Stations loop their queue like a radio rotation
+            self.queue.add(track)
+            
+            # No per-guild volume on a station, cached tracks go out as stored packets
+            future = asyncio.run_coroutine_threadsafe(track.get_source(passthrough=True), self.loop)
+            try:
+                source = future.result(timeout=60)
+            except Exception as e:
+                logger.error(f"❌ Station '{self.name}' failed to open {track.title}: {e}")
+                continue
+            
+            if source:
+                if not source.is_opus() and track.gain != 1.0:
+                    source = discord.PCMVolumeTransformer(source, volume=track.gain)
+                self.current_track = track
+                self.tracks_played += 1
+                return source
+        return None
+    
+    def _publish(self, packet: bytes):
+        with self._lock:
+            self._packets.append(packet)
+            self._head += 1
+        self.packets_produced += 1
+    
+    def _run(self):
+        """Producer loop, paced in real time"""
+        source: Optional[discord.AudioSource] = None
+        loops = 0
+        start = time.perf_counter()
+        
+        try:
+            while self._running:
+                idle_since = self._idle_since
+                if idle_since and time.perf_counter() - idle_since > config.MUSIC.station_idle_timeout:
+                    logger.info(f"📻 Station '{self.name}' has no listeners, going off air")
+                    break
+                
+                if source is None:
+                    source = self._next_source()
+                    if source is None:
+                        logger.warning(f"⚠️ Station '{self.name}' has nothing to play")
+                        break
+                    if not source.is_opus() and self._encoder is None:
+                        self._encoder = opus.Encoder(bitrate=config.MUSIC.audio_bitrate)
+                
+                data = source.read()
+                if not data:
+                    source.cleanup()
+                    source = None
+                    continue
+                
+                if not source.is_opus():
+                    data = self._encoder.encode(data, self._encoder.SAMPLES_PER_FRAME)
+                
+                self._publish(data)
+                
+                loops += 1
+                delay = start + FRAME_DELAY * loops - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < -1.0:
+                    # Source stalled for a long time, don't burst to catch up
+                    loops = 0
+                    start = time.perf_counter()
+        except Exception as e:
+            logger.error(f"❌ Station '{self.name}' crashed: {e}")
+        finally:
+            self._running = False
+            if source is not None:
+                source.cleanup()
+            self.manager._remove(self)
+            logger.info(f"📴 Station '{self.name}' off air")
+    
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "live": self.is_live,
+            "listeners": len(self.subscribers),
+            "now_playing": self.current_track.title if self.current_track else None,
+            "queue": len(self.queue),
+            "packets_produced": self.packets_produced,
+            "tracks_played": self.tracks_played,
+        }
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🗂️ STATION MANAGER
+# ═══════════════════════════════════════════════════════════════
+
+class StationManager:
+    """Registry of live stations, shared by every guild"""
+    
+    def __init__(self):
+        self._stations: Dict[str, Station] = {}
+    
+    @staticmethod
+    def _key(name: str) -> str:
+        return name.strip().lower()
+    
+    def get(self, name: str) -> Optional[Station]:
+        """Get a live station by name"""
+        return self._stations.get(self._key(name))
+    
+    def live(self) -> List[Station]:
+        """All live stations"""
+        return list(self._stations.values())
+    
+    def create(self, name: str, tracks: List[Track], loop: asyncio.AbstractEventLoop = None) -> Station:
+        """Create and start a station playing ``tracks`` on rotation"""
+        key = self._key(name)
+        if key in self._stations:
+            raise ValueError(f"Station '{name}' already exists")
+        
+        station = Station(self, name, loop or asyncio.get_event_loop())
+        station.queue.add_multiple(tracks)
+        self._stations[key] = station
+        station.start()
+        return station
+    
+    def _remove(self, station: Station):
+        key = self._key(station.name)
+        if self._stations.get(key) is station:
+            del self._stations[key]
+    
+    def stats(self) -> list:
+        return [station.stats() for station in self.live()]
+
+
+_manager: Optional[StationManager] = None
+
+
+def get_station_manager() -> StationManager:
+    """Get the process-wide station manager"""
+    global _manager
+    if _manager is None:
+        _manager = StationManager()
+    return _manager
@@ -0,0 +1,419 @@
+"""
+🧯 FFmpeg Supervisor
+Owns every FFmpeg child: node-wide cap, fair queuing, resource accounting
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Optional, Callable, List, Dict
+
+import discord
+
+import config
+
+logger = logging.getLogger('ShlokMusic.Supervisor')
+
+# Children carry the bot's pid, so a restarted bot can find what a crashed one left behind
+OWNER_ENV = 'SHLOK_FFMPEG_OWNER'
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+class FFmpegCapacityError(Exception):
+    """No FFmpeg slot became free in time"""
+
+
+def _read_proc(pid: int):
+    """CPU seconds and resident bytes of a process, None when unavailable"""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            fields = f.read().rpartition(')')[2].split()
+        with open(f'/proc/{pid}/statm') as f:
+            resident = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS, resident * PAGE_SIZE
+
+
+# ═══════════════════════════════════════════════════════════════
+# 📋 CHILD RECORDS
+# ═══════════════════════════════════════════════════════════════
+
+@dataclass
+class FFmpegChild:
+    """Bookkeeping for one running FFmpeg process"""
+    process: subprocess.Popen
+    source: weakref.ref
+    guild_id: Optional[int]
+    started: float = field(default_factory=time.monotonic)
+    frames: int = 0
+    reading_since: Optional[float] = None
+    cpu_seconds: float = 0.0
+    cpu_percent: float = 0.0
+    rss: int = 0
+    sampled: Optional[float] = None
+    
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+    
+    def sample(self, now: float):
+        """Refresh CPU and memory from /proc"""
+        usage = _read_proc(self.pid)
+        if usage is None:
+            return
+        cpu_seconds, self.rss = usage
+        if self.sampled is not None and now > self.sampled:
+            self.cpu_percent = round(100 * (cpu_seconds - self.cpu_seconds) / (now - self.sampled), 1)
+        self.cpu_seconds = cpu_seconds
+        self.sampled = now
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🎧 SUPERVISED SOURCE
+# ═══════════════════════════════════════════════════════════════
+
+class SupervisedFFmpegPCMAudio(discord.FFmpegPCMAudio):
+    """FFmpegPCMAudio whose process is registered with the supervisor"""
+    
+    def __init__(
+        self,
+        supervisor: 'FFmpegSupervisor',
+        guild_id: Optional[int],
+        source: str,
+        on_close: Optional[Callable[[], None]] = None,
+        **kwargs
+    ):
+        self._supervisor = supervisor
+        self._guild_id = guild_id
+        self._child: Optional[FFmpegChild] = None
+        self._on_close = on_close
+        super().__init__(source, **kwargs)
+    
+    def _spawn_process(self, args, **subprocess_kwargs) -> subprocess.Popen:
+        subprocess_kwargs['env'] = self._supervisor.child_env
+        process = super()._spawn_process(args, **subprocess_kwargs)
+        self._child = self._supervisor._register(process, self, self._guild_id)
+        return process
+    
+    def read(self) -> bytes:
+        child = self._child
+        if child is None:
+            return super().read()
+        
+        child.reading_since = time.monotonic()
+        data = super().read()
+        child.reading_since = None
+        if data:
+            child.frames += 1
+        return data
+    
+    def _kill_process(self):
+        try:
+            super()._kill_process()
+        finally:
+            child, self._child = getattr(self, '_child', None), None
+            if child is not None:
+                self._supervisor._unregister(child)
+            on_close, self._on_close = getattr(self, '_on_close', None), None
+            if on_close is not None:
+                on_close()
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🧯 SUPERVISOR
+# ═══════════════════════════════════════════════════════════════
+
+class FFmpegSupervisor:
+    """
+    Spawns, limits and watches every FFmpeg child of the bot
+    
+    At most ``max_processes`` run at once; further requests queue, and a
+    freed slot goes to the waiting guild that currently runs the fewest
+    processes. A monitor thread samples CPU and RSS from /proc, reaps
+    exited children whose source was never cleaned up, and kills
+    processes a reader has been blocked on for ``stall_timeout`` (the
+    player then sees an early end and resumes the track).
+    """
+    
+    def __init__(self, max_processes: int = None, queue_timeout: float = None, stall_timeout: float = None, poll_interval: float = None):
+        self.max_processes = max(1, max_processes or config.MUSIC.ffmpeg_max_processes)
+        self.queue_timeout = queue_timeout or config.MUSIC.ffmpeg_queue_timeout
+        self.stall_timeout = stall_timeout or config.MUSIC.ffmpeg_stall_timeout
+        self.poll_interval = poll_interval or config.MUSIC.ffmpeg_poll_interval
+        
+        self.child_env = {**os.environ, OWNER_ENV: str(os.getpid())}
+        
+        self._children: Dict[int, FFmpegChild] = {}
+        self._slots = 0
+        self._waiters: List[tuple] = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        
+        self._monitor: Optional[threading.Thread] = None
+        self._running = False
+        
+        # Stats
+        self.spawned = 0
+        self.peak = 0
+        self.queued = 0
+        self.timeouts = 0
+        self.overcommitted = 0
+        self.reaped = 0
+        self.killed_stalled = 0
+        self.killed_orphans = 0
+        self.total_wait = 0.0
+        self.finished_cpu: Dict[Optional[int], float] = {}
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🔄 LIFECYCLE
+    # ═══════════════════════════════════════════════════════════
+    
+    def start(self):
+        """Kill orphans of a previous run and start the monitor thread"""
+        if self._running:
+            return
+        self._running = True
+        self.kill_orphans()
+        self._monitor = threading.Thread(target=self._monitor_loop, name='ffmpeg-supervisor', daemon=True)
+        self._monitor.start()
+    
+    def shutdown(self):
+        """Stop monitoring and kill every remaining child"""
+        self._running = False
+        with self._lock:
+            children = list(self._children.values())
+        for child in children:
+            self._kill(child)
+            self._unregister(child)
+    
+    def kill_orphans(self) -> int:
+        """Kill FFmpeg processes left running by a bot process that no longer exists"""
+        if not os.path.isdir('/proc'):
+            return 0
+        
+        me = str(os.getpid())
+        killed = 0
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/environ', 'rb') as f:
+                    environ = f.read().split(b'\0')
+            except OSError:
+                continue
+            
+            marker = next((item for item in environ if item.startswith(OWNER_ENV.encode() + b'=')), None)
+            if marker is None:
+                continue
+            owner = marker.partition(b'=')[2].decode()
+            if owner == me or (owner.isdigit() and os.path.exists(f'/proc/{owner}')):
+                continue
+            
+            try:
+                os.kill(int(entry), signal.SIGKILL)
+                killed += 1
+            except OSError:
+                pass
+        
+        if killed:
+            self.killed_orphans += killed
+            logger.warning(f"🧹 Killed {killed} orphaned FFmpeg process(es) from a previous run")
+        return killed
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🎟️ SLOTS
+    # ═══════════════════════════════════════════════════════════
+    
+    def _running_for(self, guild_id: Optional[int]) -> int:
+        return sum(1 for child in self._children.values() if child.guild_id == guild_id)
+    
+    async def acquire(self, guild_id: Optional[int] = None):
+        """Wait for an FFmpeg slot; raises FFmpegCapacityError on timeout"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._slots < self.max_processes and not self._waiters:
+                self._slots += 1
+                return
+            future = loop.create_future()
+            self._waiters.append((guild_id, next(self._sequence), future, loop))
+            self.queued += 1
+        
+        waited = time.perf_counter()
+        logger.info(f"⏳ FFmpeg cap reached ({self.max_processes}), guild {guild_id} queued")
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._waiters = [waiter for waiter in self._waiters if waiter[2] is not future]
+            if future.done() and not future.cancelled():
+                # Granted just as we gave up
+                self.release()
+            self.timeouts += 1
+            raise FFmpegCapacityError(f"No FFmpeg slot free after {self.queue_timeout:.0f}s")
+        finally:
+            self.total_wait += time.perf_counter() - waited
+    
+    def release(self):
+        """Free a slot, handing it to the fairest waiter"""
+        with self._lock:
+            while self._waiters:
+                waiter = min(self._waiters, key=lambda w: (self._running_for(w[0]), w[1]))
+                self._waiters.remove(waiter)
+                future, loop = waiter[2], waiter[3]
+                if not future.done():
+                    # The slot passes straight to the waiter
+                    loop.call_soon_threadsafe(self._grant, future)
+                    return
+            self._slots = max(0, self._slots - 1)
+    
+    def _grant(self, future: asyncio.Future):
+        if future.done():
+            # Waiter went away after the slot was handed over
+            self.release()
+        else:
+            future.set_result(True)
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🎬 SPAWNING
+    # ═══════════════════════════════════════════════════════════
+    
+    async def spawn(self, guild_id: Optional[int], source: str, **kwargs) -> SupervisedFFmpegPCMAudio:
+        """Wait for a slot, then start an FFmpegPCMAudio for ``guild_id``"""
+        self.start()
+        await self.acquire(guild_id)
+        return self._create(guild_id, source, **kwargs)
+    
+    def spawn_nowait(self, guild_id: Optional[int], source: str, **kwargs) -> SupervisedFFmpegPCMAudio:
+        """Start an FFmpegPCMAudio immediately, even over the cap (for callers that cannot wait)"""
+        self.start()
+        with self._lock:
+            if self._slots >= self.max_processes:
+                self.overcommitted += 1
+            self._slots += 1
+        return self._create(guild_id, source, **kwargs)
+    
+    def _create(self, guild_id: Optional[int], source: str, **kwargs) -> SupervisedFFmpegPCMAudio:
+        try:
+            return SupervisedFFmpegPCMAudio(self, guild_id, source, **kwargs)
+        except Exception:
+            self.release()
+            raise
+    
+    def _register(self, process: subprocess.Popen, source: SupervisedFFmpegPCMAudio, guild_id: Optional[int]) -> FFmpegChild:
+        child = FFmpegChild(process=process, source=weakref.ref(source), guild_id=guild_id)
+        with self._lock:
+            self._children[process.pid] = child
+            self.spawned += 1
+            self.peak = max(self.peak, len(self._children))
+        return child
+    
+    def _unregister(self, child: FFmpegChild):
+        with self._lock:
+            if self._children.get(child.pid) is not child:
+                return
+            del self._children[child.pid]
+            self.finished_cpu[child.guild_id] = self.finished_cpu.get(child.guild_id, 0.0) + child.cpu_seconds
+        self.release()
+    
+    # ═══════════════════════════════════════════════════════════
+    # 👀 MONITOR
+    # ═══════════════════════════════════════════════════════════
+    
+    @staticmethod
+    def _kill(child: FFmpegChild):
+        try:
+            child.process.kill()
+            child.process.wait(timeout=5)
+        except Exception:
+            pass
+    
+    def _monitor_loop(self):
+        while self._running:
+            time.sleep(self.poll_interval)
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"❌ FFmpeg monitor failed: {e}")
+    
+    def check(self):
+        """Sample, reap and unstick children (one monitor pass)"""
+        now = time.monotonic()
+        with self._lock:
+            children = list(self._children.values())
+        
+        for child in children:
+            child.sample(now)
+            
+            if child.source() is None:
+                # Source was dropped without cleanup, don't leave a zombie behind
+                if child.process.poll() is None:
+                    self._kill(child)
+                self.reaped += 1
+                logger.warning(f"🧹 Reaped FFmpeg {child.pid} (guild {child.guild_id}), source was never cleaned up")
+                self._unregister(child)
+                continue
+            
+            reading_since = child.reading_since
+            if reading_since and now - reading_since > self.stall_timeout and child.process.poll() is None:
+                # Killing it ends the blocked read with EOF
+                self.killed_stalled += 1
+                logger.warning(f"🔪 Killed FFmpeg {child.pid} (guild {child.guild_id}), no frames for {now - reading_since:.0f}s")
+                self._kill(child)
+    
+    def stats(self) -> dict:
+        with self._lock:
+            children = list(self._children.values())
+            waiting = len(self._waiters)
+        
+        guilds: Dict[str, dict] = {}
+        for child in children:
+            entry = guilds.setdefault(str(child.guild_id or 'shared'), {"processes": 0, "cpu_percent": 0.0, "rss_mb": 0.0, "cpu_seconds": 0.0})
+            entry["processes"] += 1
+            entry["cpu_percent"] = round(entry["cpu_percent"] + child.cpu_percent, 1)
+            entry["rss_mb"] = round(entry["rss_mb"] + child.rss / 1024 / 1024, 1)
+            entry["cpu_seconds"] += child.cpu_seconds
+        for guild_id, cpu_seconds in self.finished_cpu.items():
+            entry = guilds.setdefault(str(guild_id or 'shared'), {"processes": 0, "cpu_percent": 0.0, "rss_mb": 0.0, "cpu_seconds": 0.0})
+            entry["cpu_seconds"] += cpu_seconds
+        for entry in guilds.values():
+            entry["cpu_seconds"] = round(entry["cpu_seconds"], 1)
+        
+        now = time.monotonic()
+        return {
+            "running": len(children),
+            "max_processes": self.max_processes,
+            "waiting": waiting,
+            "peak": self.peak,
+            "spawned": self.spawned,
+            "queued": self.queued,
+            "avg_wait_ms": round(1000 * self.total_wait / self.queued, 1) if self.queued else 0.0,
+            "timeouts": self.timeouts,
+            "overcommitted": self.overcommitted,
+            "reaped": self.reaped,
+            "killed_stalled": self.killed_stalled,
+            "killed_orphans": self.killed_orphans,
+            "cpu_percent": round(sum(child.cpu_percent for child in children), 1),
+            "rss_mb": round(sum(child.rss for child in children) / 1024 / 1024, 1),
+            "oldest_seconds": round(max((now - child.started for child in children), default=0.0), 1),
+            "guilds": guilds,
+        }
+
+
+_supervisor: Optional[FFmpegSupervisor] = None
+
+
+def get_ffmpeg_supervisor() -> FFmpegSupervisor:
+    """Get the process-wide FFmpeg supervisor"""
+    global _supervisor
+    if _supervisor is None:
+        _supervisor = FFmpegSupervisor()
+    return _supervisor
@@ -4,17 +4,35 @@ Represents a music track with all metadata
 """
 
 import asyncio
+import hashlib
+import importlib
 import logging
-from typing import Optional, Dict, Any
+import re
+import sys
+import time
+from typing import Optional
 from dataclasses import dataclass, field
 
 import discord
-import yt_dlp
 
 import config
+from core.cache import get_audio_cache
+from core.loudness import normalization_gain_db, db_to_linear
+from core.packet_store import open_packet_source
+from core.proxy import get_range_proxy
+from core.supervisor import FFmpegCapacityError, get_ffmpeg_supervisor
+from core.warmer import get_cache_warmer
 
 logger = logging.getLogger('ShlokMusic.Track')
 
+YOUTUBE_ID_PATTERN = re.compile(r'(?:v=|youtu\.be/|/shorts/|/embed/)([A-Za-z0-9_-]{11})')
+STREAM_EXPIRE_PATTERN = re.compile(r'[?&/]expire[=/](\d+)')
+
+
+async def load_yt_dlp():
+    """yt_dlp, imported in a thread on first use (it takes a second or so)"""
+    return sys.modules.get('yt_dlp') or await asyncio.to_thread(importlib.import_module, 'yt_dlp')
+
 # ═══════════════════════════════════════════════════════════════
 # 🎵 TRACK DATACLASS
 # ═══════════════════════════════════════════════════════════════
@@ -45,6 +63,12 @@ class Track:
     # Audio source URL (extracted later)
     _audio_url: Optional[str] = field(default=None, repr=False)
     
+    # Loudness normalization gain (linear) to apply to the last source
+    gain: float = field(default=1.0, repr=False)
+    
+    # True when the last source reads the remote stream (not the cache)
+    streaming: bool = field(default=False, repr=False)
+    
     # Additional metadata
     views: Optional[int] = None
     likes: Optional[int] = None
@@ -56,6 +80,32 @@ class Track:
         """Get requester's user ID"""
         return self.requester.id if self.requester else None
     
+    @property
+    def track_id(self) -> str:
+        """Canonical ID: the YouTube video ID, or a hash of the URL"""
+        match = YOUTUBE_ID_PATTERN.search(self.url or "")
+        if match:
+            return f"yt-{match.group(1)}"
+        return "url-" + hashlib.sha1((self.url or self.title).encode()).hexdigest()[:16]
+    
+    @property
+    def stream_expires_at(self) -> Optional[float]:
+        """When the extracted stream URL stops working (googlevideo ``expire=``)"""
+        match = STREAM_EXPIRE_PATTERN.search(self._audio_url or "")
+        return float(match.group(1)) if match else None
+    
+    def stream_expires_soon(self, margin: float = None) -> bool:
+        """True when the stream URL is expired or about to be"""
+        expires_at = self.stream_expires_at
+        if expires_at is None:
+            return False
+        margin = config.MUSIC.stream_expiry_margin if margin is None else margin
+        return time.time() > expires_at - margin
+    
+    def invalidate_stream(self):
+        """Forget the stream URL so the next source re-resolves it"""
+        self._audio_url = None
+    
     @property
     def duration_formatted(self) -> str:
         """Get formatted duration string"""
@@ -69,9 +119,57 @@ class Track:
             return f"{hours}:{minutes:02d}:{seconds:02d}"
         return f"{minutes}:{seconds:02d}"
     
-    async def get_source(self) -> Optional[discord.FFmpegPCMAudio]:
-        """Get FFmpeg audio source for playback"""
+    async def get_source(self, passthrough: bool = False, start_at: float = 0.0, guild_id: int = None) -> Optional[discord.AudioSource]:
+        """
+        Get an audio source for playback
+        
+        With ``passthrough``, a cached track that needs no gain is returned
+        as pre-encoded Opus packets (no FFmpeg); callers must not apply
+        volume or effects to it. ``gain`` is set to the static loudness
+        normalization to apply to the returned PCM source (a fixed boost
+        while the track is unmeasured). ``start_at`` resumes a track that
+        was interrupted mid-way (seconds). FFmpeg is started through the
+        supervisor and accounted to ``guild_id``.
+        """
         try:
+            cache = get_audio_cache()
+            
+            # Gain towards the loudness target once this track was measured,
+            # until then the boost the old default volume gave every track
+            loudness = cache.get_loudness(self.track_id) if cache else None
+            target_db = config.MUSIC.unmeasured_gain_db
+            if loudness and config.MUSIC.normalize_loudness:
+                target_db = normalization_gain_db(loudness)
+            self.gain = db_to_linear(target_db)
+            
+            # Serve from the local cache when we have it
+            if cache:
+                # Restarts and seeks (start_at) are not new plays
+                cached_path = cache.lookup(self.track_id, play=not start_at)
+                if not start_at:
+                    cache.record_play(self.track_id)
+                if cached_path:
+                    self.streaming = False
+                    
+                    # Cached files already carry the gain measured when they were stored
+                    remaining_db = target_db - (loudness or {}).get("baked_db", 0.0)
+                    self.gain = db_to_linear(remaining_db)
+                    
+                    if passthrough and config.CACHE.passthrough and abs(remaining_db) < 0.1:
+                        source = open_packet_source(cached_path, start_at)
+                        if source:
+                            self.gain = 1.0
+                            logger.info(f"📦 Playing cached packets: {self.title}")
+                            return source
+                    
+                    logger.info(f"💾 Playing from cache: {self.title}")
+                    return await get_ffmpeg_supervisor().spawn(guild_id, cached_path, before_options=self._seek_option(start_at), options='-vn')
+            
+            # Extracted URLs expire, a track replayed later needs a fresh one
+            if self._audio_url and self.stream_expires_soon():
+                logger.info(f"🔄 Stream URL expired, re-resolving: {self.title}")
+                self._audio_url = None
+            
             # Extract audio URL if not already done
             if not self._audio_url:
                 await self._extract_audio_url()
@@ -82,26 +180,78 @@ class Track:
             
             logger.info(f"🎧 Creating FFmpeg source with URL length: {len(self._audio_url)}")
             
+            # Popular enough to keep a local copy, transcoded in the background
+            warm = bool(cache) and not start_at and cache.should_store(self.track_id)
+            
+            stream_url, teeing = self._audio_url, False
+            proxy = get_range_proxy()
+            if proxy:
+                stream_url, teeing = await self._proxy_stream(proxy, cache if warm else None)
+            
             # FFmpeg options for streaming
             ffmpeg_options = {
-                'before_options': '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5',
+                'before_options': f'-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5 {self._seek_option(start_at)}'.strip(),
                 'options': '-vn'
             }
             
-            source = discord.FFmpegPCMAudio(
-                self._audio_url,
-                **ffmpeg_options
-            )
+            # The proxy forgets the stream once this FFmpeg is done with it
+            on_close = (lambda: proxy.close_stream(stream_url)) if stream_url != self._audio_url else None
+            try:
+                source = await get_ffmpeg_supervisor().spawn(
+                    guild_id,
+                    stream_url,
+                    on_close=on_close,
+                    **ffmpeg_options
+                )
+            except BaseException:
+                if on_close:
+                    on_close()
+                raise
             
             logger.info(f"✅ FFmpeg source created successfully")
+            
+            self.streaming = True
+            
+            # A teed stream is submitted once it has been read to the end
+            if warm and not teeing:
+                get_cache_warmer().submit_played(self, self._audio_url)
             return source
             
+        except FFmpegCapacityError as e:
+            logger.warning(f"⚠️ {e}, cannot play {self.title}")
+            return None
         except Exception as e:
             logger.error(f"❌ Error getting audio source: {e}")
             import traceback
             traceback.print_exc()
             return None
     
+    async def _proxy_stream(self, proxy, cache=None):
+        """
+        Route the stream through the range fetch proxy
+        
+        With a cache, the bytes FFmpeg reads are also teed to disk and the
+        warmer transcodes that copy instead of downloading the track again.
+        Returns the URL for FFmpeg and whether it is being teed.
+        """
+        audio_url = self._audio_url
+        tee_path = cache.path_for(self.track_id) + ".tee.part" if cache else None
+        
+        def on_done(path: Optional[str]):
+            # Played to the end: transcode the copy, otherwise fetch it again
+            get_cache_warmer().submit_played(self, path or audio_url)
+        
+        try:
+            return await proxy.open(self._audio_url, tee_path, on_done if tee_path else None), bool(tee_path)
+        except Exception as e:
+            logger.warning(f"⚠️ Range proxy unavailable, streaming directly: {e}")
+            return self._audio_url, False
+    
+    @staticmethod
+    def _seek_option(start_at: float) -> str:
+        """FFmpeg input option that starts playback at ``start_at`` seconds"""
+        return f'-ss {start_at:.2f}' if start_at else ''
+    
     async def _extract_audio_url(self):
         """Extract the direct audio URL"""
         try:
@@ -135,7 +285,7 @@ class Track:
                 'retries': 5,
             }
             
-            with yt_dlp.YoutubeDL(ytdl_opts) as ytdl:
+            with (await load_yt_dlp()).YoutubeDL(ytdl_opts) as ytdl:
                 loop = asyncio.get_event_loop()
                 data = await loop.run_in_executor(
                     None,
@@ -250,7 +400,7 @@ class TrackExtractor:
             if not is_url:
                 query = f"ytsearch{limit}:{query}"
             
-            with yt_dlp.YoutubeDL(ytdl_opts) as ytdl:
+            with (await load_yt_dlp()).YoutubeDL(ytdl_opts) as ytdl:
                 loop = asyncio.get_event_loop()
                 data = await loop.run_in_executor(
                     None,
@@ -300,7 +450,7 @@ class TrackExtractor:
                 'playlistend': limit,
             }
             
-            with yt_dlp.YoutubeDL(ytdl_opts) as ytdl:
+            with (await load_yt_dlp()).YoutubeDL(ytdl_opts) as ytdl:
                 loop = asyncio.get_event_loop()
                 data = await loop.run_in_executor(
                     None,
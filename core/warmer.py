@@ -0,0 +1,554 @@
+"""
+🔥 Cache Warmer
+Downloads and transcodes tracks into the audio cache in the background
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing as mp
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, asdict
+from typing import Optional, Dict, List, Iterable
+
+import config
+from core.cache import AudioCache, get_audio_cache
+from core.loudness import measure_loudness, normalization_gain_db
+from core.packet_store import build_index
+
+logger = logging.getLogger('ShlokMusic.Warmer')
+
+# Job priorities, lowest runs first
+PRIORITY_UPCOMING = 0
+PRIORITY_PLAYS = 1
+PRIORITY_PLAYLIST = 2
+PRIORITY_ANALYSIS = 3
+
+# ═══════════════════════════════════════════════════════════════
+# 🧵 WORKER PROCESS
+# ═══════════════════════════════════════════════════════════════
+
+def _init_worker(niceness: int, io_idle: bool):
+    """Lower the CPU and I/O priority of a pool process (inherited by FFmpeg)"""
+    try:
+        if niceness:
+            os.nice(niceness)
+    except OSError:
+        pass
+    
+    if io_idle and shutil.which("ionice"):
+        subprocess.run(
+            ["ionice", "-c", "3", "-p", str(os.getpid())],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False
+        )
+
+
+def _resolve_stream_url(url: str) -> Optional[str]:
+    """Direct audio URL of a track page"""
+    import yt_dlp
+    
+    ytdl_opts = {
+        'format': 'bestaudio/best',
+        'noplaylist': True,
+        'nocheckcertificate': True,
+        'quiet': True,
+        'no_warnings': True,
+        'socket_timeout': 30,
+        'retries': 5,
+    }
+    with yt_dlp.YoutubeDL(ytdl_opts) as ytdl:
+        data = ytdl.extract_info(url, download=False)
+    
+    if not data:
+        return None
+    if data.get('url'):
+        return data['url']
+    
+    formats = [f for f in data.get('formats', []) if f.get('acodec') != 'none' and f.get('url')]
+    audio_only = [f for f in formats if f.get('vcodec') == 'none']
+    if audio_only:
+        return max(audio_only, key=lambda f: f.get('abr', 0) or 0)['url']
+    return formats[0]['url'] if formats else None
+
+
+def _run_ffmpeg(args: List[str], timeout: float = 900):
+    result = subprocess.run(
+        ["ffmpeg", "-nostdin", "-loglevel", "error", "-y", *args],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        timeout=timeout
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg failed: {result.stderr.decode(errors='ignore')[-200:]}")
+
+
+def _warm_job(url: str, stream_url: Optional[str], path: str, bitrate: int, normalize: Optional[dict]) -> dict:
+    """Fetch, measure, transcode and index one track; returns its size and loudness"""
+    try:
+        return _fetch_and_transcode(url, stream_url, path, bitrate, normalize)
+    except Exception as e:
+        # Third-party exceptions may not survive pickling back to the bot
+        raise RuntimeError(str(e)) from None
+
+
+def _analyze_job(path: str) -> Optional[dict]:
+    """Measure the loudness of an already cached file"""
+    loudness = measure_loudness(path)
+    if loudness:
+        loudness["baked_db"] = 0.0
+    return loudness
+
+
+def _fetch_and_transcode(
+    url: str,
+    stream_url: Optional[str],
+    path: str,
+    bitrate: int,
+    normalize: Optional[dict]
+) -> dict:
+    # A local file is a stream the range proxy already teed to disk
+    teed = bool(stream_url) and os.path.isabs(stream_url)
+    if teed and not os.path.isfile(stream_url):
+        # Consumed by an earlier attempt
+        teed, stream_url = False, None
+    
+    if not stream_url:
+        stream_url = _resolve_stream_url(url)
+    if not stream_url:
+        raise RuntimeError("No audio URL found")
+    
+    source_path = stream_url if teed else path + ".src.part"
+    tmp_path = path + ".part"
+    try:
+        # Download once, untouched, so measuring and encoding read a local file
+        if not teed:
+            _run_ffmpeg([
+                "-reconnect", "1", "-reconnect_streamed", "1", "-reconnect_delay_max", "5",
+                "-i", stream_url, "-vn", "-c:a", "copy", "-f", "matroska", source_path,
+            ])
+        
+        # Bake the normalization gain into the file, so cached playback
+        # (including packet passthrough) is already at the target loudness
+        loudness = None
+        filters = []
+        if normalize is not None:
+            loudness = measure_loudness(source_path)
+        if loudness:
+            gain = normalization_gain_db(loudness, normalize["target"], normalize["max_gain"])
+            loudness["baked_db"] = gain
+            if gain:
+                filters = ["-af", f"volume={gain}dB"]
+        
+        _run_ffmpeg([
+            "-i", source_path, "-vn", *filters,
+            "-c:a", "libopus", "-b:a", f"{bitrate}k", "-frame_duration", "20",
+            "-ar", "48000", "-ac", "2", "-f", "ogg", tmp_path,
+        ])
+        os.replace(tmp_path, path)
+    finally:
+        for leftover in (source_path, tmp_path):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+    
+    # Packet index for FFmpeg-free playback; without it FFmpeg plays the file
+    try:
+        build_index(path)
+    except ValueError:
+        pass
+    return {"size": os.path.getsize(path), "loudness": loudness}
+
+
+# ═══════════════════════════════════════════════════════════════
+# 📋 JOBS
+# ═══════════════════════════════════════════════════════════════
+
+@dataclass
+class WarmJob:
+    """A track waiting to be cached"""
+    track_id: str
+    url: str
+    title: str = ""
+    priority: int = PRIORITY_PLAYS
+    reason: str = "plays"
+    kind: str = "cache"  # "cache" or "analyze"
+    created: float = field(default_factory=time.time)
+    attempts: int = 0
+    
+    # Resolved stream URLs expire, so they are never journaled
+    stream_url: Optional[str] = field(default=None, repr=False)
+    
+    def to_record(self) -> dict:
+        record = asdict(self)
+        record.pop("stream_url")
+        return record
+
+
+class JobJournal:
+    """
+    Append-only JSONL log of queued and finished jobs
+    
+    Replaying it after a restart yields every job that was queued but
+    never finished. The file is compacted to just the pending jobs once
+    finished records dominate it.
+    """
+    
+    def __init__(self, path: str, compact_after: int = 1000):
+        self.path = path
+        self.compact_after = compact_after
+        self._finished_records = 0
+    
+    def replay(self) -> List[WarmJob]:
+        """Jobs that were queued but never finished"""
+        pending: Dict[str, WarmJob] = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Torn last line from a crash
+                        continue
+                    
+                    op = record.pop("op", None)
+                    if op == "queued":
+                        pending[record["track_id"]] = WarmJob(**record)
+                    elif op in ("done", "dropped"):
+                        pending.pop(record.get("track_id"), None)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"⚠️ Warmer journal unreadable: {e}")
+        
+        jobs = list(pending.values())
+        self.compact(jobs)
+        return jobs
+    
+    def _append(self, record: dict):
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        except Exception as e:
+            logger.error(f"❌ Failed to write warmer journal: {e}")
+    
+    def queued(self, job: WarmJob):
+        self._append({"op": "queued", **job.to_record()})
+    
+    def finished(self, track_id: str, op: str = "done") -> bool:
+        """Record a finished job; True when the journal is due for compaction"""
+        self._append({"op": op, "track_id": track_id})
+        self._finished_records += 1
+        return self._finished_records >= self.compact_after
+    
+    def compact(self, pending: Iterable[WarmJob]):
+        """Atomically rewrite the journal with only the pending jobs"""
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for job in pending:
+                    f.write(json.dumps({"op": "queued", **job.to_record()}, separators=(",", ":")) + "\n")
+            os.replace(tmp_path, self.path)
+            self._finished_records = 0
+        except Exception as e:
+            logger.error(f"❌ Failed to compact warmer journal: {e}")
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🔥 CACHE WARMER
+# ═══════════════════════════════════════════════════════════════
+
+class CacheWarmer:
+    """
+    Bounded background pool that fills the audio cache
+    
+    Jobs come from play counts, saved playlists and the upcoming queue.
+    They are de-duplicated by track ID, run in priority order on a small
+    process pool at reduced CPU/IO priority, and journaled so a restart
+    picks up where it left off.
+    """
+    
+    def __init__(
+        self,
+        cache: AudioCache,
+        journal_path: str,
+        workers: int = 1,
+        niceness: int = 10,
+        io_idle: bool = True,
+        max_backlog: int = 500,
+        max_attempts: int = 2
+    ):
+        self.cache = cache
+        self.workers = max(1, workers)
+        self.niceness = niceness
+        self.io_idle = io_idle
+        self.max_backlog = max_backlog
+        self.max_attempts = max_attempts
+        
+        self.journal = JobJournal(journal_path)
+        self._backlog: Dict[str, WarmJob] = {}
+        self._running: Dict[str, WarmJob] = {}
+        
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._tasks: set = set()
+        
+        # Stats
+        self.submitted = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.bytes_warmed = 0
+        self.busy_seconds = 0.0
+        self.started_at: Optional[float] = None
+        
+        for job in self.journal.replay():
+            self._backlog[job.track_id] = job
+        if self._backlog:
+            logger.info(f"🔥 Resuming {len(self._backlog)} cache warming jobs from the journal")
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🔄 LIFECYCLE
+    # ═══════════════════════════════════════════════════════════
+    
+    def start(self):
+        """Start the process pool and dispatcher (needs a running loop)"""
+        if self._dispatcher is not None:
+            return
+        
+        self._executor = self._create_executor()
+        self._wakeup = asyncio.Event()
+        self._dispatcher = asyncio.create_task(self._dispatch())
+        self.started_at = time.time()
+        logger.info(f"🔥 Cache warmer started with {self.workers} worker(s), nice {self.niceness}")
+        
+        # Background loudness pass over files cached before they were measured
+        if config.MUSIC.normalize_loudness:
+            for track_id in self.cache.unmeasured():
+                self._enqueue(WarmJob(
+                    track_id=track_id, url="", priority=PRIORITY_ANALYSIS,
+                    reason="loudness", kind="analyze"
+                ))
+    
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=mp.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.niceness, self.io_idle)
+        )
+    
+    def shutdown(self):
+        """Stop dispatching; unfinished jobs stay in the journal"""
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    # ═══════════════════════════════════════════════════════════
+    # 📥 INPUTS
+    # ═══════════════════════════════════════════════════════════
+    
+    def submit(self, track, priority: int = PRIORITY_PLAYS, reason: str = "plays", stream_url: str = None) -> bool:
+        """Queue a track for caching; False if cached, queued or over budget"""
+        track_id = track.track_id
+        
+        if self.cache.contains(track_id) or track_id in self._running:
+            self.deduplicated += 1
+            return False
+        
+        queued = self._backlog.get(track_id)
+        if queued:
+            # Already waiting, but a more urgent reason moves it up
+            if priority < queued.priority:
+                queued.priority = priority
+                queued.reason = reason
+            if stream_url:
+                queued.stream_url = stream_url
+            self.deduplicated += 1
+            return False
+        
+        job = WarmJob(
+            track_id=track_id,
+            url=track.url,
+            title=track.title,
+            priority=priority,
+            reason=reason,
+            stream_url=stream_url
+        )
+        self.start()
+        return self._enqueue(job)
+    
+    def _enqueue(self, job: WarmJob) -> bool:
+        if job.track_id in self._backlog or job.track_id in self._running:
+            self.deduplicated += 1
+            return False
+        
+        if len(self._backlog) >= self.max_backlog:
+            self.rejected += 1
+            return False
+        
+        self._backlog[job.track_id] = job
+        self.journal.queued(job)
+        self.submitted += 1
+        
+        if self._wakeup:
+            self._wakeup.set()
+        return True
+    
+    def submit_played(self, track, stream_url: str = None):
+        """Queue a track once it has been played often enough"""
+        if self.cache.should_store(track.track_id):
+            self.submit(track, PRIORITY_PLAYS, "plays", stream_url)
+    
+    def submit_upcoming(self, tracks: Iterable):
+        """Queue the next tracks of a player's queue"""
+        for track in tracks:
+            self.submit(track, PRIORITY_UPCOMING, "upcoming")
+    
+    def submit_playlist(self, tracks: Iterable):
+        """Queue the tracks of a saved playlist"""
+        for track in tracks:
+            self.submit(track, PRIORITY_PLAYLIST, "playlist")
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🧵 DISPATCH
+    # ═══════════════════════════════════════════════════════════
+    
+    def _next_job(self) -> Optional[WarmJob]:
+        if not self._backlog:
+            return None
+        job = min(self._backlog.values(), key=lambda j: (j.priority, j.created))
+        del self._backlog[job.track_id]
+        return job
+    
+    async def _dispatch(self):
+        """Keep at most ``workers`` jobs in flight"""
+        while True:
+            while len(self._running) < self.workers:
+                job = self._next_job()
+                if job is None:
+                    break
+                self._running[job.track_id] = job
+                task = asyncio.create_task(self._run_job(job))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            
+            self._wakeup.clear()
+            await self._wakeup.wait()
+    
+    async def _run_job(self, job: WarmJob):
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        job.attempts += 1
+        op = "done"
+        
+        try:
+            path = self.cache.path_for(job.track_id)
+            
+            if job.kind == "analyze":
+                if self.cache.contains(job.track_id):
+                    loudness = await loop.run_in_executor(self._executor, _analyze_job, path)
+                    if loudness:
+                        self.cache.set_loudness(job.track_id, loudness)
+                self.completed += 1
+            else:
+                normalize = None
+                if config.MUSIC.normalize_loudness:
+                    normalize = {
+                        "target": config.MUSIC.loudness_target,
+                        "max_gain": config.MUSIC.max_normalization_gain,
+                    }
+                
+                result = await loop.run_in_executor(
+                    self._executor, _warm_job,
+                    job.url, job.stream_url, path, self.cache.bitrate, normalize
+                )
+                self.cache.add_file(job.track_id, path)
+                if result["loudness"]:
+                    self.cache.set_loudness(job.track_id, result["loudness"])
+                
+                self.completed += 1
+                self.bytes_warmed += result["size"]
+                logger.info(f"🔥 Warmed {job.title or job.track_id} ({job.reason})")
+        
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failed += 1
+            logger.warning(f"⚠️ Cache warming failed for {job.title or job.track_id}: {e}")
+            
+            if isinstance(e, BrokenProcessPool) and self._executor:
+                # A worker died (OOM, signal), later jobs need a fresh pool
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._create_executor()
+            
+            if job.attempts < self.max_attempts:
+                # Retry later with a freshly resolved stream URL
+                job.stream_url = None
+                job.priority = PRIORITY_PLAYLIST
+                self._backlog.setdefault(job.track_id, job)
+                op = None
+            else:
+                op = "dropped"
+        finally:
+            self.busy_seconds += time.perf_counter() - started
+            self._running.pop(job.track_id, None)
+            if self._wakeup:
+                self._wakeup.set()
+        
+        if op and self.journal.finished(job.track_id, op):
+            self.journal.compact(list(self._running.values()) + list(self._backlog.values()))
+    
+    # ═══════════════════════════════════════════════════════════
+    # 📊 STATS
+    # ═══════════════════════════════════════════════════════════
+    
+    def stats(self) -> dict:
+        uptime_hours = (time.time() - self.started_at) / 3600 if self.started_at else 0
+        finished = self.completed + self.failed
+        return {
+            "workers": self.workers,
+            "backlog": len(self._backlog),
+            "running": len(self._running),
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "bytes_warmed": self.bytes_warmed,
+            "jobs_per_hour": round(self.completed / uptime_hours, 1) if uptime_hours else 0.0,
+            "avg_job_seconds": round(self.busy_seconds / finished, 1) if finished else 0.0,
+        }
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🌐 SHARED INSTANCE
+# ═══════════════════════════════════════════════════════════════
+
+_warmer: Optional[CacheWarmer] = None
+
+
+def get_cache_warmer() -> Optional[CacheWarmer]:
+    """Get the process-wide cache warmer, or None when caching is disabled"""
+    global _warmer
+    cache = get_audio_cache()
+    if cache is None:
+        return None
+    if _warmer is None:
+        _warmer = CacheWarmer(
+            cache,
+            journal_path=os.path.join(config.CACHE_DIR, "warmer_journal.jsonl"),
+            workers=config.CACHE.warm_workers,
+            niceness=config.CACHE.warm_niceness,
+            io_idle=config.CACHE.warm_io_idle,
+            max_backlog=config.CACHE.warm_backlog,
+        )
+    return _warmer
@@ -0,0 +1,115 @@
+"""
+🎮 Message Controls
+Emoji controls on bot messages: reactions, or buttons in slim gateway mode
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+import discord
+
+import config
+
+logger = logging.getLogger('ShlokMusic.Controls')
+
+# Called with the interaction and the emoji of the pressed button
+ButtonHandler = Callable[[discord.Interaction, str], Awaitable[None]]
+
+
+class ControlButtons(discord.ui.View):
+    """
+    Persistent buttons standing in for reaction controls
+    
+    Slim gateway mode gets no reaction events, but button presses arrive
+    as interactions whatever the intents. Register one instance with
+    ``bot.add_view`` and attach it to every message that needs it; the
+    custom IDs route presses to ``handler`` even after a restart.
+    """
+    
+    def __init__(self, prefix: str, emojis: List[str], handler: ButtonHandler):
+        super().__init__(timeout=None)
+        self.handler = handler
+        for index, emoji in enumerate(emojis[:25]):
+            button = discord.ui.Button(
+                emoji=emoji,
+                style=discord.ButtonStyle.secondary,
+                custom_id=f"{prefix}:{index}",
+                row=index // 5,
+            )
+            button.callback = self._callback(emoji)
+            self.add_item(button)
+    
+    def _callback(self, emoji: str):
+        async def callback(interaction: discord.Interaction):
+            try:
+                await self.handler(interaction, emoji)
+            except Exception as e:
+                logger.error(f"❌ Control {emoji} failed: {e}")
+        return callback
+
+
+class ChoicePrompt:
+    """
+    One user picks an emoji on a message (search results, pages)
+    
+    Adds reactions and waits for ``reaction_add`` in full gateway mode;
+    attaches buttons and waits for a press in slim mode. ``wait`` raises
+    ``asyncio.TimeoutError`` like ``bot.wait_for``.
+    """
+    
+    def __init__(self, bot, message: discord.Message, user: discord.abc.User, emojis: List[str]):
+        self.bot = bot
+        self.message = message
+        self.user = user
+        self.emojis = emojis
+        self._choices: "asyncio.Queue[str]" = asyncio.Queue()
+        self._view: Optional[discord.ui.View] = None
+    
+    async def start(self):
+        if not config.GATEWAY.slim:
+            for emoji in self.emojis:
+                await self.message.add_reaction(emoji)
+            return
+        
+        self._view = discord.ui.View(timeout=None)
+        for index, emoji in enumerate(self.emojis[:25]):
+            button = discord.ui.Button(emoji=emoji, style=discord.ButtonStyle.secondary, row=index // 5)
+            button.callback = self._pressed(emoji)
+            self._view.add_item(button)
+        await self.message.edit(view=self._view)
+    
+    def _pressed(self, emoji: str):
+        async def callback(interaction: discord.Interaction):
+            if interaction.user.id != self.user.id:
+                await interaction.response.send_message("❌ This isn't your menu!", ephemeral=True)
+                return
+            await interaction.response.defer()
+            self._choices.put_nowait(emoji)
+        return callback
+    
+    async def wait(self, timeout: float) -> str:
+        if self._view is not None:
+            return await asyncio.wait_for(self._choices.get(), timeout)
+        
+        def check(reaction, user):
+            return user == self.user and reaction.message.id == self.message.id and str(reaction.emoji) in self.emojis
+        
+        reaction, _ = await self.bot.wait_for('reaction_add', timeout=timeout, check=check)
+        return str(reaction.emoji)
+    
+    async def rearm(self, emoji: str):
+        """Take the user's reaction off again, so the same emoji can be picked twice"""
+        if self._view is None:
+            await self.message.remove_reaction(emoji, self.user)
+    
+    async def clear(self):
+        """Remove the reactions or buttons once the prompt is over"""
+        try:
+            if self._view is not None:
+                self._view.stop()
+                await self.message.edit(view=None)
+            else:
+                await self.message.clear_reactions()
+        except discord.HTTPException:
+            pass
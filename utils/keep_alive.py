@@ -207,12 +207,56 @@ def get_health_status(bot) -> dict:
     Returns:
         dict: Health status information
     """
+    from core.analytics import get_analytics
+    from core.buffer import buffer_stats
+    from core.counters import get_guild_counters
+    from core.cache import get_audio_cache
+    from core.encoder import get_encoder_pool
+    from core.governor import get_quality_governor
+    from core.packet_store import get_packet_registry
+    from core.proxy import get_range_proxy
+    from core.scheduler import get_scheduler
+    from core.session import get_session_store
+    from core.settings import get_guild_settings
+    from core.station import get_station_manager
+    from core.supervisor import get_ffmpeg_supervisor
+    from core.warmer import get_cache_warmer
+    from utils.startup import get_startup_timeline
+    
+    pool = get_encoder_pool()
+    cache = get_audio_cache()
+    warmer = get_cache_warmer()
+    proxy = get_range_proxy()
+    governor = get_quality_governor()
+    sessions = get_session_store()
+    analytics = get_analytics()
+    reconnect_times = [ms for p in bot.music_players.values() for ms in p.reconnect_times]
+    
     return {
         "status": "online" if not bot.is_closed() else "offline",
         "latency_ms": round(bot.latency * 1000, 2),
-        "guilds": len(bot.guilds),
+        "guilds": get_guild_counters().guilds,
+        "users": get_guild_counters().users,
         "voice_connections": sum(1 for p in bot.music_players.values() if p.is_connected),
+        "idle_players": sum(1 for p in bot.music_players.values() if p.suspended),
+        "voice_reconnects": sum(p.voice_reconnects for p in bot.music_players.values()),
+        "time_to_audio_ms": round(sum(reconnect_times) / len(reconnect_times)) if reconnect_times else None,
         "uptime_seconds": (asyncio.get_event_loop().time() - bot.start_time.timestamp()) if bot.start_time else 0,
         "songs_played": bot.songs_played,
         "commands_used": bot.commands_used,
+        "audio_scheduler": get_scheduler().stats(),
+        "encoder_pool": pool.stats() if pool else None,
+        "stations": get_station_manager().stats(),
+        "audio_cache": cache.stats() if cache else None,
+        "packet_store": get_packet_registry().stats(),
+        "cache_warmer": warmer.stats() if warmer else None,
+        "buffers": buffer_stats(),
+        "range_proxy": proxy.stats() if proxy else None,
+        "ffmpeg": get_ffmpeg_supervisor().stats(),
+        "quality_governor": governor.stats() if governor else None,
+        "sessions": sessions.stats() if sessions else None,
+        "database": sessions.db.stats() if sessions else None,
+        "guild_settings": get_guild_settings().stats(),
+        "analytics": analytics.stats() if analytics else None,
+        "startup": get_startup_timeline().stats(),
     }
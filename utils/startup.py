@@ -0,0 +1,97 @@
+"""
+⏱️ Startup Timeline
+Where boot time goes: when each startup phase began and ended
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Dict, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger('ShlokMusic.Startup')
+
+T = TypeVar('T')
+
+# Width of the bars in the report
+_BAR_WIDTH = 40
+
+
+class StartupTimeline:
+    """
+    Phases of one boot, relative to when this module was first imported
+    
+    Phases may overlap (the web server, opus and the cog imports run
+    while the bot logs in), so the report draws each one as a bar on a
+    shared time axis instead of adding them up.
+    """
+    
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self._open: Dict[str, float] = {}
+        self.phases: List[Tuple[str, float, float]] = []
+        self.ready_after: Optional[float] = None
+    
+    def _now(self) -> float:
+        return time.perf_counter() - self.origin
+    
+    def begin(self, name: str):
+        self._open[name] = self._now()
+    
+    def end(self, name: str):
+        started = self._open.pop(name, None)
+        if started is not None:
+            self.phases.append((name, started, self._now()))
+    
+    def record(self, name: str, started: float, ended: float):
+        """A phase measured elsewhere, in seconds since the origin"""
+        self.phases.append((name, started, ended))
+    
+    @contextmanager
+    def phase(self, name: str):
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end(name)
+    
+    async def track(self, name: str, awaitable: Awaitable[T]) -> T:
+        with self.phase(name):
+            return await awaitable
+    
+    def finish(self):
+        """The bot is online: log the report (once per process)"""
+        if self.ready_after is not None:
+            return
+        self.ready_after = self._now()
+        logger.info(f"⏱️ Ready {self.ready_after * 1000:.0f}ms after start\n{self.report()}")
+    
+    def report(self) -> str:
+        total = max([end for _, _, end in self.phases] + [self.ready_after or 0.0]) or 1.0
+        width = max((len(name) for name, _, _ in self.phases), default=0)
+        lines = []
+        for name, started, ended in sorted(self.phases, key=lambda phase: phase[1]):
+            left = int(started / total * _BAR_WIDTH)
+            length = max(1, int((ended - started) / total * _BAR_WIDTH))
+            bar = (" " * left + "█" * length).ljust(_BAR_WIDTH)
+            lines.append(f"  {name:<{width}} {started * 1000:>7.0f}ms +{(ended - started) * 1000:>6.0f}ms ▕{bar}▏")
+        return "\n".join(lines)
+    
+    def stats(self) -> dict:
+        return {
+            "ready_ms": round(self.ready_after * 1000) if self.ready_after is not None else None,
+            "phases": {
+                name: {"start_ms": round(started * 1000), "duration_ms": round((ended - started) * 1000)}
+                for name, started, ended in self.phases
+            },
+        }
+
+
+_timeline: Optional[StartupTimeline] = None
+
+
+def get_startup_timeline() -> StartupTimeline:
+    """Get the process-wide startup timeline"""
+    global _timeline
+    if _timeline is None:
+        _timeline = StartupTimeline()
+    return _timeline